@@ -0,0 +1,150 @@
+"""主菜单动画的统一时钟
+
+所有动画效果注册到同一个 AnimationClock，由一个 after() 循环统一驱动，每一帧依次更新各效果，
+Tk 只在这一帧的回调全部结束后重绘一次。回调接收距上次运行的秒数 dt，按时间而不是按帧计算动画进度，
+因此降帧时动画速度不变。
+
+* 效果回调返回 False 即进入空闲，不再被调用，直到调用 resume()；
+* 绑定了控件的效果在控件不可见（窗口最小化等）时暂停；
+* 一帧的耗时超出预算时自动降低帧率，负载下降后再恢复；
+* stats() 给出每个效果的调用次数和 CPU 时间。
+"""
+
+import time
+
+MAX_DT = 0.1  # 卡顿后的第一帧最多前进这么多秒，避免动画跳变
+
+
+class Effect:
+    """注册到时钟上的一个动画效果"""
+
+    def __init__(self, name, callback, interval=0.0, widget=None, active=True):
+        self.name = name
+        self.callback = callback
+        self.interval = interval  # 两次调用之间的最短间隔（秒），0 表示每帧调用
+        self.widget = widget  # 不可见时暂停
+        self.active = active
+        self.calls = 0
+        self.cpu_time = 0.0
+        self._last_run = None
+
+    def resume(self):
+        """恢复空闲或暂停的效果，可在任意线程中调用"""
+        self.active = True
+
+    def pause(self):
+        self.active = False
+        self._last_run = None
+
+    def visible(self):
+        if self.widget is None:
+            return True
+        try:
+            return bool(self.widget.winfo_viewable())
+        except Exception:
+            return False
+
+
+class AnimationClock:
+    def __init__(self, root, target_fps=50, min_fps=15, idle_interval=0.25):
+        self.root = root
+        self.target_interval = 1.0 / target_fps
+        self.max_interval = 1.0 / min_fps
+        self.idle_interval = idle_interval  # 没有活动效果时的轮询间隔
+        self.frame_interval = self.target_interval
+        self.effects = []
+        self.frames = 0
+        self._tick_cost = 0.0  # 每帧耗时的指数滑动平均（秒）
+        self._after_id = None
+        self._running = False
+
+    def register(self, name, callback, interval=0.0, widget=None, active=True):
+        """注册效果，callback(dt) 返回 False 时进入空闲"""
+        effect = Effect(name, callback, interval, widget, active)
+        self.effects.append(effect)
+        return effect
+
+    def unregister(self, effect):
+        if effect in self.effects:
+            self.effects.remove(effect)
+
+    def start(self):
+        if not self._running:
+            self._running = True
+            self._after_id = self.root.after(0, self._tick)
+
+    def stop(self):
+        """停止时钟，销毁窗口前调用"""
+        self._running = False
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _tick(self):
+        self._after_id = None
+        if not self._running:
+            return
+        tick_start = time.perf_counter()
+        any_active = False
+
+        for effect in list(self.effects):
+            if not effect.active:
+                continue
+            any_active = True
+            if not effect.visible():
+                effect._last_run = None
+                continue
+            if effect._last_run is None:
+                dt = max(effect.interval, self.frame_interval)
+            else:
+                dt = tick_start - effect._last_run
+                if dt < effect.interval:
+                    continue
+            effect._last_run = tick_start
+
+            cpu_start = time.thread_time()
+            try:
+                keep = effect.callback(min(dt, MAX_DT))
+            finally:
+                effect.cpu_time += time.thread_time() - cpu_start
+                effect.calls += 1
+            if keep is False:
+                effect.pause()
+            if not self._running:
+                return  # 回调中停止了时钟（例如关闭窗口）
+
+        self.frames += 1
+        self._adapt(time.perf_counter() - tick_start)
+        delay = self.frame_interval if any_active else self.idle_interval
+        self._after_id = self.root.after(max(1, int(delay * 1000)), self._tick)
+
+    def _adapt(self, cost):
+        """按每帧耗时调整帧间隔：超出预算时降帧，负载下降后逐步恢复"""
+        self._tick_cost = cost if self.frames == 1 else 0.9 * self._tick_cost + 0.1 * cost
+        if self._tick_cost > 0.8 * self.frame_interval:
+            self.frame_interval = min(self.max_interval, self.frame_interval * 1.25)
+        elif self._tick_cost < 0.4 * self.frame_interval:
+            self.frame_interval = max(self.target_interval, self.frame_interval / 1.25)
+
+    @property
+    def fps(self):
+        return 1.0 / self.frame_interval
+
+    def stats(self):
+        return {
+            "fps": round(self.fps, 1),
+            "tick_cost_ms": round(self._tick_cost * 1000, 3),
+            "frames": self.frames,
+            "effects": {
+                effect.name: {
+                    "active": effect.active,
+                    "calls": effect.calls,
+                    "cpu_ms": round(effect.cpu_time * 1000, 3),
+                    "cpu_ms_per_call": round(effect.cpu_time * 1000 / effect.calls, 3) if effect.calls else None,
+                }
+                for effect in self.effects
+            },
+        }
@@ -0,0 +1,115 @@
+"""基准测试用的合成手部录像，按固定参数逐帧绘制，任何机器上生成的画面都相同
+
+benchmark_hands 需要一段包含手的录像（没有手的画面在 MediaPipe 中走的是另一条路径）。
+为了让不同机器的结果可以比较，不随仓库附带录像，而是在第一次运行时按这里的参数生成:
+
+* 640x480、30 帧/秒、默认 10 秒，背景为竖直渐变；
+* 一只张开的右手（手掌、四指三节指骨、拇指、前臂），按距离变换做明暗；
+* 每 4 秒从张开到握拳再张开一次，同时缓慢平移、旋转、缩放，跟踪和匹配都会被覆盖到。
+
+MediaPipe 0.10 在该录像的每一帧都能检测到手。参数改变时需同时修改 CLIP_VERSION，旧文件不再复用。
+
+用法示例:
+    python benchmark_clip.py recordings/bench_clip.avi
+"""
+
+import os
+import sys
+
+import cv2
+import numpy as np
+
+CLIP_VERSION = 1
+CLIP_SIZE = (640, 480)
+CLIP_FPS = 30.0
+CLIP_SECONDS = 10.0
+DEFAULT_CLIP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recordings",
+                                 f"benchmark_hand_clip_v{CLIP_VERSION}.avi")
+
+# 四指：根部 (x, y)、方向（度，0 为朝上，正为向右）、长度、粗细，单位为像素（缩放前）
+_FINGERS = (((-42, -62), -14, 100, 24), ((-13, -70), -4, 112, 25), ((16, -68), 6, 106, 24), ((43, -56), 16, 86, 21))
+_PHALANGES = (0.45, 0.3, 0.25)  # 各节指骨占手指长度的比例
+_PALM = ((-55, 40), (-60, -45), (-38, -72), (38, -72), (58, -50), (55, 30), (30, 75), (-30, 75))
+_BACKGROUND = (90, 110, 130)  # BGR
+_SKIN = (150, 185, 225)
+_CREASE = (110, 140, 180)
+
+
+def render_frame(t, size=CLIP_SIZE):
+    """t 秒时的一帧 BGR 画面"""
+    width, height = size
+    curl = 0.5 - 0.5 * np.cos(2 * np.pi * t / 4.0)  # 0 为张开，1 为握拳
+    cx = width / 2 + 60 * np.sin(2 * np.pi * t / 7.0)
+    cy = height * 0.62 + 25 * np.sin(2 * np.pi * t / 5.0)
+    angle = np.radians(12 * np.sin(2 * np.pi * t / 6.0))
+    scale = 1.0 + 0.1 * np.sin(2 * np.pi * t / 9.0)
+    cos, sin = np.cos(angle), np.sin(angle)
+
+    def to_image(x, y):
+        return (int(round(cx + scale * (cos * x - sin * y))), int(round(cy + scale * (sin * x + cos * y))))
+
+    mask = np.zeros((height, width), np.uint8)
+    cv2.fillPoly(mask, [np.array([to_image(x, y) for x, y in _PALM])], 255)
+    creases = []
+    for base, direction, length, thickness in _FINGERS:
+        d = np.radians(direction)
+        unit = np.array([np.sin(d), -np.cos(d)])
+        joints = [np.array(base, dtype=np.float64)]
+        for share in _PHALANGES:
+            # 向掌心弯曲时，在图像平面内表现为指骨变短
+            joints.append(joints[-1] + unit * length * share * (1 - 0.75 * curl))
+        for start, end in zip(joints, joints[1:]):
+            cv2.line(mask, to_image(*start), to_image(*end), 255, int(thickness * scale))
+            cv2.circle(mask, to_image(*end), int(thickness * scale / 2), 255, -1)
+        creases += [(joint, np.array([np.cos(d), np.sin(d)]) * thickness * 0.35) for joint in joints[1:-1]]
+
+    thumb = ((-50, 30), (-95 + 35 * curl, -15), (-120 + 75 * curl, -55 + 25 * curl))
+    for start, end, thickness in zip(thumb, thumb[1:], (30, 26)):
+        cv2.line(mask, to_image(*start), to_image(*end), 255, int(thickness * scale))
+    cv2.circle(mask, to_image(*thumb[-1]), int(13 * scale), 255, -1)
+    cv2.line(mask, to_image(0, 70), to_image(0, 260), 255, int(100 * scale))  # 前臂
+
+    background = (np.array(_BACKGROUND, np.float32) * np.linspace(0.8, 1.1, height, dtype=np.float32)[:, None, None]
+                  * np.ones((1, width, 1), np.float32))
+    alpha = cv2.GaussianBlur(mask, (0, 0), 2).astype(np.float32)[..., None] / 255
+    distance = cv2.distanceTransform(mask, cv2.DIST_L2, 5)
+    distance /= distance.max() + 1e-6
+    skin = np.array(_SKIN, np.float32) * (0.65 + 0.45 * np.sqrt(distance))[..., None]
+    frame = (background * (1 - alpha) + skin * alpha).clip(0, 255).astype(np.uint8)
+    for joint, half_width in creases:
+        cv2.line(frame, to_image(*(joint - half_width)), to_image(*(joint + half_width)), _CREASE, 1, cv2.LINE_AA)
+    return frame
+
+
+def write_clip(path, seconds=CLIP_SECONDS, fps=CLIP_FPS, size=CLIP_SIZE):
+    """生成录像（MJPG 编码的 AVI），先写临时文件再改名，中途失败不会留下不完整的文件"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp.avi"
+    writer = cv2.VideoWriter(tmp_path, cv2.VideoWriter_fourcc(*"MJPG"), fps, size)
+    if not writer.isOpened():
+        raise IOError(f"无法写入视频文件: {tmp_path}")
+    try:
+        for index in range(int(round(seconds * fps))):
+            writer.write(render_frame(index / fps, size))
+    finally:
+        writer.release()
+    os.replace(tmp_path, path)
+    return path
+
+
+def ensure_clip(path=DEFAULT_CLIP_PATH):
+    """返回录像路径，文件不存在时先生成"""
+    if not os.path.exists(path):
+        write_clip(path)
+    return path
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    path = argv[0] if argv else DEFAULT_CLIP_PATH
+    print(f"已生成 {write_clip(path)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,416 @@
+"""手势识别热路径的基准测试，无需摄像头
+
+用一段包含手的录像代替摄像头（没有手的画面在 MediaPipe 中走的是另一条路径，测不出真实开销），比较两种实现。
+默认使用 benchmark_clip 按固定参数生成的合成录像，不同机器的结果可以直接比较；也可以用 --video 指定真实录像:
+
+* pipeline（实际使用的实现）：按摄像头帧率读取录像，驱动 GesturePipeline 的采集 / 推理 / 渲染线程，
+  推理经过 HandROITracker（默认整帧跟踪，--roi 时裁剪区域用静态图像模式实例）和 AdaptiveScheduler 跳帧，
+  Tk 线程一侧做 One Euro 平滑、关节角相似度和去抖匹配，有显示器时用 CanvasDisplay 原地更新画面；
+* legacy（原先的实现）：单线程逐帧解码、整帧 hands.process、折叠状态、绘制、缩放、每帧新建 PhotoImage。
+
+输出吞吐量、端到端延迟、推理耗时和各阶段耗时（p50/p95/p99）、检测到手的帧比例、ROI 推理比例（--roi）
+和峰值内存到 JSON 文件。
+
+用法示例:
+    python benchmark_hands.py
+    python benchmark_hands.py --video session.mp4 --mode pipeline --fps 60 --output bench_pipeline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import threading
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+from PIL import Image
+
+from benchmark_clip import CLIP_VERSION, DEFAULT_CLIP_PATH, ensure_clip
+from frame_scheduler import AdaptiveScheduler
+from gesture_matcher import GestureMatcher, fold_state_tuples, get_finger_fold_state
+from gesture_pipeline import GesturePipeline
+from gesture_similarity import SimilarityScorer
+from gesture_smoothing import DecisionEngine, LandmarkSmoother
+from hand_features import results_to_arrays
+from roi_tracker import HandROITracker
+
+mp_hands = mp.solutions.hands
+mp_drawing = mp.solutions.drawing_utils
+
+LEGACY_STAGES = ("decode", "bgr2rgb", "hands_process", "fold_state", "draw_landmarks", "resize", "photoimage")
+TARGET_LATENCY_MS = 80  # 与 hands_recognize 相同
+
+_LANDMARK_SPEC = mp_drawing.DrawingSpec(color=(66, 133, 244), thickness=2, circle_radius=2)
+_CONNECTION_SPEC = mp_drawing.DrawingSpec(color=(0, 230, 118), thickness=2)
+
+
+def draw_hand_landmarks(frame_rgb, results):
+    for hand_landmarks in results.multi_hand_landmarks or []:
+        mp_drawing.draw_landmarks(frame_rgb, hand_landmarks, mp_hands.HAND_CONNECTIONS,
+                                  landmark_drawing_spec=_LANDMARK_SPEC, connection_drawing_spec=_CONNECTION_SPEC)
+
+
+class ClipCapture:
+    """按摄像头帧率读取录像，接口与 cv2.VideoCapture 相同；fps 为 0 时不限速（只用于 legacy）。读完后 finished 被置位"""
+
+    def __init__(self, path, fps=30.0):
+        self.capture = cv2.VideoCapture(path)
+        if not self.capture.isOpened():
+            raise IOError(f"无法打开视频文件: {path}")
+        self.interval = 1.0 / fps if fps else 0.0
+        self.finished = threading.Event()
+        self.frames_read = 0
+        self.decode_ms = []  # 每帧解码耗时（不含按帧率等待的时间）
+        self._next = None
+
+    def read(self):
+        if self.finished.is_set():
+            return False, None
+        if self.interval:
+            now = time.perf_counter()
+            if self._next is not None and now < self._next:
+                time.sleep(self._next - now)
+            self._next = max(now, self._next or now) + self.interval
+        start = time.perf_counter()
+        ret, frame = self.capture.read()
+        if not ret or frame is None:
+            self.finished.set()
+            return False, None
+        self.decode_ms.append((time.perf_counter() - start) * 1000)
+        self.frames_read += 1
+        return True, frame
+
+    def get(self, prop):
+        return self.capture.get(prop)
+
+    def release(self):
+        self.capture.release()
+
+
+class RecordingScheduler(AdaptiveScheduler):
+    """除了调度用的滑动平均，还保留各阶段的每一次耗时，用于计算百分位数"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.samples = {}
+
+    def record(self, stage, elapsed_ms):
+        super().record(stage, elapsed_ms)
+        with self._lock:
+            self.samples.setdefault(stage, []).append(elapsed_ms)
+
+    def clear_samples(self):
+        with self._lock:
+            self.samples = {}
+
+
+def make_tk_root():
+    """有显示器时返回隐藏的 Tk 根窗口，否则返回 None"""
+    try:
+        import tkinter as tk
+
+        root = tk.Tk()
+        root.withdraw()
+        return root
+    except Exception:
+        return None
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+        except Exception:
+            return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def summarize(values_ms):
+    values = np.asarray(values_ms, dtype=np.float64)
+    if len(values) == 0:
+        return None
+    return {
+        "mean": round(float(values.mean()), 3),
+        "p50": round(float(np.percentile(values, 50)), 3),
+        "p95": round(float(np.percentile(values, 95)), 3),
+        "p99": round(float(np.percentile(values, 99)), 3),
+        "max": round(float(values.max()), 3),
+    }
+
+
+def run_legacy(video_path, display_size=(900, 600), warmup=10, max_frames=None):
+    """原先的单线程实现：整帧推理，每帧新建 PhotoImage"""
+    timings = {stage: [] for stage in LEGACY_STAGES}
+    totals = []
+    frames_with_hands = 0
+    tk_root = make_tk_root()
+    if tk_root is not None:
+        from PIL import ImageTk
+        photoimage_fn, photoimage_kind = (lambda array: ImageTk.PhotoImage(image=Image.fromarray(array))), \
+            "ImageTk.PhotoImage"
+    else:
+        photoimage_fn, photoimage_kind = (lambda array: Image.fromarray(array).tobytes()), \
+            "PIL fromarray+tobytes（无显示器）"
+
+    capture = ClipCapture(video_path, fps=0)
+    index = 0
+    wall_start = time.perf_counter() if warmup == 0 else None
+    with mp_hands.Hands(min_detection_confidence=0.5, min_tracking_confidence=0.5) as hands:
+        while max_frames is None or index < max_frames + warmup:
+            sample = {}
+            t0 = time.perf_counter()
+            ret, frame = capture.read()
+            t1 = time.perf_counter()
+            if not ret:
+                break
+            sample["decode"] = t1 - t0
+
+            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            t2 = time.perf_counter()
+            sample["bgr2rgb"] = t2 - t1
+
+            results = hands.process(frame_rgb)
+            t3 = time.perf_counter()
+            sample["hands_process"] = t3 - t2
+
+            hand_list = results.multi_hand_landmarks or []
+            for hand_landmarks in hand_list:
+                get_finger_fold_state(hand_landmarks)
+            t4 = time.perf_counter()
+            sample["fold_state"] = t4 - t3
+
+            draw_hand_landmarks(frame_rgb, results)
+            t5 = time.perf_counter()
+            sample["draw_landmarks"] = t5 - t4
+
+            h, w = frame_rgb.shape[:2]
+            scale = min(display_size[0] / w, display_size[1] / h)
+            resized = cv2.resize(frame_rgb, (int(w * scale), int(h * scale)))
+            t6 = time.perf_counter()
+            sample["resize"] = t6 - t5
+
+            photoimage_fn(resized)
+            t7 = time.perf_counter()
+            sample["photoimage"] = t7 - t6
+
+            index += 1
+            if index == warmup:
+                wall_start = time.perf_counter()
+            if index > warmup:
+                frames_with_hands += bool(hand_list)
+                for stage in LEGACY_STAGES:
+                    timings[stage].append(sample[stage] * 1000)
+                totals.append((t7 - t0) * 1000)
+
+    wall = time.perf_counter() - wall_start if wall_start is not None else 0.0
+    capture.release()
+    if tk_root is not None:
+        tk_root.destroy()
+
+    measured = len(totals)
+    return {
+        "frames_measured": measured,
+        "warmup_frames": warmup,
+        "hand_ratio": round(frames_with_hands / measured, 3) if measured else 0.0,
+        "throughput_fps": round(measured / wall, 2) if wall > 0 else None,
+        "latency_ms": summarize(totals),
+        "inference_ms": summarize(timings["hands_process"]),
+        "stages_ms": {stage: summarize(values) for stage, values in timings.items()},
+        "photoimage_kind": photoimage_kind,
+    }
+
+
+def run_pipeline(video_path, fps=30.0, display_size=(900, 600), warmup=10, max_frames=None, roi=False):
+    """实际使用的实现：GesturePipeline + HandROITracker + AdaptiveScheduler + 平滑 / 相似度 / 去抖匹配
+
+    roi 为 True 时与 hands_recognize --roi 相同，裁剪区域交给静态图像模式的实例；否则每帧整帧跟踪。
+    """
+    hands = mp_hands.Hands(min_detection_confidence=0.5, min_tracking_confidence=0.5)
+    roi_hands = mp_hands.Hands(static_image_mode=True, min_detection_confidence=0.5) if roi else None
+    tracker = HandROITracker(hands.process, roi_hands.process if roi_hands is not None else None)
+    inference_ms = []
+
+    def process(frame_rgb):
+        start = time.perf_counter()
+        results = tracker.process(frame_rgb)
+        inference_ms.append((time.perf_counter() - start) * 1000)
+        return results
+
+    tk_root = make_tk_root()
+    display = None
+    if tk_root is not None:
+        import tkinter as tk
+        from display_backend import CanvasDisplay
+
+        tk_root.deiconify()
+        canvas = tk.Canvas(tk_root, width=display_size[0], height=display_size[1], highlightthickness=0)
+        canvas.pack()
+        tk_root.update()
+        display = CanvasDisplay(canvas)
+
+    capture = ClipCapture(video_path, fps)
+    width, height = capture.get(cv2.CAP_PROP_FRAME_WIDTH), capture.get(cv2.CAP_PROP_FRAME_HEIGHT)
+    scheduler = RecordingScheduler(target_latency_ms=TARGET_LATENCY_MS)
+    pipeline = GesturePipeline(capture, process, render_fn=draw_hand_landmarks, display=display, scheduler=scheduler)
+    smoother = LandmarkSmoother()
+    scorer = SimilarityScorer(aspect_ratio=width / height if width and height else None)
+    matcher = GestureMatcher(decision=DecisionEngine(vote_window=5, on_frames=2, off_frames=3))
+
+    latencies, match_ms, present_ms = [], [], []
+    displayed = frames_with_hands = 0
+    wall_start = None
+    last_packet = time.perf_counter()
+    pipeline.start()
+    while max_frames is None or displayed < max_frames + warmup:
+        packet = pipeline.latest()
+        if packet is None:
+            if tk_root is not None:
+                tk_root.update()
+            if capture.finished.is_set() and time.perf_counter() - last_packet > 0.5:
+                break
+            time.sleep(0.002)
+            continue
+        last_packet = time.perf_counter()
+
+        # Tk 线程一侧：平滑、相似度、去抖匹配（以第一帧检测到的手作为参考）
+        t0 = time.perf_counter()
+        hand_arrays = smoother.update(results_to_arrays(packet.results), packet.t_capture)
+        if hand_arrays and not scorer.has_reference:
+            scorer.set_reference(hand_arrays)
+            matcher.set_reference(fold_state_tuples(hand_arrays))
+        if scorer.has_reference:
+            matcher.update_similarity(scorer.score(hand_arrays)[0])
+        t1 = time.perf_counter()
+        if display is not None:
+            display.present()
+            tk_root.update_idletasks()
+        t2 = time.perf_counter()
+
+        displayed += 1
+        if displayed == warmup:
+            wall_start = time.perf_counter()
+            inference_ms.clear()
+            scheduler.clear_samples()
+            capture.decode_ms.clear()
+        if displayed > warmup:
+            latencies.append(packet.latency_ms)
+            match_ms.append((t1 - t0) * 1000)
+            present_ms.append((t2 - t1) * 1000)
+            frames_with_hands += bool(hand_arrays)
+
+    wall = time.perf_counter() - wall_start if wall_start is not None else 0.0
+    pipeline.stop()
+    capture.release()
+    hands.close()
+    if roi_hands is not None:
+        roi_hands.close()
+    if tk_root is not None:
+        tk_root.destroy()
+
+    measured = len(latencies)
+    stats = scheduler.stats()
+    return {
+        "frames_measured": measured,
+        "warmup_frames": warmup,
+        "frames_read": capture.frames_read,
+        "source_fps": fps or None,
+        "hand_ratio": round(frames_with_hands / measured, 3) if measured else 0.0,
+        "throughput_fps": round(measured / wall, 2) if wall > 0 else None,
+        "latency_ms": summarize(latencies),
+        "inference_ms": summarize(inference_ms),
+        "stages_ms": {
+            "match": summarize(match_ms),
+            "present": summarize(present_ms) if display is not None else None,
+            # capture 含按录像帧率等待的时间（与摄像头相同），decode 只是解码本身
+            **{stage: summarize(values) for stage, values in scheduler.samples.items()},
+            "decode": summarize(capture.decode_ms),
+        },
+        "roi_tracker": tracker.stats(),
+        "skip_ratio": round(stats["skip_ratio"], 3),
+        "pipeline": pipeline.stats(),
+        "display": "CanvasDisplay" if display is not None else "无显示器，不测量显示阶段",
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="手势识别热路径基准测试")
+    parser.add_argument("--video", help="包含手的录像文件（代替摄像头），默认为 benchmark_clip 生成的合成录像")
+    parser.add_argument("--mode", choices=["compare", "pipeline", "legacy"], default="compare",
+                        help="compare: 依次运行两种实现并比较")
+    parser.add_argument("--roi", action="store_true", help="pipeline 模式启用 ROI 裁剪推理（同 hands_recognize --roi）")
+    parser.add_argument("--fps", type=float, default=30.0,
+                        help="pipeline 模式读取录像的帧率（模拟摄像头）。流水线只处理最新的一帧，必须限速，"
+                             "否则录像在几次推理内就被读完")
+    parser.add_argument("--frames", type=int, help="最多测量的帧数，默认为整段录像")
+    parser.add_argument("--warmup", type=int, default=10, help="预热帧数，不计入统计")
+    parser.add_argument("--display-size", default="900x600", help="显示画布尺寸")
+    parser.add_argument("--min-hand-ratio", type=float, default=0.5,
+                        help="检测到手的帧比例低于该值时视为录像不合格（结果不可信）")
+    parser.add_argument("--output", default="bench_hands.json", help="结果 JSON 文件路径")
+    args = parser.parse_args(argv)
+    if args.fps <= 0:
+        parser.error("--fps 必须大于 0")
+
+    display_size = tuple(int(v) for v in args.display_size.lower().split("x"))
+    video = args.video or ensure_clip(DEFAULT_CLIP_PATH)
+
+    runs = {}
+    if args.mode in ("compare", "legacy"):
+        runs["legacy"] = run_legacy(video, display_size, args.warmup, args.frames)
+    if args.mode in ("compare", "pipeline"):
+        runs["pipeline"] = run_pipeline(video, args.fps, display_size, args.warmup, args.frames, args.roi)
+
+    report = {
+        "benchmark": "hands_hot_path",
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "source": args.video or f"benchmark_clip v{CLIP_VERSION}",
+        "display_size": list(display_size),
+        "machine": {
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+            "mediapipe": getattr(mp, "__version__", None),
+            "numpy": np.__version__,
+        },
+        **runs,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    if "legacy" in runs and "pipeline" in runs:
+        legacy_ms, pipeline_ms = runs["legacy"]["inference_ms"], runs["pipeline"]["inference_ms"]
+        if legacy_ms and pipeline_ms:
+            report["inference_speedup_p50"] = round(legacy_ms["p50"] / pipeline_ms["p50"], 2)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    status = 0
+    for name, run in runs.items():
+        if not run["frames_measured"]:
+            print(f"{name}: 没有可测量的帧", file=sys.stderr)
+            status = 1
+            continue
+        print(f"{name}: 吞吐量 {run['throughput_fps']} 帧/秒, 延迟 p50/p95 "
+              f"{run['latency_ms']['p50']}/{run['latency_ms']['p95']} ms, 推理 p50/p95 "
+              f"{run['inference_ms']['p50']}/{run['inference_ms']['p95']} ms, 检测到手 {run['hand_ratio']:.0%}")
+        if run["hand_ratio"] < args.min_hand_ratio:
+            print(f"  错误: 只有 {run['hand_ratio']:.0%} 的帧检测到手，请使用包含手的录像", file=sys.stderr)
+            status = 1
+    if "inference_speedup_p50" in report:
+        print(f"推理耗时 p50 加速比: {report['inference_speedup_p50']}x")
+    print(f"结果已写入 {args.output}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""主菜单背景粒子邻居搜索的基准测试，无需显示器
+
+对不同粒子数比较原先的两两比较（纯 Python 双重循环，每对一次 math.sqrt）和 ParticleField 的网格搜索，
+输出每帧的距离计算次数、连线数和耗时（含移动一步）。两种方法得到的连线集合会互相核对。
+
+用法示例:
+    python benchmark_particles.py --counts 80 500 1000 5000 --output bench_particles.json
+"""
+
+import argparse
+import json
+import math
+import platform
+import sys
+import time
+
+import numpy as np
+
+from particle_field import MIN_LINK_OPACITY, ParticleField
+
+
+def brute_force_links(positions, link_radius):
+    """原先 ParticleSystem.update 中的连线逻辑，返回 (连线集合, 距离计算次数)"""
+    points = positions.tolist()
+    links = set()
+    checks = 0
+    for i, (x1, y1) in enumerate(points):
+        for j in range(i + 1, len(points)):
+            x2, y2 = points[j]
+            dx = x1 - x2
+            dy = y1 - y2
+            distance = math.sqrt(dx * dx + dy * dy)
+            checks += 1
+            if distance < link_radius:
+                opacity = int(255 * (1 - distance / link_radius))
+                if opacity > MIN_LINK_OPACITY:
+                    links.add((i, j))
+    return links, checks
+
+
+def bench_count(count, frames, width, height, link_radius, max_brute):
+    field = ParticleField(width, height, count, link_radius, seed=0)
+    grid_ms, grid_checks, link_counts = [], [], []
+    brute_ms, brute_checks = [], []
+    mismatches = 0
+
+    for _ in range(frames):
+        t0 = time.perf_counter()
+        field.step()
+        first, second, _ = field.neighbour_links()
+        grid_ms.append((time.perf_counter() - t0) * 1000)
+        grid_checks.append(field.pair_checks)
+        link_counts.append(len(first))
+
+        if count <= max_brute:
+            t0 = time.perf_counter()
+            links, checks = brute_force_links(field.positions, link_radius)
+            brute_ms.append((time.perf_counter() - t0) * 1000)
+            brute_checks.append(checks)
+            # 网格给出的每对粒子顺序不固定，两边都按 (小下标, 大下标) 比较
+            grid_links = {(min(i, j), max(i, j)) for i, j in zip(first.tolist(), second.tolist())}
+            if {(min(i, j), max(i, j)) for i, j in links} != grid_links:
+                mismatches += 1
+
+    result = {
+        "particles": count,
+        "links_per_frame": round(float(np.mean(link_counts)), 1),
+        "grid": {
+            "pair_checks_per_frame": round(float(np.mean(grid_checks)), 1),
+            "ms_per_frame": round(float(np.mean(grid_ms)), 3),
+        },
+        "brute_force": None,
+    }
+    if brute_ms:
+        result["brute_force"] = {
+            "pair_checks_per_frame": brute_checks[0],
+            "ms_per_frame": round(float(np.mean(brute_ms)), 3),
+        }
+        result["mismatched_frames"] = mismatches
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="粒子邻居搜索基准测试")
+    parser.add_argument("--counts", type=int, nargs="+", default=[80, 500, 1000, 2000, 5000], help="粒子数")
+    parser.add_argument("--frames", type=int, default=30, help="每种粒子数测量的帧数")
+    parser.add_argument("--width", type=int, default=1280, help="画布宽度")
+    parser.add_argument("--height", type=int, default=800, help="画布高度")
+    parser.add_argument("--link-radius", type=float, default=100, help="连线距离阈值")
+    parser.add_argument("--max-brute", type=int, default=2000, help="超过该粒子数时不再运行两两比较（太慢）")
+    parser.add_argument("--output", default="bench_particles.json", help="结果 JSON 文件路径")
+    args = parser.parse_args(argv)
+
+    results = []
+    for count in args.counts:
+        result = bench_count(count, args.frames, args.width, args.height, args.link_radius, args.max_brute)
+        results.append(result)
+        brute = result["brute_force"]
+        print(f"{count} 个粒子: 网格 {result['grid']['pair_checks_per_frame']:.0f} 次比较 "
+              f"{result['grid']['ms_per_frame']} ms/帧"
+              + (f", 两两比较 {brute['pair_checks_per_frame']} 次 {brute['ms_per_frame']} ms/帧" if brute else ""))
+        if result.get("mismatched_frames"):
+            print(f"  警告: {result['mismatched_frames']} 帧的连线结果不一致", file=sys.stderr)
+
+    report = {
+        "benchmark": "particle_links",
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "canvas": [args.width, args.height],
+        "link_radius": args.link_radius,
+        "frames": args.frames,
+        "machine": {"platform": platform.platform(), "python": platform.python_version(),
+                    "numpy": np.__version__},
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入 {args.output}")
+    return 1 if any(r.get("mismatched_frames") for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
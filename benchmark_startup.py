@@ -0,0 +1,145 @@
+"""手势识别程序的启动耗时基准测试
+
+默认模式多次冷启动 hands_recognize.py（带 --startup-report 和 --exit-after-first-frame），
+汇总从发起启动到显示第一帧的耗时以及各启动阶段（窗口显示、导入 OpenCV / MediaPipe、模型加载、
+打开摄像头）的耗时。需要显示器和摄像头，可用 --source 指定视频文件代替摄像头。
+
+--headless 模式不启动界面，只在全新的解释器中分别测量 import cv2、import mediapipe
+和 Hands() 构造的耗时，可在无显示器的机器上运行。
+
+用法示例:
+    python benchmark_startup.py --runs 5 --source session.mp4 --output bench_startup.json
+    python benchmark_startup.py --headless --runs 5
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from startup_metrics import LAUNCH_TIME_ENV
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# --headless 模式下测量的阶段，每段代码在全新的解释器中执行，前面的代码不计时
+HEADLESS_STAGES = {
+    "import_cv2": ("", "import cv2"),
+    "import_mediapipe": ("", "import mediapipe"),
+    "hands_init": ("import mediapipe as mp",
+                   "mp.solutions.hands.Hands(min_detection_confidence=0.5, min_tracking_confidence=0.5)"),
+}
+
+
+def summarize(values_ms):
+    # 与 benchmark_hands.summarize 相同，不从那里导入以免本进程加载 OpenCV / MediaPipe
+    values = np.asarray(values_ms, dtype=np.float64)
+    if len(values) == 0:
+        return None
+    return {
+        "mean": round(float(values.mean()), 1),
+        "p50": round(float(np.percentile(values, 50)), 1),
+        "p95": round(float(np.percentile(values, 95)), 1),
+        "max": round(float(values.max()), 1),
+    }
+
+
+def run_gui_once(source=None, timeout=60):
+    """冷启动一次识别程序，返回它写出的启动报告"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        report_path = os.path.join(tmp_dir, "startup.json")
+        command = [sys.executable, os.path.join(SCRIPT_DIR, "hands_recognize.py"),
+                   "--startup-report", report_path, "--exit-after-first-frame"]
+        if source is not None:
+            command += ["--source", source]
+        env = dict(os.environ, **{LAUNCH_TIME_ENV: str(time.time())})
+        subprocess.run(command, env=env, cwd=SCRIPT_DIR, timeout=timeout, check=True,
+                       stdout=subprocess.DEVNULL)
+        if not os.path.exists(report_path):
+            raise RuntimeError("识别程序未显示第一帧就退出了")
+        with open(report_path, encoding="utf-8") as f:
+            return json.load(f)
+
+
+def run_headless_stage(setup, statement, timeout=120):
+    """在全新的解释器中执行 setup 后计时 statement，返回毫秒数"""
+    code = (f"import time\n{setup}\nt0 = time.perf_counter()\n{statement}\n"
+            f"print((time.perf_counter() - t0) * 1000)")
+    output = subprocess.run([sys.executable, "-c", code], cwd=SCRIPT_DIR, timeout=timeout, check=True,
+                            capture_output=True, text=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def benchmark_gui(runs, source=None):
+    reports = [run_gui_once(source) for _ in range(runs)]
+    phases = {}
+    for report in reports:
+        for phase, elapsed in report["phases_ms"].items():
+            phases.setdefault(phase, []).append(elapsed)
+    ttff = [r["time_to_first_frame_ms"] for r in reports if r["time_to_first_frame_ms"] is not None]
+    offsets = [r["launch_offset_ms"] for r in reports if r["launch_offset_ms"] is not None]
+    return {
+        "mode": "gui",
+        "runs": runs,
+        "source": source or "camera",
+        "time_to_first_frame_ms": summarize(ttff),
+        "launch_offset_ms": summarize(offsets),
+        "phases_ms": {phase: summarize(values) for phase, values in phases.items()},
+    }
+
+
+def benchmark_headless(runs):
+    stages = {name: [run_headless_stage(*HEADLESS_STAGES[name]) for _ in range(runs)]
+              for name in HEADLESS_STAGES}
+    return {
+        "mode": "headless",
+        "runs": runs,
+        "stages_ms": {name: summarize(values) for name, values in stages.items()},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="手势识别程序启动耗时基准测试")
+    parser.add_argument("--runs", type=int, default=5, help="冷启动次数")
+    parser.add_argument("--source", help="摄像头编号或视频文件，传给 hands_recognize.py")
+    parser.add_argument("--headless", action="store_true", help="不启动界面，只测量导入和模型构造耗时")
+    parser.add_argument("--output", default="bench_startup.json", help="结果 JSON 文件路径")
+    args = parser.parse_args(argv)
+
+    try:
+        report = benchmark_headless(args.runs) if args.headless else benchmark_gui(args.runs, args.source)
+    except (subprocess.SubprocessError, RuntimeError) as e:
+        print(f"启动测试失败: {e}", file=sys.stderr)
+        return 1
+
+    report = {
+        "benchmark": "startup",
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "machine": {
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "python": platform.python_version(),
+        },
+        **report,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.headless:
+        for name, stats in report["stages_ms"].items():
+            print(f"{name}: p50 {stats['p50']} ms, max {stats['max']} ms")
+    else:
+        stats = report["time_to_first_frame_ms"]
+        print(f"首帧耗时 p50/p95: {stats['p50']}/{stats['p95']} ms" if stats else "未取得首帧耗时")
+    print(f"结果已写入 {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
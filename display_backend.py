@@ -0,0 +1,117 @@
+"""视频画面的显示后端
+
+画布上只保留一个图像项和一个 PhotoImage，每帧把像素原地写入预分配的缓冲区再 paste 到
+同一个 PhotoImage 上，不再每帧新建 PhotoImage 和画布项。缩放几何只在画布尺寸或
+源图像尺寸变化时重新计算。
+
+渲染线程调用 render() 写入后台缓冲区，Tk 线程调用 present() 显示，二者通过三缓冲交换，
+互不等待。
+"""
+
+import threading
+
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+
+class CanvasDisplay:
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self._lock = threading.Lock()
+        self._canvas_size = None  # 由 <Configure> 事件更新
+        self._geometry_key = None  # (源宽, 源高, 画布宽, 画布高)
+        self._geometry = None  # (缩放后宽, 缩放后高, x 偏移, y 偏移)
+        self._generation = 0  # 几何变化时递增，Tk 线程据此重建 PhotoImage
+
+        # 三缓冲：back 由渲染线程写入，ready 为最新完成的帧，front 正在显示
+        self._resize_buffer = None
+        self._buffers = []
+        self._images = []
+        self._back, self._ready, self._front = 0, 1, 2
+        self._ready_fresh = False
+
+        # 仅在 Tk 线程中访问
+        self._photo = None
+        self._item = None
+        self._shown_generation = -1
+
+        # 统计：缓冲区 / PhotoImage 的分配次数，正常运行时只在尺寸变化时增加
+        self.buffer_allocations = 0
+        self.photo_allocations = 0
+
+        canvas.bind("<Configure>", self._on_configure, add="+")
+        # 画布可能在创建本对象之前就已布局完成，<Configure> 不会再次触发
+        width, height = canvas.winfo_width(), canvas.winfo_height()
+        if width > 1 and height > 1:
+            self._canvas_size = (width, height)
+
+    def _on_configure(self, event):
+        if event.width > 1 and event.height > 1:
+            self._canvas_size = (event.width, event.height)
+
+    def _update_geometry(self, src_w, src_h, canvas_w, canvas_h):
+        """尺寸变化时重新计算缩放几何并重新分配缓冲区"""
+        scale = min(canvas_w / src_w, canvas_h / src_h)
+        new_w, new_h = max(1, int(src_w * scale)), max(1, int(src_h * scale))
+        x_offset = (canvas_w - new_w) // 2
+        y_offset = (canvas_h - new_h) // 2
+
+        # RGBA 缓冲区可以被 PIL 直接共享内存，无需拷贝
+        buffers = [np.full((new_h, new_w, 4), 255, dtype=np.uint8) for _ in range(3)]
+        images = [Image.frombuffer("RGBA", (new_w, new_h), buf, "raw", "RGBA", 0, 1) for buf in buffers]
+
+        with self._lock:
+            self._resize_buffer = np.empty((new_h, new_w, 3), dtype=np.uint8)
+            self._buffers = buffers
+            self._images = images
+            self._geometry = (new_w, new_h, x_offset, y_offset)
+            self._geometry_key = (src_w, src_h, canvas_w, canvas_h)
+            self._generation += 1
+            self._ready_fresh = False
+        self.buffer_allocations += 1
+
+    def render(self, frame_rgb):
+        """在渲染线程中把一帧缩放写入后台缓冲区，画布尚未布局时返回 False"""
+        canvas_size = self._canvas_size
+        if canvas_size is None:
+            return False
+
+        src_h, src_w = frame_rgb.shape[:2]
+        if self._geometry_key != (src_w, src_h) + canvas_size:
+            self._update_geometry(src_w, src_h, *canvas_size)
+
+        new_w, new_h = self._geometry[:2]
+        back = self._buffers[self._back]
+        cv2.resize(frame_rgb, (new_w, new_h), dst=self._resize_buffer)
+        cv2.cvtColor(self._resize_buffer, cv2.COLOR_RGB2RGBA, dst=back)
+
+        with self._lock:
+            self._back, self._ready = self._ready, self._back
+            self._ready_fresh = True
+        return True
+
+    def present(self):
+        """在 Tk 线程中显示最新完成的帧，没有新帧时返回 False"""
+        with self._lock:
+            if not self._ready_fresh:
+                return False
+            self._front, self._ready = self._ready, self._front
+            self._ready_fresh = False
+            image = self._images[self._front]
+            generation = self._generation
+            new_w, new_h, x_offset, y_offset = self._geometry
+
+        if generation != self._shown_generation:
+            # 仅在尺寸变化时重建 PhotoImage，画布图像项始终复用
+            self._photo = ImageTk.PhotoImage("RGBA", (new_w, new_h))
+            self.photo_allocations += 1
+            if self._item is None:
+                self._item = self.canvas.create_image(x_offset, y_offset, anchor="nw", image=self._photo)
+            else:
+                self.canvas.coords(self._item, x_offset, y_offset)
+                self.canvas.itemconfig(self._item, image=self._photo)
+            self._shown_generation = generation
+
+        self._photo.paste(image)
+        return True
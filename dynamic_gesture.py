@@ -0,0 +1,274 @@
+"""动态手势（动作序列）的记录与流式匹配
+
+复健动作多是连续的运动（握拳-张开、转腕、手指轮流点击），只比较单帧姿态无法计数。
+这里把一段动作记录为特征轨迹作为模板，再用子序列 DTW（SPRING 算法）在实时特征流中寻找与模板相近的片段：
+
+* 每帧特征为各只手的 15 个关节角加手掌法向量（转腕时关节角不变，法向量会变）；
+* 模板与实时流都按 FEATURE_FPS 重采样，DTW 只保留一列（模板长度）的累计距离，
+  每帧一次向量化更新，内存固定、计算量与模板长度成正比，与已经运行的时间无关；
+* 匹配片段的时长限制在模板时长的 1/max_stretch 到 max_stretch 倍之间，
+  超出时长窗口的路径直接丢弃；
+* 找到的片段互不重叠，每完成一次动作 action_count 加 1。
+"""
+
+import io
+import os
+import threading
+import time
+
+import numpy as np
+
+from hand_features import detection_score, joint_angles, landmarks_to_array, palm_orientation
+
+FEATURE_FPS = 15.0  # 模板与实时流统一的特征帧率
+DEFAULT_THRESHOLD = 0.3  # 匹配路径上每帧特征的平均差（约为弧度），不超过该值视为完成一次动作
+MAX_STRETCH = 2.0  # 动作可以比模板快或慢的最大倍数
+GAP_RESET_S = 0.5  # 手离开画面超过该时长时，放弃正在进行的匹配
+MIN_TEMPLATE_S = 0.5
+
+
+def motion_features(hand_arrays, labels, aspect_ratio=None):
+    """{"Left"/"Right": (21, 3)} -> 一帧的特征向量（按 labels 顺序，每只手 15 个关节角 + 3 维手掌法向量）
+
+    缺少 labels 中的某只手时返回 None。aspect_ratio 为画面宽 / 高，用于把 x、z 还原为等比例坐标。
+    """
+    if any(label not in hand_arrays for label in labels):
+        return None
+    points = np.stack([hand_arrays[label] for label in labels]).astype(np.float32)
+    if aspect_ratio is not None:
+        points = points * np.array([aspect_ratio, 1.0, aspect_ratio], dtype=np.float32)
+    return np.concatenate([joint_angles(points), palm_orientation(points)], axis=-1).ravel()
+
+
+def resample(times, features, fps=FEATURE_FPS):
+    """不等间隔的特征序列 (N, D) 线性插值为固定帧率，返回 (帧数, D)"""
+    times = np.asarray(times, dtype=np.float64)
+    times = times - times[0]
+    grid = np.arange(0.0, times[-1] + 1e-9, 1.0 / fps)
+    return np.stack([np.interp(grid, times, features[:, d]) for d in range(features.shape[1])],
+                    axis=1).astype(np.float32)
+
+
+class MotionTemplate:
+    """记录的一段动作：固定帧率的特征轨迹"""
+
+    def __init__(self, labels, features, fps=FEATURE_FPS, thumbnail=None, frame=None):
+        self.labels = list(labels)
+        self.features = features  # (帧数, 特征维数)
+        self.fps = fps
+        self.thumbnail = thumbnail  # 已缩放的 RGB 缩略图，保存时一并写入
+        self.frame = frame  # 记录时检测得分最高的一帧原始 BGR 画面
+
+    @property
+    def duration_s(self):
+        return len(self.features) / self.fps
+
+    def save(self, path):
+        buffer = io.BytesIO()
+        arrays = {"labels": np.array(self.labels), "features": self.features, "fps": np.float32(self.fps)}
+        if self.thumbnail is not None:
+            arrays["thumbnail"] = self.thumbnail
+        np.savez(buffer, **arrays)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(buffer.getvalue())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls([str(label) for label in data["labels"]], data["features"].astype(np.float32),
+                       float(data["fps"]), data["thumbnail"] if "thumbnail" in data else None)
+
+
+class TrajectoryCapture:
+    """在窗口时间内收集关键点轨迹，接口与 gesture_capture.CaptureWindow 相同（提交给流水线，由推理线程喂入）"""
+
+    def __init__(self, window_s=3.0, min_score=0.8, aspect_ratio=None):
+        self.deadline = time.perf_counter() + window_s
+        self.min_score = min_score
+        self.aspect_ratio = aspect_ratio
+        self.samples = []  # [(采集时间, {"Left"/"Right": (21, 3)})]
+        self.frames_considered = 0
+        self._best_frame = None
+        self._best_score = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    def offer(self, packet):
+        """推理线程调用，返回 True 表示已完成"""
+        with self._lock:
+            if not self._done.is_set():
+                self._collect(packet)
+        if time.perf_counter() >= self.deadline:
+            self._done.set()
+        return self._done.is_set()
+
+    def _collect(self, packet):
+        results = packet.results
+        self.frames_considered += 1
+        if not results.multi_hand_landmarks:
+            return
+        arrays = {}
+        for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
+            classification = handedness.classification[0]
+            if classification.score >= self.min_score:
+                arrays[classification.label] = landmarks_to_array(hand_landmarks)
+        if arrays:
+            self.samples.append((packet.t_capture, arrays))
+        score = detection_score(results)
+        if self._best_score is None or score > self._best_score:
+            self._best_frame, self._best_score = packet.frame, score
+
+    def done(self):
+        if not self._done.is_set() and time.perf_counter() >= self.deadline:
+            with self._lock:
+                self._done.set()
+        return self._done.is_set()
+
+    def result(self):
+        """返回 MotionTemplate；有效轨迹太短时返回 None。需在 done() 为真之后调用"""
+        if not self.samples:
+            return None
+        # 只在少数帧中出现的手视为误检，模板只包含大部分帧里都有的手
+        counts = {}
+        for _, arrays in self.samples:
+            for label in arrays:
+                counts[label] = counts.get(label, 0) + 1
+        labels = sorted(label for label, count in counts.items() if count * 2 >= len(self.samples))
+        times, features = [], []
+        for t, arrays in self.samples:
+            feature = motion_features(arrays, labels, self.aspect_ratio)
+            if feature is not None:
+                times.append(t)
+                features.append(feature)
+        if len(times) < 2 or times[-1] - times[0] < MIN_TEMPLATE_S:
+            return None
+        return MotionTemplate(labels, resample(times, np.stack(features)), frame=self._best_frame)
+
+
+class StreamingDTW:
+    """子序列 DTW（SPRING）：在特征流中找出与模板相近、互不重叠的片段
+
+    只保存当前一列（每个模板帧一个格子）的累计距离、路径起点和路径长度。同一列内的递推
+    D[i] = c[i] + min(D[i-1], P[i]) 用前缀和改写为 D = C + 累计最小值(P - C + c)，整列一次向量化完成。
+    比较的是路径上的平均距离，快慢不同的动作可以用同一个阈值。
+    """
+
+    def __init__(self, template_features, threshold=DEFAULT_THRESHOLD, min_duration=0.0, max_duration=np.inf,
+                 patience=None):
+        self.template = np.asarray(template_features, dtype=np.float32)
+        self.threshold = threshold
+        self.min_duration = min_duration
+        self.max_duration = max_duration
+        # 候选片段最多等待这么久没有更好的重叠片段即确认，默认为半个窗口
+        self.patience = patience if patience is not None else min(max_duration, 10.0) / 2
+        self._positions = np.arange(len(self.template))
+        self.reset()
+
+    def reset(self):
+        size = len(self.template) + 1  # 第 0 格为 "从当前帧开始" 的虚拟起点
+        self._cost = np.full(size, np.inf)
+        self._cost[0] = 0.0
+        self._start = np.zeros(size)
+        self._length = np.zeros(size)
+        self._candidate = None  # (平均距离, 起始时间, 结束时间)
+        self.average = np.full(size - 1, np.inf)  # 以各模板帧结尾的最佳路径的平均距离
+
+    def update(self, feature, t):
+        """输入一帧特征，确认一次匹配时返回 (平均距离, 起始时间, 结束时间)，否则返回 None"""
+        local = np.abs(self.template - feature).mean(axis=1)
+        cost, start, length = self._cost, self._start, self._length
+        start[0] = t
+
+        # 来自上一列：对角（i-1）优先于水平（i）
+        diagonal = cost[:-1] <= cost[1:]
+        prev_cost = np.where(diagonal, cost[:-1], cost[1:])
+        prev_start = np.where(diagonal, start[:-1], start[1:])
+        prev_length = np.where(diagonal, length[:-1], length[1:])
+
+        # 同一列内的竖直步：取 k <= i 中 prev_cost[k] + sum(local[k..i]) 最小的 k
+        cumulative = np.cumsum(local)
+        values = prev_cost - (cumulative - local)
+        running = np.minimum.accumulate(values)
+        best_k = np.maximum.accumulate(np.where(values <= running, self._positions, 0))
+
+        cost[1:] = cumulative + running
+        start[1:] = prev_start[best_k]
+        length[1:] = prev_length[best_k] + (self._positions - best_k + 1)
+        cost[1:][t - start[1:] > self.max_duration] = np.inf  # 超出时长窗口的路径不再延伸
+        self.average = cost[1:] / length[1:]
+
+        match = None
+        if self._candidate is not None:
+            best, _, end = self._candidate
+            overlapping = start[1:] <= end
+            if t - end >= self.patience or not np.any(overlapping & (self.average < best)):
+                match = self._candidate
+                self._candidate = None
+                cost[1:][overlapping] = np.inf  # 与已确认片段重叠的路径作废，下一次动作重新开始
+                self.average = cost[1:] / length[1:]
+
+        end_average = self.average[-1]
+        if (end_average <= self.threshold and t - start[-1] >= self.min_duration
+                and (self._candidate is None or end_average < self._candidate[0])):
+            self._candidate = (float(end_average), float(start[-1]), float(t))
+        return match
+
+    def progress(self):
+        """当前最可能进行到模板的哪一部分（0-1），没有足够接近的路径时为 0"""
+        index = int(np.argmin(self.average))
+        if not self.average[index] <= self.threshold:
+            return 0.0
+        return (index + 1) / len(self.template)
+
+
+class DynamicGestureMatcher:
+    """动态手势计数：实时特征流中每出现一次与模板相近的动作，action_count 加 1"""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, max_stretch=MAX_STRETCH, aspect_ratio=None):
+        self.threshold = threshold
+        self.max_stretch = max_stretch
+        self.aspect_ratio = aspect_ratio
+        self.template = None
+        self.action_count = 0
+        self.last_match = None  # (平均距离, 起始时间, 结束时间)
+        self._dtw = None
+        self._last_sample = None
+        self._last_seen = None
+
+    @property
+    def has_reference(self):
+        return self.template is not None
+
+    def set_reference(self, template):
+        self.template = template
+        self._dtw = StreamingDTW(template.features, self.threshold,
+                                 min_duration=template.duration_s / self.max_stretch,
+                                 max_duration=template.duration_s * self.max_stretch)
+        self._last_sample = self._last_seen = None
+
+    def update(self, hand_arrays, t):
+        """输入一帧（平滑后的）关键点和采集时间，完成一次动作时返回 "match"，否则返回 None"""
+        if self._dtw is None:
+            return None
+        # 按模板帧率抽样，实时流与模板的时间尺度一致
+        if self._last_sample is not None and t - self._last_sample < 0.75 / self.template.fps:
+            return None
+        feature = motion_features(hand_arrays, self.template.labels, self.aspect_ratio)
+        if feature is None:
+            if self._last_seen is not None and t - self._last_seen > GAP_RESET_S:
+                self._dtw.reset()
+                self._last_seen = None
+            return None
+        self._last_sample = self._last_seen = t
+
+        match = self._dtw.update(feature, t)
+        if match is None:
+            return None
+        self.action_count += 1
+        self.last_match = match
+        return "match"
+
+    def progress(self):
+        return self._dtw.progress() if self._dtw is not None else 0.0
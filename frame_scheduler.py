@@ -0,0 +1,101 @@
+"""自适应跳帧调度器
+
+记录每个阶段（采集、颜色转换、推理、绘制、缩放、Tk 显示）的耗时，
+端到端延迟超过预算时隔帧跳过推理并复用上一次的关键点，有余量时逐步恢复。
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+
+class AdaptiveScheduler:
+    def __init__(self, target_latency_ms=80, max_stride=4, ema_alpha=0.1,
+                 headroom=0.7, adjust_interval=15, min_poll_ms=5, max_poll_ms=40):
+        self.target_latency_ms = target_latency_ms  # 端到端延迟预算
+        self.max_stride = max_stride  # 最多每 N 帧推理一次
+        self.ema_alpha = ema_alpha
+        self.headroom = headroom  # 延迟低于预算的该比例时提高推理频率
+        self.adjust_interval = adjust_interval  # 每显示多少帧调整一次
+        self.min_poll_ms = min_poll_ms
+        self.max_poll_ms = max_poll_ms
+
+        self.stride = 1  # 每 stride 帧推理一次
+        self.poll_ms = min_poll_ms
+        self._lock = threading.Lock()
+        self._stage_ms = {}
+        self._latency_ms = None
+        self._frame_interval_ms = None
+        self._last_display = None
+        self._frame_index = 0
+        self._frames_since_adjust = 0
+        self.inferred_frames = 0
+        self.skipped_frames = 0
+
+    def record(self, stage, elapsed_ms):
+        """以指数滑动平均记录某阶段耗时（毫秒）"""
+        with self._lock:
+            previous = self._stage_ms.get(stage)
+            self._stage_ms[stage] = elapsed_ms if previous is None else (
+                previous + self.ema_alpha * (elapsed_ms - previous))
+
+    @contextmanager
+    def timed(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, (time.perf_counter() - start) * 1000)
+
+    def should_infer(self):
+        """由推理线程每帧调用，返回 False 表示本帧复用上一帧的关键点"""
+        with self._lock:
+            infer = self._frame_index % self.stride == 0
+            self._frame_index += 1
+            if infer:
+                self.inferred_frames += 1
+            else:
+                self.skipped_frames += 1
+            return infer
+
+    def frame_displayed(self, latency_ms):
+        """由 Tk 线程在每帧显示后调用，根据延迟调整推理间隔"""
+        now = time.perf_counter()
+        with self._lock:
+            if self._last_display is not None:
+                interval = (now - self._last_display) * 1000
+                self._frame_interval_ms = interval if self._frame_interval_ms is None else (
+                    self._frame_interval_ms + self.ema_alpha * (interval - self._frame_interval_ms))
+            self._last_display = now
+            self._latency_ms = latency_ms if self._latency_ms is None else (
+                self._latency_ms + self.ema_alpha * (latency_ms - self._latency_ms))
+
+            self._frames_since_adjust += 1
+            if self._frames_since_adjust < self.adjust_interval:
+                return
+            self._frames_since_adjust = 0
+
+            if self._latency_ms > self.target_latency_ms and self.stride < self.max_stride:
+                self.stride += 1
+            elif self._latency_ms < self.target_latency_ms * self.headroom and self.stride > 1:
+                self.stride -= 1
+
+    def next_poll_delay(self, got_frame):
+        """Tk 轮询间隔：没有新帧时逐渐放慢，有新帧时回到最小间隔"""
+        if got_frame:
+            self.poll_ms = self.min_poll_ms
+        else:
+            self.poll_ms = min(self.max_poll_ms, self.poll_ms + 1)
+        return self.poll_ms
+
+    def stats(self):
+        with self._lock:
+            total = self.inferred_frames + self.skipped_frames
+            return {
+                "fps": 1000 / self._frame_interval_ms if self._frame_interval_ms else 0.0,
+                "latency_ms": self._latency_ms,
+                "target_latency_ms": self.target_latency_ms,
+                "inference_stride": self.stride,
+                "skip_ratio": self.skipped_frames / total if total else 0.0,
+                "stage_ms": dict(self._stage_ms),
+            }
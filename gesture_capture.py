@@ -0,0 +1,106 @@
+"""多帧平均的手势记录
+
+CaptureWindow 通过 GesturePipeline.submit() 提交给流水线，由推理线程把每个推理过的帧喂入（不额外读取摄像头）：
+在窗口时间内收集每只手的关键点，丢弃左右手分类置信度低于 min_score 的检测，
+窗口结束后对每只手取中位数，去掉离中位数过远的帧（运动模糊、误检），
+再对剩余帧求平均姿态和逐关键点方差。匹配时方差大的手指会被放宽（见 gesture_matcher）。
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from gesture_matcher import tolerant_fold_state_tuples
+from hand_features import detection_score, landmarks_to_array
+
+OUTLIER_MADS = 3.0  # 离中位数超过 中位误差 + 3 倍 MAD 的帧视为异常
+
+
+class CapturedGesture:
+    """多帧平均得到的参考手势"""
+
+    def __init__(self, hand_arrays, hand_variances, frame, frames_used, frames_rejected):
+        self.hand_arrays = hand_arrays  # {"Left"/"Right": (21, 3) 平均姿态}
+        self.hand_variances = hand_variances  # {"Left"/"Right": (21, 3) 逐关键点方差}
+        self.frame = frame  # 检测得分最高的一帧原始 BGR 画面，用于缩略图
+        self.frames_used = frames_used  # {"Left"/"Right": 参与平均的帧数}
+        self.frames_rejected = frames_rejected  # 因置信度过低被丢弃的检测数
+
+    def finger_states(self):
+        return tolerant_fold_state_tuples(self.hand_arrays, self.hand_variances)
+
+    def metadata(self):
+        return {"capture": "multi_frame", "frames_used": self.frames_used,
+                "frames_rejected": self.frames_rejected}
+
+
+def robust_mean(samples):
+    """samples 为 (N, 21, 3)，去掉异常帧后返回 (平均姿态, 逐关键点方差, 使用的帧数)"""
+    median = np.median(samples, axis=0)
+    error = np.linalg.norm(samples - median, axis=-1).mean(axis=-1)  # 每帧到中位姿态的平均距离
+    center = np.median(error)
+    mad = np.median(np.abs(error - center))
+    inliers = samples[error <= center + OUTLIER_MADS * 1.4826 * mad + 1e-6]
+    return inliers.mean(axis=0), inliers.var(axis=0), len(inliers)
+
+
+class CaptureWindow:
+    def __init__(self, window_s=1.0, min_score=0.8, min_frames=5):
+        self.deadline = time.perf_counter() + window_s
+        self.min_score = min_score
+        self.min_frames = min_frames
+        self.samples = {}  # 左右手标签 -> [(21, 3) 数组]
+        self.rejected = 0
+        self.frames_considered = 0
+        self._best_frame = None
+        self._best_score = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    def offer(self, packet):
+        """推理线程调用，返回 True 表示已完成"""
+        with self._lock:
+            if not self._done.is_set():
+                self._collect(packet)
+        if time.perf_counter() >= self.deadline:
+            self._done.set()
+        return self._done.is_set()
+
+    def _collect(self, packet):
+        results = packet.results
+        self.frames_considered += 1
+        if results.multi_hand_landmarks:
+            for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
+                classification = handedness.classification[0]
+                if classification.score < self.min_score:
+                    self.rejected += 1
+                    continue
+                self.samples.setdefault(classification.label, []).append(landmarks_to_array(hand_landmarks))
+            score = detection_score(results)
+            if self._best_score is None or score > self._best_score:
+                self._best_frame, self._best_score = packet.frame, score
+
+    def done(self):
+        if not self._done.is_set() and time.perf_counter() >= self.deadline:
+            with self._lock:
+                self._done.set()
+        return self._done.is_set()
+
+    def result(self):
+        """返回 CapturedGesture；有效帧不足时返回 None。需在 done() 为真之后调用"""
+        if not self.samples:
+            return None
+        # 只在少数帧中出现的手视为误检
+        most = max(len(frames) for frames in self.samples.values())
+        hand_arrays, hand_variances, frames_used = {}, {}, {}
+        for label, frames in self.samples.items():
+            if len(frames) < max(self.min_frames, most // 2):
+                continue
+            mean, variance, used = robust_mean(np.stack(frames))
+            if used < self.min_frames:
+                continue
+            hand_arrays[label], hand_variances[label], frames_used[label] = mean, variance, used
+        if not hand_arrays:
+            return None
+        return CapturedGesture(hand_arrays, hand_variances, self._best_frame, frames_used, self.rejected)
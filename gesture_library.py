@@ -0,0 +1,166 @@
+"""多手势模板库
+
+按左右手分别保存任意多个录制的手势（归一化后的关键点向量 + 手指折叠状态），
+模板预先拼成一个 (模板数, 63) 的矩阵，每帧只需一次矩阵乘法就能求出与全部模板的距离，
+模板增加到几千个时查询耗时基本不变。模板库可保存为 .npz 文件。
+
+MediaPipe 的 x、y 分别按画面宽、高归一化，直接归一化旋转会随画面宽高比变形。添加和查询时按各自画面的
+aspect_ratio（宽 / 高）先把 x、z 还原为等比例坐标，模板以等比例坐标保存，不同宽高比的图片和摄像头可以互相比较。
+
+用法示例（从图片建立模板库）:
+    python gesture_library.py library.npz fist=fist.png open=open_hand.png
+实时界面中显示每只手最接近的模板:
+    python hands_recognize.py --library library.npz
+"""
+
+import sys
+
+import numpy as np
+
+from hand_features import NUM_LANDMARKS, fold_states, normalize_landmarks
+
+HAND_LABELS = ("Left", "Right")
+VECTOR_SIZE = NUM_LANDMARKS * 3
+
+
+def _isotropic(points, aspect_ratio):
+    points = np.asarray(points, dtype=np.float32)
+    if aspect_ratio is None:
+        return points
+    return points * np.array([aspect_ratio, 1.0, aspect_ratio], dtype=np.float32)
+
+
+class GestureTemplateLibrary:
+    def __init__(self, aspect_ratio=None):
+        """aspect_ratio 为默认的画面宽 / 高，add / classify 未给出 aspect_ratio 时使用，随模板库一起保存"""
+        self.aspect_ratio = aspect_ratio
+        self._names = {label: [] for label in HAND_LABELS}
+        self._vectors = {label: np.empty((0, VECTOR_SIZE), dtype=np.float32) for label in HAND_LABELS}
+        self._sq_norms = {label: np.empty(0, dtype=np.float32) for label in HAND_LABELS}
+        self._folds = {label: np.empty((0, 5), dtype=bool) for label in HAND_LABELS}
+
+    def __len__(self):
+        return sum(len(names) for names in self._names.values())
+
+    def names(self, hand_label):
+        return list(self._names[hand_label])
+
+    def _ratio(self, aspect_ratio):
+        return self.aspect_ratio if aspect_ratio is None else aspect_ratio
+
+    def add(self, name, hand_label, points, aspect_ratio=None):
+        """添加一个模板，points 为该手的 (21, 3) 关键点，aspect_ratio 为其所在画面的宽 / 高"""
+        self.add_many([name], hand_label, np.asarray(points, dtype=np.float32)[None], aspect_ratio)
+
+    def add_many(self, names, hand_label, points, aspect_ratio=None):
+        """批量添加模板，points 形状为 (N, 21, 3)"""
+        points = _isotropic(points, self._ratio(aspect_ratio))
+        vectors = normalize_landmarks(points).reshape(len(points), VECTOR_SIZE)
+        self._names[hand_label].extend(names)
+        self._vectors[hand_label] = np.concatenate([self._vectors[hand_label], vectors])
+        self._sq_norms[hand_label] = np.einsum("ij,ij->i", self._vectors[hand_label], self._vectors[hand_label])
+        self._folds[hand_label] = np.concatenate([self._folds[hand_label], fold_states(points)])
+
+    def classify_batch(self, hand_label, points, k=1, require_fold_match=False, aspect_ratio=None):
+        """对 (N, 21, 3) 的关键点一次性查询最近的 k 个模板，aspect_ratio 为查询画面的宽 / 高
+
+        返回 (模板下标 (N, k), 归一化欧氏距离 (N, k))；require_fold_match 为 True 时，
+        折叠状态与查询不一致的模板距离记为 inf。
+        """
+        templates = self._vectors[hand_label]
+        points = _isotropic(points, self._ratio(aspect_ratio))
+        count = len(points)
+        if len(templates) == 0:
+            return np.empty((count, 0), dtype=np.int64), np.empty((count, 0), dtype=np.float32)
+
+        queries = normalize_landmarks(points).reshape(count, VECTOR_SIZE)
+        # |q - t|^2 = |q|^2 + |t|^2 - 2 q·t，一次矩阵乘法得到全部距离
+        sq_dist = (np.einsum("ij,ij->i", queries, queries)[:, None]
+                   + self._sq_norms[hand_label][None, :]
+                   - 2.0 * queries @ templates.T)
+        distances = np.sqrt(np.maximum(sq_dist, 0.0))
+
+        if require_fold_match:
+            same_folds = np.all(fold_states(points)[:, None, :] == self._folds[hand_label][None, :, :], axis=-1)
+            distances = np.where(same_folds, distances, np.inf)
+
+        k = min(k, len(templates))
+        if k < len(templates):
+            nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        else:
+            nearest = np.broadcast_to(np.arange(k), (count, k))
+        nearest_dist = np.take_along_axis(distances, nearest, axis=1)
+        order = np.argsort(nearest_dist, axis=1)
+        return np.take_along_axis(nearest, order, axis=1), np.take_along_axis(nearest_dist, order, axis=1)
+
+    def classify(self, hand_label, points, k=1, max_distance=None, require_fold_match=False, aspect_ratio=None):
+        """对单只手查询最近的模板，返回 [(名称, 距离), ...]，按距离从小到大"""
+        indices, distances = self.classify_batch(hand_label, np.asarray(points)[None], k, require_fold_match,
+                                                 aspect_ratio)
+        names = self._names[hand_label]
+        return [
+            (names[i], float(d)) for i, d in zip(indices[0], distances[0])
+            if np.isfinite(d) and (max_distance is None or d <= max_distance)
+        ]
+
+    def save(self, path):
+        arrays = {"aspect_ratio": np.float32(np.nan if self.aspect_ratio is None else self.aspect_ratio)}
+        for label in HAND_LABELS:
+            arrays[f"{label}_names"] = np.array(self._names[label], dtype=str)
+            arrays[f"{label}_vectors"] = self._vectors[label]
+            arrays[f"{label}_folds"] = self._folds[label]
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        library = cls()
+        with np.load(path) as data:
+            if "aspect_ratio" in data and np.isfinite(data["aspect_ratio"]):  # 旧版模板库没有该项
+                library.aspect_ratio = float(data["aspect_ratio"])
+            for label in HAND_LABELS:
+                library._names[label] = [str(n) for n in data[f"{label}_names"]]
+                library._vectors[label] = data[f"{label}_vectors"].astype(np.float32)
+                library._folds[label] = data[f"{label}_folds"].astype(bool)
+                library._sq_norms[label] = np.einsum("ij,ij->i", library._vectors[label], library._vectors[label])
+        return library
+
+
+def main(argv=None):
+    import cv2
+    import mediapipe as mp
+
+    from hand_features import results_to_arrays
+
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 2:
+        print("用法: python gesture_library.py library.npz 名称=图片 [名称=图片 ...]", file=sys.stderr)
+        return 1
+
+    library_path, entries = argv[0], argv[1:]
+    try:
+        library = GestureTemplateLibrary.load(library_path)
+    except FileNotFoundError:
+        library = GestureTemplateLibrary()
+
+    with mp.solutions.hands.Hands(static_image_mode=True, min_detection_confidence=0.5) as hands:
+        for entry in entries:
+            name, _, image_path = entry.partition("=")
+            image = cv2.imread(image_path)
+            if image is None:
+                print(f"无法读取图片: {image_path}", file=sys.stderr)
+                continue
+            hand_arrays = results_to_arrays(hands.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB)))
+            if not hand_arrays:
+                print(f"未检测到手: {image_path}", file=sys.stderr)
+            height, width = image.shape[:2]
+            for label, points in hand_arrays.items():
+                library.add(name, label, points, aspect_ratio=width / height)
+                print(f"已添加模板 {name} ({label})")
+
+    library.save(library_path)
+    print(f"模板库共 {len(library)} 个模板")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
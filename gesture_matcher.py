@@ -0,0 +1,99 @@
+"""手势匹配逻辑，不依赖界面和摄像头，界面程序和离线批处理共用"""
+
+from hand_features import fold_margin_std, fold_margins, fold_states, landmarks_to_array, results_to_arrays
+
+# 参考手势中某根手指的弯曲余量小于 VARIANCE_TOLERANCE 倍标准差时，视为不确定，匹配时不比较
+VARIANCE_TOLERANCE = 2.0
+# 连续相似度（见 gesture_similarity）达到该值视为匹配
+DEFAULT_SIMILARITY_THRESHOLD = 0.8
+
+
+def get_finger_fold_state(hand_landmarks):
+    """计算手指折叠状态"""
+    return tuple(fold_states(landmarks_to_array(hand_landmarks)).tolist())
+
+
+def fold_state_tuples(hand_arrays):
+    """{"Left"/"Right": (21, 3) 数组} -> {"Left"/"Right": 折叠状态}"""
+    return {label: tuple(fold_states(points).tolist()) for label, points in hand_arrays.items()}
+
+
+def tolerant_fold_state_tuples(hand_arrays, hand_variances, k=VARIANCE_TOLERANCE):
+    """考虑关键点方差的折叠状态：不确定的手指为 None（匹配时忽略）"""
+    states = {}
+    for label, points in hand_arrays.items():
+        variance = hand_variances.get(label)
+        if variance is None:
+            states[label] = tuple(fold_states(points).tolist())
+            continue
+        margins = fold_margins(points)
+        certain = abs(margins) > k * fold_margin_std(variance)
+        states[label] = tuple(bool(m > 0) if c else None for m, c in zip(margins.tolist(), certain.tolist()))
+    return states
+
+
+def states_match(detected_finger_states, recorded_finger_states):
+    """两侧检测到的手相同，且每根手指的折叠状态一致（参考中为 None 的手指不比较）"""
+    if detected_finger_states.keys() != recorded_finger_states.keys():
+        return False
+    for label, recorded in recorded_finger_states.items():
+        detected = detected_finger_states[label]
+        if any(r is not None and d != r for d, r in zip(detected, recorded)):
+            return False
+    return True
+
+
+def extract_finger_states(results):
+    """从 hands.process 的结果中提取 {"Left"/"Right": 折叠状态}"""
+    return fold_state_tuples(results_to_arrays(results))
+
+
+class GestureMatcher:
+    """比较实时手势与记录的手势，只在由不匹配变为匹配时计数
+
+    传入 decision（gesture_smoothing.DecisionEngine）时，逐帧的比较结果先经过多数投票和去抖。
+    除了比较折叠状态（update），也可以直接输入连续相似度（update_similarity，见 gesture_similarity）。
+    """
+
+    def __init__(self, recorded_finger_states=None, decision=None, similarity_threshold=DEFAULT_SIMILARITY_THRESHOLD):
+        self.recorded_finger_states = dict(recorded_finger_states or {})
+        self.decision = decision
+        self.similarity_threshold = similarity_threshold
+        self.previous_state = False
+        self.current_state = False
+        self.action_count = 0
+
+    @property
+    def has_reference(self):
+        return bool(self.recorded_finger_states)
+
+    def set_reference(self, recorded_finger_states):
+        """替换记录的手势，计数保留"""
+        self.recorded_finger_states = dict(recorded_finger_states)
+        self.previous_state = False
+        self.current_state = False
+        if self.decision is not None:
+            self.decision.reset()
+
+    def update(self, detected_finger_states):
+        """输入一帧检测结果，返回 "match"（新匹配）、"release"（匹配结束）或 None"""
+        if not self.has_reference:
+            return None
+        return self._apply(states_match(detected_finger_states, self.recorded_finger_states))
+
+    def update_similarity(self, similarity):
+        """输入一帧的相似度（0-1），达到 similarity_threshold 视为匹配，返回值同 update()"""
+        if not self.has_reference:
+            return None
+        return self._apply(similarity >= self.similarity_threshold)
+
+    def _apply(self, raw_match):
+        event = None
+        self.current_state = raw_match if self.decision is None else self.decision.update(raw_match)
+        if self.current_state and not self.previous_state:
+            self.action_count += 1
+            event = "match"
+        elif not self.current_state and self.previous_state:
+            event = "release"
+        self.previous_state = self.current_state
+        return event
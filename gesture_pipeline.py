@@ -0,0 +1,201 @@
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+
+import cv2
+
+
+class DropOldestQueue:
+    """有界队列：写满时丢弃最旧的元素，消费者总能拿到较新的数据"""
+
+    def __init__(self, maxsize=2):
+        self._items = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """阻塞取出最旧的元素，超时或队列关闭时返回 None"""
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout)
+            if self._items:
+                return self._items.popleft()
+            return None
+
+    def get_latest(self):
+        """非阻塞取出最新的元素，并丢弃其余旧元素"""
+        with self._cond:
+            if not self._items:
+                return None
+            self.dropped += len(self._items) - 1
+            item = self._items[-1]
+            self._items.clear()
+            return item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class FramePacket:
+    """在流水线各阶段之间传递的一帧数据及其时间戳"""
+
+    __slots__ = ("seq", "frame", "frame_rgb", "results", "inferred",
+                 "t_capture", "t_inferred", "t_rendered", "latency_ms")
+
+    def __init__(self, seq, frame, t_capture):
+        self.seq = seq
+        self.frame = frame
+        self.frame_rgb = None
+        self.results = None
+        self.inferred = False  # False 表示复用了上一帧的推理结果
+        self.t_capture = t_capture
+        self.t_inferred = None
+        self.t_rendered = None
+        self.latency_ms = None
+
+
+class GesturePipeline:
+    """采集线程 -> 推理线程 -> 渲染线程，各阶段之间用丢弃最旧帧的有界队列连接
+
+    渲染线程把画面写入 display（见 display_backend.CanvasDisplay）的后台缓冲区，
+    Tk 线程只需调用 latest() 取出最新渲染好的帧并让 display 显示。
+    传入 scheduler 时记录各阶段耗时，并由其决定是否跳过某帧的推理。
+    """
+
+    def __init__(self, capture, process_fn, render_fn=None, display=None, queue_size=2, scheduler=None):
+        self.capture = capture
+        self.process_fn = process_fn  # frame_rgb -> results
+        self.render_fn = render_fn  # (frame_rgb, results) -> None，原地绘制
+        self.display = display  # render(frame_rgb) -> bool，在渲染线程中缩放写入显示缓冲区
+        self.scheduler = scheduler
+        self._last_results = None
+        self._requests = []
+        self._requests_lock = threading.Lock()
+
+        self._capture_queue = DropOldestQueue(queue_size)
+        self._inference_queue = DropOldestQueue(queue_size)
+        self._display_queue = DropOldestQueue(1)
+        self._running = False
+        self._threads = []
+        self._seq = 0
+
+        # 延迟统计
+        self._latency_history = deque(maxlen=100)
+        self.frames_displayed = 0
+
+    def _timed(self, stage):
+        return self.scheduler.timed(stage) if self.scheduler is not None else nullcontext()
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        for target, name in [
+            (self._capture_loop, "capture"),
+            (self._inference_loop, "inference"),
+            (self._render_loop, "render"),
+        ]:
+            thread = threading.Thread(target=target, name=f"pipeline-{name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._running = False
+        for q in (self._capture_queue, self._inference_queue, self._display_queue):
+            q.close()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self._threads = []
+
+    def latest(self):
+        """返回最新渲染完成的帧（没有新帧时返回 None），并记录端到端延迟"""
+        packet = self._display_queue.get_latest()
+        if packet is not None:
+            packet.latency_ms = (time.perf_counter() - packet.t_capture) * 1000
+            self._latency_history.append(packet.latency_ms)
+            self.frames_displayed += 1
+            if self.scheduler is not None:
+                self.scheduler.frame_displayed(packet.latency_ms)
+        return packet
+
+    def submit(self, request):
+        """提交一个请求（offer / done / result 接口，如 gesture_capture.CaptureWindow），
+        之后每次推理的帧都会交给它，直到 offer() 返回 True"""
+        if not request.done():
+            with self._requests_lock:
+                self._requests.append(request)
+        return request
+
+    def _offer_requests(self, packet):
+        with self._requests_lock:
+            if self._requests:
+                self._requests = [r for r in self._requests if not r.offer(packet)]
+
+    def stats(self):
+        """返回延迟与丢帧统计"""
+        history = self._latency_history
+        return {
+            "frames_displayed": self.frames_displayed,
+            "latency_ms": history[-1] if history else None,
+            "mean_latency_ms": sum(history) / len(history) if history else None,
+            "dropped_capture": self._capture_queue.dropped,
+            "dropped_inference": self._inference_queue.dropped,
+            "dropped_display": self._display_queue.dropped,
+        }
+
+    def _capture_loop(self):
+        while self._running:
+            with self._timed("capture"):
+                ret, frame = self.capture.read()
+            if not ret or frame is None:
+                time.sleep(0.01)
+                continue
+            self._seq += 1
+            self._capture_queue.put(FramePacket(self._seq, frame, time.perf_counter()))
+
+    def _inference_loop(self):
+        while self._running:
+            packet = self._capture_queue.get(timeout=0.1)
+            if packet is None:
+                continue
+            with self._timed("convert"):
+                packet.frame_rgb = cv2.cvtColor(packet.frame, cv2.COLOR_BGR2RGB)
+
+            # 超出延迟预算时跳过推理，复用上一帧的关键点
+            if (self._last_results is None or self.scheduler is None
+                    or self.scheduler.should_infer()):
+                with self._timed("inference"):
+                    self._last_results = self.process_fn(packet.frame_rgb)
+                packet.inferred = True
+            packet.results = self._last_results
+            packet.t_inferred = time.perf_counter()
+            if packet.inferred:
+                self._offer_requests(packet)
+            self._inference_queue.put(packet)
+
+    def _render_loop(self):
+        while self._running:
+            packet = self._inference_queue.get(timeout=0.1)
+            if packet is None:
+                continue
+            if self.render_fn is not None:
+                with self._timed("draw"):
+                    self.render_fn(packet.frame_rgb, packet.results)
+
+            if self.display is not None:
+                with self._timed("resize"):
+                    if not self.display.render(packet.frame_rgb):
+                        continue  # 画布尚未布局
+            packet.t_rendered = time.perf_counter()
+            self._display_queue.put(packet)
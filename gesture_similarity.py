@@ -0,0 +1,83 @@
+"""实时手势与记录手势的连续相似度（0-1）
+
+只用 15 个关节夹角比较两只手：夹角与平移、缩放、旋转都无关，侧着手、离镜头远近不同也能比较，
+比 "指尖 y 是否大于关节 y" 的布尔判断更稳，也能给出部分完成的进度。
+每个关节的相似度为 exp(-(Δ角度 / angle_scale)² / 2)，再按手指权重加权平均。
+参考手势带有逐关键点方差（记录时多帧平均得到）时，抖动大的关节放宽容差：
+angle_scale 换为 sqrt(angle_scale² + (k · 该关节夹角的标准差)²)，与折叠状态匹配中忽略不确定手指的做法一致。
+
+两只手一起做一次向量化计算，每帧开销在几十微秒量级。
+"""
+
+import numpy as np
+
+from gesture_matcher import DEFAULT_SIMILARITY_THRESHOLD, VARIANCE_TOLERANCE
+from hand_features import ANGLE_TRIPLETS, joint_angle_std, joint_angles
+
+# 手指权重，顺序：拇指、食指、中指、无名指、小指（拇指关键点抖动较大，权重略低）
+DEFAULT_FINGER_WEIGHTS = (0.8, 1.0, 1.0, 1.0, 0.8)
+DEFAULT_ANGLE_SCALE = np.radians(30)  # 关节角相差这么多时该关节的相似度约为 0.6
+DEFAULT_THRESHOLD = DEFAULT_SIMILARITY_THRESHOLD
+
+_JOINTS_PER_FINGER = len(ANGLE_TRIPLETS) // 5
+
+
+class SimilarityScorer:
+    def __init__(self, finger_weights=DEFAULT_FINGER_WEIGHTS, angle_scale=DEFAULT_ANGLE_SCALE, aspect_ratio=None,
+                 variance_tolerance=VARIANCE_TOLERANCE):
+        """aspect_ratio 为画面宽 / 高：MediaPipe 的 x、y 分别按宽、高归一化，给出后先还原为等比例坐标"""
+        weights = np.repeat(np.asarray(finger_weights, dtype=np.float32), _JOINTS_PER_FINGER)
+        self.joint_weights = weights / weights.sum()
+        self.angle_scale = float(angle_scale)
+        self.aspect_ratio = aspect_ratio
+        self.variance_tolerance = variance_tolerance
+        self._labels = []
+        self._reference_angles = None  # (手的数量, 15)
+        self._reference_scales = None  # (手的数量, 15) 每个关节的容差
+
+    @property
+    def has_reference(self):
+        return bool(self._labels)
+
+    def _aspect(self):
+        if self.aspect_ratio is None:
+            return np.ones(3, dtype=np.float32)
+        return np.array([self.aspect_ratio, 1.0, self.aspect_ratio], dtype=np.float32)
+
+    def _angles(self, points):
+        return joint_angles(np.asarray(points, dtype=np.float32) * self._aspect())
+
+    def set_reference(self, hand_arrays, hand_variances=None):
+        """hand_arrays 为 {"Left"/"Right": (21, 3)}；hand_variances 为同结构的逐关键点方差（可选，可只含部分手）"""
+        self._labels = list(hand_arrays)
+        if not self._labels:
+            self._reference_angles = self._reference_scales = None
+            return
+        aspect = self._aspect()
+        points = np.stack([hand_arrays[l] for l in self._labels]).astype(np.float32) * aspect
+        self._reference_angles = joint_angles(points)
+        self._reference_scales = np.full(self._reference_angles.shape, self.angle_scale, dtype=np.float32)
+        for i, label in enumerate(self._labels):
+            variance = (hand_variances or {}).get(label)
+            if variance is not None:
+                std = joint_angle_std(points[i], np.asarray(variance, dtype=np.float32) * aspect * aspect)
+                self._reference_scales[i] = np.sqrt(self.angle_scale ** 2 + (self.variance_tolerance * std) ** 2)
+
+    def score(self, hand_arrays):
+        """返回 (总相似度, {"Left"/"Right": 单手相似度})
+
+        总相似度为参考手与检测到的手（并集）逐只相似度的平均：参考中缺少的手、参考中没有的多余的手都记为 0，
+        与折叠状态匹配要求两侧的手相同一致。没有参考时返回 (0.0, {})。
+        """
+        if not self._labels:
+            return 0.0, {}
+        present = [i for i, label in enumerate(self._labels) if label in hand_arrays]
+        per_hand = {}
+        if present:
+            live = self._angles(np.stack([hand_arrays[self._labels[i]] for i in present]))
+            diff = (live - self._reference_angles[present]) / self._reference_scales[present]
+            scores = np.exp(-0.5 * diff * diff) @ self.joint_weights
+            per_hand = {self._labels[i]: float(s) for i, s in zip(present, scores)}
+        for label in hand_arrays:
+            per_hand.setdefault(label, 0.0)
+        return sum(per_hand.values()) / len(set(self._labels) | set(hand_arrays)), per_hand
@@ -0,0 +1,134 @@
+"""关键点时间平滑与匹配判定的去抖
+
+所有类都只依赖调用方传入的时间戳，不读取系统时钟，
+对同一段关键点序列多次运行结果完全一致，便于用录制数据复现和测试。
+"""
+
+import math
+from collections import deque
+
+import numpy as np
+
+
+class EMAFilter:
+    """指数滑动平均，对任意形状的数组逐元素平滑"""
+
+    def __init__(self, alpha=0.5):
+        self.alpha = alpha
+        self._x = None
+
+    def reset(self):
+        self._x = None
+
+    def __call__(self, x, timestamp=None):
+        x = np.asarray(x, dtype=np.float32)
+        if self._x is None:
+            self._x = x.copy()
+        else:
+            self._x += self.alpha * (x - self._x)
+        return self._x.copy()
+
+
+class OneEuroFilter:
+    """One Euro 滤波：静止时强平滑去抖，快速运动时降低平滑减少滞后
+
+    参见 Casiez 等人 2012 年的论文 "1€ Filter"。对数组逐元素独立滤波。
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=0.05, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff  # 静止时的截止频率（Hz），越小越平滑
+        self.beta = beta  # 速度系数，越大对快速运动越灵敏
+        self.d_cutoff = d_cutoff  # 速度估计的截止频率（Hz）
+        self._x = None
+        self._dx = None
+        self._t = None
+
+    def reset(self):
+        self._x = None
+        self._dx = None
+        self._t = None
+
+    @staticmethod
+    def _alpha(dt, cutoff):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, x, timestamp):
+        x = np.asarray(x, dtype=np.float32)
+        if self._x is None:
+            self._x = x.copy()
+            self._dx = np.zeros_like(x)
+            self._t = timestamp
+            return self._x.copy()
+
+        dt = timestamp - self._t
+        if dt <= 0:
+            return self._x.copy()
+        self._t = timestamp
+
+        dx = (x - self._x) / dt
+        self._dx += self._alpha(dt, self.d_cutoff) * (dx - self._dx)
+
+        cutoff = self.min_cutoff + self.beta * np.abs(self._dx)
+        tau = 1.0 / (2 * math.pi * cutoff)
+        alpha = 1.0 / (1.0 + tau / dt)
+        self._x += alpha * (x - self._x)
+        return self._x.copy()
+
+
+class LandmarkSmoother:
+    """为左右手各维护一个滤波器，手从画面中消失时重置"""
+
+    def __init__(self, filter_factory=OneEuroFilter):
+        self.filter_factory = filter_factory
+        self._filters = {}
+
+    def reset(self):
+        self._filters.clear()
+
+    def update(self, hand_arrays, timestamp):
+        """{"Left"/"Right": (21, 3) 数组} -> 平滑后的同结构字典，timestamp 单位为秒"""
+        for label in list(self._filters):
+            if label not in hand_arrays:
+                del self._filters[label]
+
+        smoothed = {}
+        for label, points in hand_arrays.items():
+            if label not in self._filters:
+                self._filters[label] = self.filter_factory()
+            smoothed[label] = self._filters[label](points, timestamp)
+        return smoothed
+
+
+class DecisionEngine:
+    """对逐帧的匹配结果做多数投票和去抖
+
+    最近 vote_window 帧中超过半数匹配才视为匹配；投票结果需连续 on_frames 帧为真才进入匹配状态，
+    连续 off_frames 帧为假才退出，单帧抖动不会产生多余或遗漏的计数。
+    """
+
+    def __init__(self, vote_window=5, on_frames=2, off_frames=3):
+        self.votes = deque(maxlen=vote_window)
+        self.on_frames = on_frames
+        self.off_frames = off_frames
+        self.state = False
+        self._streak = 0
+
+    def reset(self):
+        self.votes.clear()
+        self.state = False
+        self._streak = 0
+
+    def update(self, raw_match):
+        """输入本帧的原始匹配结果，返回去抖后的匹配状态"""
+        self.votes.append(bool(raw_match))
+        voted = sum(self.votes) * 2 > len(self.votes)
+
+        if voted == self.state:
+            self._streak = 0
+        else:
+            self._streak += 1
+            if self._streak >= (self.on_frames if voted else self.off_frames):
+                self.state = voted
+                self._streak = 0
+        return self.state
@@ -0,0 +1,162 @@
+"""录制手势的持久化存储
+
+文件格式（小端）:
+    4 字节魔数 b"GSTR" | uint16 版本号 | uint32 头部长度 | UTF-8 JSON 头部 | 填充到 64 字节对齐 | 数据块
+
+JSON 头部记录各数据块（关键点 float32、可选的关键点方差 float32、缩略图 uint8）的偏移、形状和类型，以及左右手标签和元数据。
+读取时只解析头部，数据块通过 np.memmap 按需映射，不会把整张图读进内存。
+"""
+
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+from gesture_matcher import fold_state_tuples, tolerant_fold_state_tuples
+from hand_features import NUM_LANDMARKS
+
+MAGIC = b"GSTR"
+FORMAT_VERSION = 1
+THUMBNAIL_SIZE = (240, 320)  # (宽, 高)，与界面上的比对截图区域一致
+_PREFIX = struct.Struct("<4sHI")
+_ALIGNMENT = 64
+
+
+def _align(offset):
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+class RecordedGesture:
+    """一个已保存的手势，关键点和缩略图在首次访问时才做内存映射"""
+
+    def __init__(self, path, header):
+        self.path = path
+        self.version = header["version"]
+        self.hand_labels = list(header["hands"])
+        self.metadata = header.get("metadata", {})
+        self._blocks = header["blocks"]
+        self._cache = {}
+
+    def _block(self, name):
+        if name not in self._cache:
+            block = self._blocks.get(name)
+            if block is None:
+                return None
+            self._cache[name] = np.memmap(self.path, dtype=block["dtype"], mode="r",
+                                          offset=block["offset"], shape=tuple(block["shape"]))
+        return self._cache[name]
+
+    @property
+    def landmarks(self):
+        """(手的数量, 21, 3) float32"""
+        return self._block("landmarks")
+
+    @property
+    def variance(self):
+        """(手的数量, 21, 3) float32 逐关键点方差，多帧平均记录时才有，否则为 None"""
+        return self._block("variance")
+
+    @property
+    def thumbnail(self):
+        """(高, 宽, 3) uint8 RGB 缩略图，可能为 None"""
+        return self._block("thumbnail")
+
+    def hand_arrays(self):
+        return {label: self.landmarks[i] for i, label in enumerate(self.hand_labels)}
+
+    def hand_variances(self):
+        variance = self.variance
+        if variance is None:
+            return {}
+        return {label: variance[i] for i, label in enumerate(self.hand_labels)}
+
+    def finger_states(self):
+        """有方差时不确定的手指为 None"""
+        variances = self.hand_variances()
+        if variances:
+            return tolerant_fold_state_tuples(self.hand_arrays(), variances)
+        return fold_state_tuples(self.hand_arrays())
+
+
+def save_gesture(path, hand_arrays, thumbnail=None, metadata=None, hand_variances=None):
+    """保存手势：hand_arrays 为 {"Left"/"Right": (21, 3)}，thumbnail 为已缩放好的 RGB 数组，
+    hand_variances 为与 hand_arrays 同结构的逐关键点方差（可选）"""
+    labels = list(hand_arrays)
+    landmarks = np.ascontiguousarray(
+        np.stack([hand_arrays[label] for label in labels]) if labels
+        else np.empty((0, NUM_LANDMARKS, 3)), dtype=np.float32)
+    arrays = {"landmarks": landmarks}
+    if hand_variances and labels:
+        arrays["variance"] = np.ascontiguousarray(
+            np.stack([hand_variances[label] for label in labels]), dtype=np.float32)
+    if thumbnail is not None:
+        arrays["thumbnail"] = np.ascontiguousarray(thumbnail, dtype=np.uint8)
+
+    metadata = dict(metadata or {})
+    metadata.setdefault("created", time.strftime("%Y-%m-%d %H:%M:%S"))
+
+    # 头部长度会影响数据偏移，先按占位偏移估算，再用最终长度重新计算
+    blocks = {name: {"offset": 0, "shape": list(a.shape), "dtype": a.dtype.str} for name, a in arrays.items()}
+    header = {"version": FORMAT_VERSION, "hands": labels, "metadata": metadata, "blocks": blocks}
+    for _ in range(2):
+        header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        offset = _align(_PREFIX.size + len(header_bytes) + 16)
+        for name, array in arrays.items():
+            blocks[name]["offset"] = offset
+            offset = _align(offset + array.nbytes)
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.write(b"\0" * (blocks[name]["offset"] - f.tell()))
+            f.write(array.tobytes())
+    os.replace(tmp_path, path)  # 原子替换，写入中途退出不会损坏旧文件
+
+
+def _check_blocks(path, header, data_start, file_size):
+    """确认头部记录的每个数据块都完整地位于文件内，否则抛出 ValueError"""
+    blocks = header.get("blocks")
+    if not isinstance(blocks, dict) or "landmarks" not in blocks or not isinstance(header.get("hands"), list):
+        raise ValueError(f"手势文件头部不完整: {path}")
+    for name, block in blocks.items():
+        try:
+            offset = int(block["offset"])
+            shape = [int(n) for n in block["shape"]]
+            itemsize = np.dtype(block["dtype"]).itemsize
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"手势文件数据块 {name} 描述无效: {path}") from e
+        size = int(np.prod(shape)) * itemsize
+        if offset < data_start or min(shape, default=0) < 0 or offset + size > file_size:
+            raise ValueError(f"手势文件数据块 {name} 超出文件范围（文件可能被截断）: {path}")
+    if blocks["landmarks"]["shape"][:1] != [len(header["hands"])]:
+        raise ValueError(f"手势文件的关键点与左右手标签数量不一致: {path}")
+
+
+def load_gesture(path):
+    """读取头部并返回 RecordedGesture，数据块延迟映射。文件损坏或被截断时抛出 ValueError"""
+    file_size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        try:
+            magic, version, header_len = _PREFIX.unpack(f.read(_PREFIX.size))
+        except struct.error as e:
+            raise ValueError(f"手势文件被截断: {path}") from e
+        if magic != MAGIC:
+            raise ValueError(f"不是手势文件: {path}")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"不支持的手势文件版本 {version}: {path}")
+        header_bytes = f.read(header_len)
+    if len(header_bytes) != header_len:
+        raise ValueError(f"手势文件被截断: {path}")
+    header = json.loads(header_bytes.decode("utf-8"))  # JSON / UTF-8 错误均为 ValueError
+    if not isinstance(header, dict):
+        raise ValueError(f"手势文件头部无效: {path}")
+    _check_blocks(path, header, _PREFIX.size + header_len, file_size)
+    header["version"] = version
+    return RecordedGesture(path, header)
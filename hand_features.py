@@ -0,0 +1,147 @@
+"""向量化的手部关键点特征
+
+所有函数都接受形状为 (..., 21, 3) 的 float32 数组，既可以处理单只手 (21, 3)，
+也可以一次处理整段录像 (N, 21, 3)。
+"""
+
+import numpy as np
+
+NUM_LANDMARKS = 21
+WRIST = 0
+MIDDLE_FINGER_MCP = 9
+
+# 指尖与近端指间关节（拇指为 IP 关节），顺序：拇指、食指、中指、无名指、小指
+FINGER_TIPS = np.array([4, 8, 12, 16, 20])
+FINGER_PIPS = np.array([3, 6, 10, 14, 18])
+
+# 每根手指从手腕开始的关节链
+FINGER_CHAINS = np.array([
+    [0, 1, 2, 3, 4],
+    [0, 5, 6, 7, 8],
+    [0, 9, 10, 11, 12],
+    [0, 13, 14, 15, 16],
+    [0, 17, 18, 19, 20],
+])
+
+# 每个关节角由 (前一个点, 关节点, 后一个点) 决定，每根手指 3 个，共 15 个
+ANGLE_TRIPLETS = np.concatenate([
+    np.stack([chain[:-2], chain[1:-1], chain[2:]], axis=1) for chain in FINGER_CHAINS
+])
+
+# 5 个指尖两两组合的下标（共 10 对）
+_TIP_PAIRS = np.array([(i, j) for i in range(5) for j in range(i + 1, 5)])
+
+
+def landmarks_to_array(hand_landmarks):
+    """把 MediaPipe 的 21 个关键点一次性转为连续的 (21, 3) float32 数组"""
+    return np.fromiter(
+        (v for lm in hand_landmarks.landmark for v in (lm.x, lm.y, lm.z)),
+        dtype=np.float32, count=NUM_LANDMARKS * 3,
+    ).reshape(NUM_LANDMARKS, 3)
+
+
+def results_to_arrays(results):
+    """从 hands.process 的结果中提取 {"Left"/"Right": (21, 3) 数组}"""
+    arrays = {}
+    if results.multi_hand_landmarks:
+        for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
+            arrays[handedness.classification[0].label] = landmarks_to_array(hand_landmarks)
+    return arrays
+
+
+def detection_score(results):
+    """检测质量得分：各只手的左右手分类置信度之和，检测到的手越多、越清晰得分越高"""
+    if not results or not results.multi_handedness:
+        return 0.0
+    return float(sum(handedness.classification[0].score for handedness in results.multi_handedness))
+
+
+def fold_states(points):
+    """手指折叠状态：指尖 y 大于近端关节 y 视为弯曲，返回 (..., 5) bool"""
+    return points[..., FINGER_TIPS, 1] > points[..., FINGER_PIPS, 1]
+
+
+def fold_margins(points):
+    """指尖 y 减近端关节 y，正值为弯曲，绝对值越大越确定，返回 (..., 5)"""
+    return points[..., FINGER_TIPS, 1] - points[..., FINGER_PIPS, 1]
+
+
+def fold_margin_std(variance):
+    """由逐关键点方差 (..., 21, 3) 估计 fold_margins 的标准差（忽略协方差），返回 (..., 5)"""
+    return np.sqrt(variance[..., FINGER_TIPS, 1] + variance[..., FINGER_PIPS, 1])
+
+
+def palm_size(points):
+    """手腕到中指根部的距离，用于尺度归一化，返回 (...,)"""
+    return np.linalg.norm(points[..., MIDDLE_FINGER_MCP, :] - points[..., WRIST, :], axis=-1)
+
+
+def normalize_landmarks(points):
+    """平移、缩放、旋转归一化：手腕移到原点，手掌大小缩放为 1，
+    手腕到中指根部的方向在图像平面内旋转到 -y（朝上），返回 (..., 21, 3)
+
+    输入需为等比例坐标（MediaPipe 的 x、z 先乘以画面宽高比），否则旋转后仍随画面宽高比变形。"""
+    centered = points - points[..., WRIST:WRIST + 1, :]
+    size = palm_size(points)[..., None, None] + 1e-8
+    centered = centered / size
+
+    axis = centered[..., MIDDLE_FINGER_MCP, :2]
+    angle = np.arctan2(axis[..., 0], -axis[..., 1])  # 相对朝上方向的偏转角
+    cos, sin = np.cos(angle)[..., None], np.sin(angle)[..., None]
+    x, y = centered[..., 0], centered[..., 1]
+    rotated = np.stack([x * cos + y * sin, y * cos - x * sin, centered[..., 2]], axis=-1)
+    return rotated.astype(np.float32)
+
+
+def joint_angles(points):
+    """15 个关节的夹角（弧度，伸直为 π），返回 (..., 15)"""
+    prev_pts = points[..., ANGLE_TRIPLETS[:, 0], :]
+    joint_pts = points[..., ANGLE_TRIPLETS[:, 1], :]
+    next_pts = points[..., ANGLE_TRIPLETS[:, 2], :]
+    v1 = prev_pts - joint_pts
+    v2 = next_pts - joint_pts
+    cos = np.sum(v1 * v2, axis=-1) / (
+        np.linalg.norm(v1, axis=-1) * np.linalg.norm(v2, axis=-1) + 1e-8
+    )
+    return np.arccos(np.clip(cos, -1.0, 1.0))
+
+
+def joint_angle_std(points, variance):
+    """由逐关键点方差 (..., 21, 3) 估计 joint_angles 的标准差（一阶近似，忽略协方差），返回 (..., 15)
+
+    端点在夹角平面内沿垂直于边的方向移动 d 时夹角约变化 d / 边长，该方向的方差取三个坐标方差的平均。
+    """
+    point_var = variance.mean(axis=-1)
+    v1 = points[..., ANGLE_TRIPLETS[:, 0], :] - points[..., ANGLE_TRIPLETS[:, 1], :]
+    v2 = points[..., ANGLE_TRIPLETS[:, 2], :] - points[..., ANGLE_TRIPLETS[:, 1], :]
+    inv1 = 1.0 / (np.sum(v1 * v1, axis=-1) + 1e-8)
+    inv2 = 1.0 / (np.sum(v2 * v2, axis=-1) + 1e-8)
+    angle_var = (point_var[..., ANGLE_TRIPLETS[:, 0]] * inv1 + point_var[..., ANGLE_TRIPLETS[:, 2]] * inv2
+                 + point_var[..., ANGLE_TRIPLETS[:, 1]] * (inv1 + inv2))
+    return np.sqrt(angle_var)
+
+
+def fingertip_distances(points):
+    """指尖两两之间的距离（按手掌大小归一化），返回 (..., 10)"""
+    tips = points[..., FINGER_TIPS, :]
+    diff = tips[..., _TIP_PAIRS[:, 0], :] - tips[..., _TIP_PAIRS[:, 1], :]
+    return np.linalg.norm(diff, axis=-1) / (palm_size(points)[..., None] + 1e-8)
+
+
+def palm_orientation(points):
+    """手掌平面的单位法向量（手腕、食指根、小指根三点确定），返回 (..., 3)"""
+    v1 = points[..., 5, :] - points[..., WRIST, :]
+    v2 = points[..., 17, :] - points[..., WRIST, :]
+    normal = np.cross(v1, v2)
+    return normal / (np.linalg.norm(normal, axis=-1, keepdims=True) + 1e-8)
+
+
+def extract_features(points):
+    """一次计算全部特征"""
+    points = np.asarray(points, dtype=np.float32)
+    return {
+        "fold_states": fold_states(points),
+        "joint_angles": joint_angles(points),
+        "fingertip_distances": fingertip_distances(points),
+        "palm_orientation": palm_orientation(points),
+    }
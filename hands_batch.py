@@ -0,0 +1,254 @@
+"""离线批处理：对录制的视频或帧目录进行手势匹配，无需显示器和摄像头
+
+用法示例:
+    python hands_batch.py session.mp4 --reference gesture.png --output result.json
+    python hands_batch.py frames_dir/ --reference gesture.json --output result.csv
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from gesture_library import GestureTemplateLibrary
+from gesture_matcher import GestureMatcher, extract_finger_states
+from gesture_smoothing import DecisionEngine, LandmarkSmoother
+from gesture_store import load_gesture
+from hand_features import NUM_LANDMARKS, fold_states, results_to_arrays
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+HAND_LABELS = ("Left", "Right")
+
+mp_hands = mp.solutions.hands
+
+
+def iter_frames(input_path):
+    """逐帧读取视频文件或帧目录，产出 (帧序号, 时间戳毫秒, BGR 帧)"""
+    if os.path.isdir(input_path):
+        names = sorted(n for n in os.listdir(input_path) if n.lower().endswith(IMAGE_EXTENSIONS))
+        for index, name in enumerate(names):
+            frame = cv2.imread(os.path.join(input_path, name))
+            if frame is not None:
+                yield index, None, frame
+        return
+
+    capture = cv2.VideoCapture(input_path)
+    if not capture.isOpened():
+        raise IOError(f"无法打开视频文件: {input_path}")
+    try:
+        index = 0
+        while True:
+            ret, frame = capture.read()
+            if not ret or frame is None:
+                break
+            yield index, capture.get(cv2.CAP_PROP_POS_MSEC), frame
+            index += 1
+    finally:
+        capture.release()
+
+
+def load_reference(reference_path):
+    """读取参考手势：界面程序保存的 .gst 文件、JSON 文件（{"Left": [...], "Right": [...]}）或一张手势图片"""
+    if reference_path.lower().endswith(".gst"):
+        return load_gesture(reference_path).finger_states()
+
+    if reference_path.lower().endswith(".json"):
+        with open(reference_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        # null 表示该手指不参与比较
+        return {label: tuple(None if v is None else bool(v) for v in states) for label, states in data.items()}
+
+    image = cv2.imread(reference_path)
+    if image is None:
+        raise IOError(f"无法读取参考图片: {reference_path}")
+    with mp_hands.Hands(static_image_mode=True, min_detection_confidence=0.5) as hands:
+        results = hands.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+    return extract_finger_states(results)
+
+
+def detect_hands(input_path, min_detection_confidence=0.5, min_tracking_confidence=0.5):
+    """逐帧运行 hands.process，返回 (帧信息列表, 每只手的 (N, 21, 3) 关键点数组, 每只手的存在掩码)"""
+    frame_info = []
+    per_frame_arrays = []
+
+    with mp_hands.Hands(min_detection_confidence=min_detection_confidence,
+                        min_tracking_confidence=min_tracking_confidence) as hands:
+        for index, timestamp_ms, frame in iter_frames(input_path):
+            results = hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            frame_info.append((index, timestamp_ms))
+            per_frame_arrays.append(results_to_arrays(results))
+
+    # 按左右手整理成连续数组，缺失的帧填 NaN
+    count = len(per_frame_arrays)
+    landmarks = {}
+    present = {}
+    for label in HAND_LABELS:
+        landmarks[label] = np.full((count, NUM_LANDMARKS, 3), np.nan, dtype=np.float32)
+        present[label] = np.zeros(count, dtype=bool)
+        for i, arrays in enumerate(per_frame_arrays):
+            if label in arrays:
+                landmarks[label][i] = arrays[label]
+                present[label][i] = True
+
+    return frame_info, landmarks, present
+
+
+def smooth_landmarks(frame_info, landmarks, present, fps=30.0):
+    """按时间顺序对整段关键点做 One Euro 平滑（与界面程序一致），帧目录按 fps 推算时间戳"""
+    smoother = LandmarkSmoother()
+    smoothed = {label: landmarks[label].copy() for label in HAND_LABELS}
+    for i, (index, timestamp_ms) in enumerate(frame_info):
+        timestamp = timestamp_ms / 1000 if timestamp_ms is not None else index / fps
+        hand_arrays = {label: landmarks[label][i] for label in HAND_LABELS if present[label][i]}
+        for label, points in smoother.update(hand_arrays, timestamp).items():
+            smoothed[label][i] = points
+    return smoothed
+
+
+def input_aspect_ratio(input_path):
+    """输入第一帧的宽 / 高，读不到帧时为 None"""
+    for _, _, frame in iter_frames(input_path):
+        height, width = frame.shape[:2]
+        return width / height
+    return None
+
+
+def classify_templates(library, landmarks, present, aspect_ratio=None):
+    """整段录像的每只手一次性查询最近的模板，返回 {手: {帧下标: (模板名, 距离)}}"""
+    nearest = {}
+    for label in HAND_LABELS:
+        frame_indices = np.flatnonzero(present[label])
+        nearest[label] = {}
+        if len(frame_indices) == 0:
+            continue
+        indices, distances = library.classify_batch(label, landmarks[label][frame_indices],
+                                                    aspect_ratio=aspect_ratio)
+        if indices.shape[1] == 0:
+            continue
+        names = library.names(label)
+        for i, template, distance in zip(frame_indices, indices[:, 0], distances[:, 0]):
+            nearest[label][int(i)] = (names[template], float(distance))
+    return nearest
+
+
+def run_batch(input_path, reference_states, min_detection_confidence=0.5, min_tracking_confidence=0.5,
+              decision=None, smooth=False, fps=30.0, library=None):
+    """对整个输入运行检测 + 匹配，返回 (逐帧结果列表, 匹配器)"""
+    frame_info, landmarks, present = detect_hands(input_path, min_detection_confidence,
+                                                  min_tracking_confidence)
+    if smooth:
+        landmarks = smooth_landmarks(frame_info, landmarks, present, fps)
+
+    # 整段录像的折叠状态一次性向量化计算
+    folds = {label: fold_states(landmarks[label]).tolist() for label in HAND_LABELS}
+
+    templates = classify_templates(library, landmarks, present, input_aspect_ratio(input_path)) \
+        if library is not None else None
+
+    matcher = GestureMatcher(reference_states, decision=decision)
+    frames = []
+    for i, (index, timestamp_ms) in enumerate(frame_info):
+        detected_finger_states = {
+            label: tuple(folds[label][i]) for label in HAND_LABELS if present[label][i]
+        }
+        event = matcher.update(detected_finger_states)
+        row = {
+            "frame": index,
+            "timestamp_ms": timestamp_ms,
+            "hands": {label: list(states) for label, states in detected_finger_states.items()},
+            "matched": matcher.current_state,
+            "event": event,
+            "action_count": matcher.action_count,
+        }
+        if templates is not None:
+            row["templates"] = {
+                label: {"name": templates[label][i][0], "distance": round(templates[label][i][1], 4)}
+                for label in HAND_LABELS if i in templates[label]
+            }
+        frames.append(row)
+
+    return frames, matcher
+
+
+def write_json(path, summary, frames):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(dict(summary, frames=frames), f, ensure_ascii=False, indent=2)
+
+
+def write_csv(path, frames):
+    """CSV 每行一帧，最后一行的 action_count 即为总计数"""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["frame", "timestamp_ms", "left", "right", "matched", "event", "action_count",
+                         "left_template", "right_template"])
+        for row in frames:
+            hands = row["hands"]
+            templates = row.get("templates", {})
+            writer.writerow([
+                row["frame"],
+                "" if row["timestamp_ms"] is None else f"{row['timestamp_ms']:.1f}",
+                "".join("1" if v else "0" for v in hands.get("Left", [])),
+                "".join("1" if v else "0" for v in hands.get("Right", [])),
+                int(row["matched"]),
+                row["event"] or "",
+                row["action_count"],
+                templates.get("Left", {}).get("name", ""),
+                templates.get("Right", {}).get("name", ""),
+            ])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="离线手势匹配批处理")
+    parser.add_argument("input", help="录制的视频文件或帧图片目录")
+    parser.add_argument("--reference", required=True, help="参考手势：.gst、JSON 或图片文件")
+    parser.add_argument("--output", help="结果输出路径（.json 或 .csv），不指定则只打印汇总")
+    parser.add_argument("--min-detection-confidence", type=float, default=0.5)
+    parser.add_argument("--min-tracking-confidence", type=float, default=0.5)
+    parser.add_argument("--raw", action="store_true", help="关闭关键点平滑和去抖，逐帧直接比较")
+    parser.add_argument("--vote-window", type=int, default=5, help="多数投票窗口（帧）")
+    parser.add_argument("--on-frames", type=int, default=2, help="进入匹配状态所需的连续帧数")
+    parser.add_argument("--off-frames", type=int, default=3, help="退出匹配状态所需的连续帧数")
+    parser.add_argument("--fps", type=float, default=30.0, help="帧目录输入时用于推算时间戳的帧率")
+    parser.add_argument("--library", help="手势模板库（.npz），输出每帧最接近的模板")
+    args = parser.parse_args(argv)
+
+    reference_states = load_reference(args.reference)
+    if not reference_states:
+        print("参考手势中未检测到手", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    decision = None if args.raw else DecisionEngine(args.vote_window, args.on_frames, args.off_frames)
+    frames, matcher = run_batch(args.input, reference_states,
+                                args.min_detection_confidence, args.min_tracking_confidence,
+                                decision=decision, smooth=not args.raw, fps=args.fps,
+                                library=GestureTemplateLibrary.load(args.library) if args.library else None)
+    elapsed = time.perf_counter() - start
+
+    summary = {
+        "input": args.input,
+        "reference": {label: list(states) for label, states in reference_states.items()},
+        "frame_count": len(frames),
+        "action_count": matcher.action_count,
+        "elapsed_s": round(elapsed, 3),
+        "fps": round(len(frames) / elapsed, 1) if elapsed > 0 else None,
+    }
+
+    if args.output:
+        if args.output.lower().endswith(".csv"):
+            write_csv(args.output, frames)
+        else:
+            write_json(args.output, summary, frames)
+
+    print(json.dumps(summary, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,85 @@
-import cv2
-import mediapipe as mp
+from startup_metrics import StartupTimer
+
+# 尽早开始计时，记录窗口显示、模型加载、首帧等启动阶段
+startup_timer = StartupTimer()
+
+import argparse
+import os
+import queue
+import sys
+import threading
 import tkinter as tk
 from PIL import Image, ImageTk
 from tkinter import font, ttk
-import numpy as np
 from collections import deque
 
-# 初始化 MediaPipe 手部检测
-mp_hands = mp.solutions.hands
-mp_drawing = mp.solutions.drawing_utils
-hands = mp_hands.Hands(min_detection_confidence=0.5, min_tracking_confidence=0.5)
+# 命令行参数均为可选，从主菜单启动时不需要
+arg_parser = argparse.ArgumentParser(description="复健魔镜 - 手势识别")
+arg_parser.add_argument("--source", help="摄像头编号或视频文件，默认依次尝试摄像头 0 和 1")
+arg_parser.add_argument("--startup-report", help="显示第一帧后把启动阶段耗时写入该 JSON 文件")
+arg_parser.add_argument("--exit-after-first-frame", action="store_true", help="显示第一帧后退出（用于启动基准测试）")
+arg_parser.add_argument("--match-mode", choices=["similarity", "fold", "dynamic"], default="similarity",
+                        help="匹配方式：关节角相似度（默认）、手指折叠状态或动态动作（记录一段动作，按重复次数计数）")
+# 两个阈值的默认值在加载后端时取自 gesture_similarity / dynamic_gesture，启动时不必导入 numpy
+arg_parser.add_argument("--similarity-threshold", type=float,
+                        help="相似度达到该值（0-1）视为匹配，默认为 gesture_similarity.DEFAULT_THRESHOLD")
+arg_parser.add_argument("--dynamic-threshold", type=float,
+                        help="动态动作与记录动作的平均特征差不超过该值（约为弧度）视为完成一次，"
+                             "默认为 dynamic_gesture.DEFAULT_THRESHOLD")
+arg_parser.add_argument("--warm", action="store_true",
+                        help="预启动模式：加载模型后隐藏等待，从标准输入收到 show 才显示窗口（由主菜单使用）")
+arg_parser.add_argument("--roi", action="store_true",
+                        help="只对上一帧的手部区域做推理（实验性，需要额外加载一个静态图像模式的模型，"
+                             "在测试机器上并不比整帧跟踪快，见 roi_tracker）")
+arg_parser.add_argument("--library", help="手势模板库（.npz，见 gesture_library.py），实时显示每只手最接近的模板")
+arg_parser.add_argument("--session-dir", help="逐帧会话记录的目录，默认为 recordings/sessions/<开始时间>")
+arg_parser.add_argument("--no-session-log", action="store_true", help="不记录本次会话")
+args, _ = arg_parser.parse_known_args()
+
+# OpenCV、MediaPipe 及依赖它们的模块导入较慢，窗口显示后由后台线程加载（见 load_backend），
+# 加载完成前以下名称均为 None
+cv2 = None
+mp_hands = None
+mp_drawing = None
+hands = None
+capture = None
+landmark_drawing_spec = None
+connection_drawing_spec = None
+results_to_arrays = None
+fold_state_tuples = None
+CaptureWindow = None
+THUMBNAIL_SIZE = None
+load_gesture = None
+save_gesture = None
+CanvasDisplay = None
+GesturePipeline = None
+landmark_smoother = None
+matcher = None
+similarity = None
+dynamic_matcher = None
+TrajectoryCapture = None
+MotionTemplate = None
+session_recorder = None
+pack_hands = None
+roi_tracker = None
+scheduler = None
+template_library = None
+video_display = None
+pipeline = None
+
+# 端到端延迟预算（毫秒），超出时跳帧推理
+TARGET_LATENCY_MS = 80
+
+# 归一化关键点与最接近模板的欧氏距离超过该值时不显示模板名（同一姿势的帧间距离约 0.6-0.8，换一个姿势约 1.6）
+LIBRARY_MAX_DISTANCE = 1.0
+HAND_NAMES = {"Left": "左手", "Right": "右手"}
+
+# 倒计时结束后在这段时间内收集关键点，丢弃低置信度的检测，取多帧的稳健平均作为记录
+RECORD_WINDOW_S = 1.0
+RECORD_MIN_SCORE = 0.8
+RECORD_POLL_MS = 30
+# 动态动作模式：倒计时结束后记录这么长时间的关键点轨迹作为模板
+RECORD_MOTION_S = 3.0
 
 # 定义颜色常量
 DARK_BG = "#121212"
@@ -95,7 +165,11 @@ status_indicator.create_oval(2, 2, 18, 18, fill=TEXT_SECONDARY, outline="")
 status_indicator.pack(side="top", pady=(0, 10))
 
 label_status = tk.Label(sidebar_content, text="等待记录手势...", font=status_font, fg=TEXT_DARK, bg="#FFFFFF")
-label_status.pack(pady=(0, 30))
+label_status.pack(pady=(0, 10))
+
+# 后台加载进度，加载完成后隐藏
+loading_progress = ttk.Progressbar(sidebar_content, mode="determinate", maximum=100, length=200)
+loading_progress.pack(pady=(0, 20))
 
 
 # 美化按钮 - 包含悬停效果
@@ -134,7 +208,8 @@ class HoverButton(tk.Button):
 
 button_record = HoverButton(sidebar_content, text="开始记录", font=button_font, fg=TEXT_LIGHT, bg=PRIMARY,
                             width=16, height=2, relief="flat", bd=0, highlightthickness=0,
-                            activebackground=PRIMARY, activeforeground=TEXT_LIGHT, cursor="hand2")
+                            activebackground=PRIMARY, activeforeground=TEXT_LIGHT, cursor="hand2",
+                            state="disabled")  # 模型加载完成后启用
 button_record.pack(pady=20)
 
 # 分隔线
@@ -145,13 +220,28 @@ separator.pack(fill="x", pady=30)
 counter_frame = tk.Frame(sidebar_content, bg="#FFFFFF")
 counter_frame.pack(pady=10)
 
-action_count = 0
-label_counter_title = tk.Label(counter_frame, text="匹配成功次数", font=status_font, fg=TEXT_SECONDARY, bg="#FFFFFF")
+label_counter_title = tk.Label(counter_frame, text="完成次数" if args.match_mode == "dynamic" else "匹配成功次数",
+                               font=status_font, fg=TEXT_SECONDARY, bg="#FFFFFF")
 label_counter_title.pack()
 
-label_counter = tk.Label(counter_frame, text=f"{action_count}", font=counter_font, fg=SUCCESS, bg="#FFFFFF")
+label_counter = tk.Label(counter_frame, text="0", font=counter_font, fg=SUCCESS, bg="#FFFFFF")
 label_counter.pack(pady=10)
 
+# 与记录手势的相似度（逐帧更新）
+label_similarity = tk.Label(counter_frame, text="动作进度 --" if args.match_mode == "dynamic" else "相似度 --",
+                            font=status_font, fg=TEXT_SECONDARY, bg="#FFFFFF")
+label_similarity.pack()
+similarity_bar = ttk.Progressbar(counter_frame, mode="determinate", maximum=100, length=200)
+similarity_bar.pack(pady=(5, 0))
+shown_similarity = None
+
+# 模板库中与每只手最接近的模板（指定 --library 时显示）
+label_template = None
+if args.library:
+    label_template = tk.Label(counter_frame, text="模板 --", font=status_font, fg=TEXT_SECONDARY, bg="#FFFFFF")
+    label_template.pack(pady=(10, 0))
+shown_template = None
+
 # **主要内容区域** - 使用圆角边框
 content_frame = create_rounded_frame(main_container, "#FFFFFF", 900, 700)
 content_frame.pack(side="right", fill="both", expand=True)
@@ -197,18 +287,222 @@ bottom_bar.pack(side="bottom", fill="x")
 
 footer_label = tk.Label(bottom_bar, text="© 2025 复健魔镜 · AI 训练辅助系统", font=footer_font, fg=TEXT_SECONDARY,
                         bg="#FFFFFF")
-footer_label.pack(pady=10)
+footer_label.pack(side="left", padx=20, pady=10)
+
+# 性能信息（帧率、端到端延迟、跳帧比例）
+label_perf = tk.Label(bottom_bar, text="", font=footer_font, fg=TEXT_SECONDARY, bg="#FFFFFF")
+label_perf.pack(side="right", padx=20, pady=10)
+
+loading_queue = queue.Queue()
+
+# 预启动模式下，收到 show 之前不打开摄像头也不显示窗口；普通启动时立即放行
+window_requested = threading.Event()
+if not args.warm:
+    window_requested.set()
+
+
+def open_capture(source=None):
+    """打开摄像头或视频文件"""
+    if source is not None:
+        return cv2.VideoCapture(int(source) if source.isdigit() else source)
+    # **摄像头初始化**
+    cap = cv2.VideoCapture(0)
+    if not cap.isOpened():
+        cap = cv2.VideoCapture(1)
+    return cap
+
+
+def load_backend():
+    """后台线程：导入 OpenCV / MediaPipe，加载手部模型并打开摄像头，进度通过 loading_queue 通知界面"""
+    global cv2, mp_hands, mp_drawing, hands, capture, landmark_drawing_spec, connection_drawing_spec
+    global results_to_arrays, fold_state_tuples, CaptureWindow, THUMBNAIL_SIZE, load_gesture, save_gesture
+    global CanvasDisplay, GesturePipeline, landmark_smoother, matcher, similarity, roi_tracker, scheduler
+    global dynamic_matcher, TrajectoryCapture, MotionTemplate, session_recorder, pack_hands, template_library
+
+    try:
+        loading_queue.put(("progress", "正在加载 OpenCV...", 10))
+        import cv2 as _cv2
+        cv2 = _cv2
+        startup_timer.mark("import_cv2")
+
+        loading_queue.put(("progress", "正在加载 MediaPipe...", 30))
+        import mediapipe as mp
+        from display_backend import CanvasDisplay as _CanvasDisplay
+        from gesture_capture import CaptureWindow as _CaptureWindow
+        from gesture_similarity import DEFAULT_THRESHOLD as DEFAULT_SIMILARITY_THRESHOLD, SimilarityScorer
+        from dynamic_gesture import DEFAULT_THRESHOLD as DEFAULT_DYNAMIC_THRESHOLD, DynamicGestureMatcher, \
+            MotionTemplate as _MotionTemplate, TrajectoryCapture as _TrajectoryCapture
+        from frame_scheduler import AdaptiveScheduler
+        from gesture_matcher import GestureMatcher, fold_state_tuples as _fold_state_tuples
+        from gesture_pipeline import GesturePipeline as _GesturePipeline
+        from gesture_smoothing import DecisionEngine, LandmarkSmoother
+        from gesture_library import GestureTemplateLibrary
+        from gesture_store import THUMBNAIL_SIZE as _THUMBNAIL_SIZE, load_gesture as _load_gesture, \
+            save_gesture as _save_gesture
+        from hand_features import results_to_arrays as _results_to_arrays
+        from roi_tracker import HandROITracker
+        from session_recorder import SessionRecorder, new_session_dir, pack_hands as _pack_hands
+        CanvasDisplay, GesturePipeline = _CanvasDisplay, _GesturePipeline
+        fold_state_tuples, results_to_arrays = _fold_state_tuples, _results_to_arrays
+        CaptureWindow = _CaptureWindow
+        TrajectoryCapture, MotionTemplate = _TrajectoryCapture, _MotionTemplate
+        pack_hands = _pack_hands
+        if args.similarity_threshold is None:
+            args.similarity_threshold = DEFAULT_SIMILARITY_THRESHOLD
+        if args.dynamic_threshold is None:
+            args.dynamic_threshold = DEFAULT_DYNAMIC_THRESHOLD
+        THUMBNAIL_SIZE, load_gesture, save_gesture = _THUMBNAIL_SIZE, _load_gesture, _save_gesture
+        startup_timer.mark("import_mediapipe")
+
+        # 初始化 MediaPipe 手部检测
+        loading_queue.put(("progress", "正在加载手部模型...", 60))
+        mp_hands = mp.solutions.hands
+        mp_drawing = mp.solutions.drawing_utils
+        hands = mp_hands.Hands(min_detection_confidence=0.5, min_tracking_confidence=0.5)
+        # 裁剪区域每帧位置、大小都不同，用单独的静态图像模式实例处理（见 roi_tracker），只在 --roi 时加载
+        roi_hands = mp_hands.Hands(static_image_mode=True, min_detection_confidence=0.5) if args.roi else None
+
+        # 自定义绘制样式
+        landmark_drawing_spec = mp_drawing.DrawingSpec(
+            color=(66, 133, 244),  # 蓝色
+            thickness=2,
+            circle_radius=2
+        )
+        connection_drawing_spec = mp_drawing.DrawingSpec(
+            color=(0, 230, 118),  # 绿色
+            thickness=2
+        )
+        startup_timer.mark("model_loaded")
+
+        # 预启动进程在此等待主菜单唤醒，避免提前占用摄像头
+        window_requested.wait()
+        loading_queue.put(("progress", "正在打开摄像头...", 85))
+        capture = open_capture(args.source)
+        startup_timer.mark("camera_opened")
+
+        # 关键点先做 One Euro 平滑，匹配结果再经过多数投票和去抖，避免单帧抖动误计数
+        landmark_smoother = LandmarkSmoother()
+        matcher = GestureMatcher(decision=DecisionEngine(vote_window=5, on_frames=2, off_frames=3),
+                                 similarity_threshold=args.similarity_threshold)
+        # 关节角相似度，x / z 按画面宽高比还原为等比例坐标
+        width, height = capture.get(cv2.CAP_PROP_FRAME_WIDTH), capture.get(cv2.CAP_PROP_FRAME_HEIGHT)
+        aspect_ratio = width / height if width and height else None
+        similarity = SimilarityScorer(aspect_ratio=aspect_ratio)
+        # 动态动作：关键点轨迹的流式 DTW 匹配
+        dynamic_matcher = DynamicGestureMatcher(threshold=args.dynamic_threshold, aspect_ratio=aspect_ratio)
+        # 默认每帧整帧跟踪；--roi 时只对上一帧的手部区域做推理，跟踪丢失时回退整帧检测
+        roi_tracker = HandROITracker(hands.process, roi_hands.process if roi_hands is not None else None)
+        scheduler = AdaptiveScheduler(target_latency_ms=TARGET_LATENCY_MS)
+
+        if args.library:
+            try:
+                template_library = GestureTemplateLibrary.load(args.library)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"[错误] 读取模板库失败: {e}")
+
+        # 逐帧记录关键点、得分和各阶段耗时，由后台线程写入磁盘
+        if not (args.no_session_log or args.exit_after_first_frame):
+            try:
+                session_recorder = SessionRecorder(
+                    args.session_dir or new_session_dir(os.path.join(RECORDINGS_DIR, "sessions")),
+                    metadata={"match_mode": args.match_mode, "source": args.source,
+                              "similarity_threshold": args.similarity_threshold,
+                              "dynamic_threshold": args.dynamic_threshold})
+            except OSError as e:
+                print(f"[错误] 无法创建会话记录: {e}")
+
+        loading_queue.put(("ready", "加载完成", 100))
+    except Exception as e:
+        loading_queue.put(("error", f"加载失败: {e}", 0))
+
+
+def watch_launcher():
+    """预启动模式：读取主菜单发来的命令。show [启动时刻] 唤醒窗口；唤醒前标准输入关闭说明主菜单已退出，随之退出"""
+    for line in sys.stdin:
+        command = line.split()
+        if command and command[0] == "show" and not window_requested.is_set():
+            loading_queue.put(("show", command[1] if len(command) > 1 else None, 0))
+            window_requested.set()
+    if not window_requested.is_set():
+        loading_queue.put(("abandon", None, 0))
+
+
+def show_window(launch_time=None):
+    """显示预启动时隐藏的窗口，从此刻重新开始计算启动耗时"""
+    startup_timer.reset(launch_time)
+    root.deiconify()
+    root.lift()
+    root.focus_force()
+    startup_timer.mark("window_shown")
+
+
+def draw_hand_landmarks(frame_rgb, results):
+    """在渲染线程中绘制手部追踪效果"""
+    if results.multi_hand_landmarks:
+        for hand_landmarks in results.multi_hand_landmarks:
+            mp_drawing.draw_landmarks(
+                frame_rgb,
+                hand_landmarks,
+                mp_hands.HAND_CONNECTIONS,
+                landmark_drawing_spec=landmark_drawing_spec,
+                connection_drawing_spec=connection_drawing_spec
+            )
+
+
+def poll_loading():
+    """在 Tk 线程中显示后台加载进度"""
+    try:
+        while True:
+            kind, message, value = loading_queue.get_nowait()
+            if kind == "show":
+                show_window(message)
+                continue
+            if kind == "abandon":
+                on_close()
+                return
+            if kind == "ready":
+                on_backend_ready()
+                return
+            if kind == "error":
+                loading_progress.pack_forget()
+                update_status(message, ERROR)
+                return
+            loading_progress["value"] = value
+            update_status(message, PRIMARY)
+    except queue.Empty:
+        pass
+    root.after(50, poll_loading)
+
+
+def on_backend_ready():
+    """模型和摄像头就绪：建立流水线并开始显示"""
+    global video_display, pipeline
+
+    # 采集 / 推理 / 渲染流水线，Tk 线程只负责显示最新帧
+    # 画布上只保留一个持久的图像项，每帧原地更新像素
+    video_display = CanvasDisplay(video_frame)
+    pipeline = GesturePipeline(capture, roi_tracker.process, render_fn=draw_hand_landmarks,
+                               display=video_display, scheduler=scheduler)
+
+    loading_progress.pack_forget()
+    button_record.config(state="normal")
+    if restore_last_gesture():
+        update_status("已恢复上次的手势，请尝试复现", TEXT_DARK)
+    else:
+        update_status("等待记录手势...", TEXT_DARK)
 
-# **摄像头初始化**
-capture = cv2.VideoCapture(0)
-if not capture.isOpened():
-    capture = cv2.VideoCapture(1)
+    pipeline.start()
+    startup_timer.mark("pipeline_started")
+    update_frame()
 
-recording = False
-recorded_finger_states = {}  # 记录左手 & 右手手势
-recorded_screenshot = None
-previous_state = False
-current_state = False
+
+last_perf_update = 0.0
+
+# 最近一次记录的手势保存在这里，下次启动时自动恢复
+RECORDINGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recordings")
+LAST_GESTURE_PATH = os.path.join(RECORDINGS_DIR, "last_gesture.gst")
+LAST_MOTION_PATH = os.path.join(RECORDINGS_DIR, "last_motion.npz")
+recorded_thumbnail = None  # 已缩放到比对区域大小的 RGB 数组
 
 
 def update_status(message, color=TEXT_DARK):
@@ -226,7 +520,7 @@ def update_status(message, color=TEXT_DARK):
 
 def start_recording():
     """点击'开始记录'，3 秒后记录手势"""
-    update_status("请在 3 秒内摆好手势...", PRIMARY)
+    update_status("请在 3 秒内准备动作..." if args.match_mode == "dynamic" else "请在 3 秒内摆好手势...", PRIMARY)
     button_record.config(state="disabled")
     # 添加倒计时效果
     countdown(3)
@@ -242,146 +536,263 @@ def countdown(count):
 
 
 def record_hand():
-    """记录手势并保存截图"""
-    global recording, recorded_finger_states, recorded_screenshot
-
-    ret, frame = capture.read()
-    if not ret or frame is None:
-        update_status("记录失败，请重试", ERROR)
-        button_record.config(state="normal")
+    """在记录窗口内从流水线的推理结果中收集关键点，不额外读取摄像头或推理"""
+    if args.match_mode == "dynamic":
+        update_status("正在记录，请完整做一遍动作...", PRIMARY)
+        request = pipeline.submit(TrajectoryCapture(RECORD_MOTION_S, min_score=RECORD_MIN_SCORE,
+                                                    aspect_ratio=dynamic_matcher.aspect_ratio))
+        root.after(RECORD_POLL_MS, finish_motion_recording, request)
         return
+    update_status("正在记录，请保持手势...", PRIMARY)
+    request = pipeline.submit(CaptureWindow(RECORD_WINDOW_S, min_score=RECORD_MIN_SCORE))
+    root.after(RECORD_POLL_MS, finish_recording, request)
 
-    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = hands.process(frame_rgb)
 
-    recorded_finger_states.clear()  # 清空之前的手势数据
-    if results.multi_hand_landmarks:
-        for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
-            hand_label = handedness.classification[0].label  # "Left" or "Right"
-            recorded_finger_states[hand_label] = get_finger_fold_state(hand_landmarks)
+def finish_recording(request):
+    """记录窗口结束后设置参考手势并保存截图"""
+    global recorded_thumbnail
+
+    if not request.done():
+        root.after(RECORD_POLL_MS, finish_recording, request)
+        return
 
-    if recorded_finger_states:
-        recorded_screenshot = Image.fromarray(frame_rgb)
+    captured = request.result()  # 记录左手 & 右手手势
+    if captured is not None:
+        matcher.set_reference(captured.finger_states())
+        similarity.set_reference(captured.hand_arrays, captured.hand_variances)
+        # 只保留缩略图，不再持有整帧截图；用未绘制关键点的原始帧
+        recorded_thumbnail = cv2.resize(cv2.cvtColor(captured.frame, cv2.COLOR_BGR2RGB), THUMBNAIL_SIZE,
+                                        interpolation=cv2.INTER_AREA)
         update_gesture_display()
         update_status("手势记录成功！请尝试复现", SUCCESS)
-        recording = True
+        # 写文件放到后台线程，不阻塞界面
+        threading.Thread(target=save_recording, args=(captured, recorded_thumbnail), daemon=True).start()
+    elif request.frames_considered == 0:
+        update_status("记录失败，请重试", ERROR)
     else:
-        update_status("未检测到手势，请重试", ERROR)
+        update_status("未检测到稳定的手势，请重试", ERROR)
 
     button_record.config(state="normal")
 
 
-button_record.config(command=start_recording)
-
-
-def get_finger_fold_state(hand_landmarks):
-    """计算手指折叠状态"""
-    finger_fold = []
-    landmarks = hand_landmarks.landmark
+def save_recording(captured, thumbnail):
+    try:
+        save_gesture(LAST_GESTURE_PATH, captured.hand_arrays, thumbnail, metadata=captured.metadata(),
+                     hand_variances=captured.hand_variances)
+    except OSError as e:
+        print(f"[错误] 保存手势失败: {e}")
 
-    for finger_tip, finger_pip in [
-        (mp_hands.HandLandmark.THUMB_TIP, mp_hands.HandLandmark.THUMB_IP),
-        (mp_hands.HandLandmark.INDEX_FINGER_TIP, mp_hands.HandLandmark.INDEX_FINGER_PIP),
-        (mp_hands.HandLandmark.MIDDLE_FINGER_TIP, mp_hands.HandLandmark.MIDDLE_FINGER_PIP),
-        (mp_hands.HandLandmark.RING_FINGER_TIP, mp_hands.HandLandmark.RING_FINGER_PIP),
-        (mp_hands.HandLandmark.PINKY_TIP, mp_hands.HandLandmark.PINKY_PIP),
-    ]:
-        finger_fold.append(landmarks[finger_tip].y > landmarks[finger_pip].y)
 
-    return tuple(finger_fold)
+def finish_motion_recording(request):
+    """动作记录窗口结束后设置模板并保存"""
+    global recorded_thumbnail
 
+    if not request.done():
+        root.after(RECORD_POLL_MS, finish_motion_recording, request)
+        return
 
-def update_gesture_display():
-    """在 Canvas 上显示手势截图"""
-    if recorded_screenshot:
-        screenshot_resized = recorded_screenshot.resize((240, 320))
-        img = ImageTk.PhotoImage(screenshot_resized)
-        gesture_canvas.create_image(120, 160, image=img)
-        gesture_canvas.image = img  # 防止垃圾回收
+    template = request.result()
+    if template is not None:
+        dynamic_matcher.set_reference(template)
+        recorded_thumbnail = cv2.resize(cv2.cvtColor(template.frame, cv2.COLOR_BGR2RGB), THUMBNAIL_SIZE,
+                                        interpolation=cv2.INTER_AREA)
+        template.thumbnail = recorded_thumbnail
+        update_gesture_display()
+        update_status("动作记录成功！请重复这个动作", SUCCESS)
+        threading.Thread(target=save_motion, args=(template,), daemon=True).start()
+    elif request.frames_considered == 0:
+        update_status("记录失败，请重试", ERROR)
+    else:
+        update_status("未检测到完整的动作，请重试", ERROR)
 
+    button_record.config(state="normal")
 
-def update_frame():
-    """摄像头画面更新 + 手势匹配"""
-    global action_count, recorded_finger_states, previous_state, current_state
 
-    ret, frame = capture.read()
-    if not ret or frame is None:
-        root.after(40, update_frame)
-        return
+def save_motion(template):
+    try:
+        os.makedirs(RECORDINGS_DIR, exist_ok=True)
+        template.save(LAST_MOTION_PATH)
+    except OSError as e:
+        print(f"[错误] 保存动作失败: {e}")
 
-    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = hands.process(frame_rgb)
 
-    detected_finger_states = {}
+button_record.config(command=start_recording)
 
-    # 绘制更美观的手部追踪效果
-    if results.multi_hand_landmarks:
-        for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
-            hand_label = handedness.classification[0].label
-            detected_finger_states[hand_label] = get_finger_fold_state(hand_landmarks)
-
-            # 自定义绘制样式
-            drawing_spec = mp_drawing.DrawingSpec(
-                color=(66, 133, 244),  # 蓝色
-                thickness=2,
-                circle_radius=2
-            )
-            connection_spec = mp_drawing.DrawingSpec(
-                color=(0, 230, 118),  # 绿色
-                thickness=2
-            )
-            mp_drawing.draw_landmarks(
-                frame_rgb,
-                hand_landmarks,
-                mp_hands.HAND_CONNECTIONS,
-                landmark_drawing_spec=drawing_spec,
-                connection_drawing_spec=connection_spec
-            )
 
-    if recording:
-        current_state = detected_finger_states == recorded_finger_states
-        if current_state:
-            if not previous_state:  # 只有在状态变化时更新
-                action_count += 1
-                label_counter.config(text=f"{action_count}")
-                update_status("匹配成功！", SUCCESS)
-        else:
-            if previous_state:  # 状态变化时更新
-                update_status("请继续尝试匹配手势", TEXT_DARK)
-        previous_state = current_state
+def update_gesture_display():
+    """在 Canvas 上显示手势截图"""
+    if recorded_thumbnail is not None:
+        img = ImageTk.PhotoImage(Image.fromarray(recorded_thumbnail))
+        gesture_canvas.create_image(120, 160, image=img)
+        gesture_canvas.image = img  # 防止垃圾回收
 
-    # 调整图像大小使其适应画布并保持纵横比
-    h, w = frame_rgb.shape[:2]
-    canvas_w = video_frame.winfo_width()
-    canvas_h = video_frame.winfo_height()
 
-    if canvas_w > 1 and canvas_h > 1:  # 确保画布已初始化
-        # 计算适当的缩放比例
-        scale = min(canvas_w / w, canvas_h / h)
-        new_w, new_h = int(w * scale), int(h * scale)
+def restore_last_gesture():
+    """启动时恢复上次记录的手势"""
+    global recorded_thumbnail
+
+    if args.match_mode == "dynamic":
+        return restore_last_motion()
+    if not os.path.exists(LAST_GESTURE_PATH):
+        return False
+    try:
+        gesture = load_gesture(LAST_GESTURE_PATH)
+        finger_states = gesture.finger_states()
+    except (OSError, ValueError) as e:
+        print(f"[错误] 读取上次的手势失败: {e}")
+        return False
+    if not finger_states:
+        return False
+
+    matcher.set_reference(finger_states)
+    similarity.set_reference(gesture.hand_arrays(), gesture.hand_variances())
+    recorded_thumbnail = gesture.thumbnail
+    update_gesture_display()
+    return True
+
+
+def restore_last_motion():
+    """动态动作模式：启动时恢复上次记录的动作"""
+    global recorded_thumbnail
+
+    if not os.path.exists(LAST_MOTION_PATH):
+        return False
+    try:
+        template = MotionTemplate.load(LAST_MOTION_PATH)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[错误] 读取上次的动作失败: {e}")
+        return False
+
+    dynamic_matcher.set_reference(template)
+    recorded_thumbnail = template.thumbnail
+    update_gesture_display()
+    return True
 
-        # 缩放图像
-        resized_frame = cv2.resize(frame_rgb, (new_w, new_h))
-        img = Image.fromarray(resized_frame)
-        img = ImageTk.PhotoImage(image=img)
 
-        # 居中显示图像
-        x_offset = (canvas_w - new_w) // 2
-        y_offset = (canvas_h - new_h) // 2
+def update_frame():
+    """显示流水线输出的最新帧 + 手势匹配"""
+    global last_perf_update
 
-        video_frame.delete("all")
-        video_frame.create_image(x_offset, y_offset, anchor="nw", image=img)
-        video_frame.image = img
+    packet = pipeline.latest()
+    if packet is None:
+        root.after(scheduler.next_poll_delay(False), update_frame)
+        return
 
-    root.after(40, update_frame)
+    if startup_timer.elapsed_ms("first_frame") is None:
+        on_first_frame()
+
+    hand_arrays = landmark_smoother.update(results_to_arrays(packet.results), packet.t_capture)
+
+    # 只有在状态变化时更新
+    score = None
+    active = dynamic_matcher if args.match_mode == "dynamic" else matcher
+    if args.match_mode == "dynamic":
+        event = dynamic_matcher.update(hand_arrays, packet.t_capture)
+        score = dynamic_matcher.progress()
+        show_similarity(score, caption="动作进度")
+    elif args.match_mode == "similarity" and similarity.has_reference:
+        score, _ = similarity.score(hand_arrays)
+        event = matcher.update_similarity(score)
+        show_similarity(score)
+    else:
+        event = matcher.update(fold_state_tuples(hand_arrays))
+    if template_library is not None:
+        show_templates(hand_arrays)
+    if event == "match":
+        label_counter.config(text=f"{active.action_count}")
+        update_status("匹配成功！", SUCCESS)
+    elif event == "release":
+        update_status("请继续尝试匹配手势", TEXT_DARK)
+
+    if session_recorder is not None:
+        session_recorder.append(
+            t_capture=packet.t_capture, seq=packet.seq, inferred=packet.inferred, landmarks=pack_hands(hand_arrays),
+            score=score, matched=event == "match" if active is dynamic_matcher else matcher.current_state,
+            action_count=active.action_count, inference_ms=(packet.t_inferred - packet.t_capture) * 1000,
+            render_ms=(packet.t_rendered - packet.t_inferred) * 1000, latency_ms=packet.latency_ms)
+
+    # 图像已在渲染线程中缩放写入显示缓冲区，这里只需把像素贴到已有的 PhotoImage 上
+    with scheduler.timed("blit"):
+        video_display.present()
+
+    # 每半秒刷新一次性能显示
+    if packet.t_capture - last_perf_update > 0.5:
+        last_perf_update = packet.t_capture
+        stats = scheduler.stats()
+        label_perf.config(text=f"{stats['fps']:.0f} FPS · 延迟 {packet.latency_ms:.0f} ms · "
+                               f"跳帧 {stats['skip_ratio']:.0%}")
+
+    root.after(scheduler.next_poll_delay(True), update_frame)
+
+
+def show_similarity(score, caption="相似度"):
+    """显示相似度（动态动作模式下为动作进度），数值变化时才更新控件"""
+    global shown_similarity
+
+    percent = int(round(score * 100))
+    if percent == shown_similarity:
+        return
+    shown_similarity = percent
+    color = SUCCESS if score >= args.similarity_threshold else WARN if score >= 0.5 else TEXT_SECONDARY
+    label_similarity.config(text=f"{caption} {percent}%", fg=color)
+    similarity_bar["value"] = percent
+
+
+def show_templates(hand_arrays):
+    """显示每只手在模板库中最接近的模板，文字变化时才更新控件"""
+    global shown_template
+
+    parts = []
+    for label, points in sorted(hand_arrays.items()):
+        nearest = template_library.classify(label, points, max_distance=LIBRARY_MAX_DISTANCE,
+                                            aspect_ratio=similarity.aspect_ratio)
+        parts.append(f"{HAND_NAMES.get(label, label)} {nearest[0][0] if nearest else '--'}")
+    text = "模板 " + (" · ".join(parts) if parts else "--")
+    if text == shown_template:
+        return
+    shown_template = text
+    label_template.config(text=text, fg=TEXT_DARK if parts else TEXT_SECONDARY)
+
+
+def on_first_frame():
+    """记录首帧时间，按命令行参数输出启动报告"""
+    startup_timer.mark("first_frame")
+    report = startup_timer.report()
+    print(f"[INFO] 首帧耗时 {report['time_to_first_frame_ms']} ms")
+    if args.startup_report:
+        startup_timer.write(args.startup_report)
+    if args.exit_after_first_frame:
+        root.after(0, on_close)
+
+
+def on_close():
+    """停止流水线并释放摄像头"""
+    if pipeline is not None:
+        pipeline.stop()
+    if capture is not None:
+        capture.release()
+    if session_recorder is not None:
+        active = dynamic_matcher if args.match_mode == "dynamic" else matcher
+        session_recorder.close(action_count=active.action_count)
+        print(f"会话记录已保存: {session_recorder.directory}（{session_recorder.frames_written} 帧）")
+    root.destroy()
 
 
 # 确保程序正常退出时释放摄像头
-root.protocol("WM_DELETE_WINDOW", lambda: (capture.release(), root.destroy()))
+root.protocol("WM_DELETE_WINDOW", on_close)
 
 # 首次更新状态
-update_status("等待记录手势...", TEXT_DARK)
+update_status("正在启动...", PRIMARY)
+startup_timer.mark("window_built")
+
+# 窗口先显示，模型和摄像头在后台加载；预启动模式下窗口隐藏，等待主菜单唤醒
+threading.Thread(target=load_backend, name="backend-loader", daemon=True).start()
+if args.warm:
+    root.withdraw()
+    threading.Thread(target=watch_launcher, name="launcher-watch", daemon=True).start()
+else:
+    root.after(0, lambda: startup_timer.mark("window_shown"))
+poll_loading()
 
 # 开始程序循环
-update_frame()
 root.mainloop()
\ No newline at end of file
@@ -1,14 +1,20 @@
 import tkinter as tk
 from tkinter import font, Canvas
-import subprocess
-import threading
+import os
+import queue
 import speech_recognition as sr
 import time
 import random
-import math
 import sys
 from PIL import Image, ImageTk, ImageDraw, ImageFilter
 
+from animation_clock import AnimationClock
+from particle_field import ParticleField
+from speech_backends import create_backend
+from voice_commands import default_grammar
+from voice_listener import VoiceListener
+from warm_launcher import WarmPool
+
 # 程序全局设置
 THEME_COLOR = {
     "dark_bg": "#101218",  # 深色背景
@@ -22,6 +28,11 @@ THEME_COLOR = {
     "text_dim": "#94A3B8"  # 暗色文字
 }
 
+# 支持 --warm / show 协议的训练模式脚本，主菜单空闲时预启动，切换时直接唤醒。
+# 其他脚本（如 pose_recognize.py）不能预启动：会立即显示窗口并占用摄像头，切换时冷启动
+WARM_SCRIPTS = ("hands_recognize.py",)
+warm_pool = WarmPool()
+
 
 # 日志函数 - 输出到控制台
 def log_info(message):
@@ -38,106 +49,125 @@ def log_error(message):
 
 # 定义粒子效果类
 class ParticleSystem:
+    FRAME_TIME = 0.03  # 粒子速度以每 30 毫秒移动的像素计
+
     def __init__(self, canvas, width, height, count=50):
         self.canvas = canvas
         self.width = width
         self.height = height
-        self.particles = []
         self.running = True
 
-        # 创建粒子
-        for _ in range(count):
-            x = random.randint(0, width)
-            y = random.randint(0, height)
-            size = random.uniform(1, 3)
-            speed = random.uniform(0.2, 1.0)
-            angle = random.uniform(0, 2 * math.pi)
-            color = random.choice([THEME_COLOR["primary"], THEME_COLOR["secondary"], "#2F80ED"])
-
-            self.particles.append({
-                "id": None,
-                "x": x,
-                "y": y,
-                "size": size,
-                "speed": speed,
-                "angle": angle,
-                "color": color
-            })
-
-    def update(self):
-        if not self.running:
-            return
-
-        self.canvas.delete("particle")
-
-        for p in self.particles:
-            # 更新位置
-            p["x"] += math.cos(p["angle"]) * p["speed"]
-            p["y"] += math.sin(p["angle"]) * p["speed"]
-
-            # 边界检查
-            if p["x"] < 0:
-                p["x"] = self.width
-            elif p["x"] > self.width:
-                p["x"] = 0
-
-            if p["y"] < 0:
-                p["y"] = self.height
-            elif p["y"] > self.height:
-                p["y"] = 0
-
-            # 绘制粒子
-            p["id"] = self.canvas.create_oval(
-                p["x"] - p["size"],
-                p["y"] - p["size"],
-                p["x"] + p["size"],
-                p["y"] + p["size"],
-                fill=p["color"],
+        # 粒子数据保存在 NumPy 数组中，连线用网格做邻居搜索
+        self.field = ParticleField(width, height, count, link_radius=100,
+                                   colors=[THEME_COLOR["primary"], THEME_COLOR["secondary"], "#2F80ED"])
+        self.line_colors = [f"#{opacity:02x}{opacity:02x}{opacity:02x}" for opacity in range(256)]
+
+        # 画布项只创建一次，之后每帧用 coords 移动；连线项放在池中复用，多余的隐藏
+        self.items_created = 0  # 累计创建的画布项数
+        self.items_created_last_frame = 0  # 最近一帧新建的画布项数，稳定后应为 0
+        self.tk_calls_last_frame = 0  # 最近一帧调用的画布方法次数
+        self.line_pool = []
+        self.line_pool_colors = []
+        self.visible_lines = 0
+
+        colors = self.field.colors
+        self.oval_items = []
+        for (x, y), size, color_index in zip(self.field.positions.tolist(), self.field.sizes.tolist(),
+                                             self.field.color_index.tolist()):
+            self.oval_items.append(self.canvas.create_oval(
+                x - size, y - size, x + size, y + size,
+                fill=colors[color_index],
                 outline="",
                 tags="particle"
-            )
+            ))
+        self.items_created += len(self.oval_items)
+
+    def _draw_links(self, positions):
+        """把连线画到池中的线条上，返回本帧调用的画布方法次数"""
+        first, second, opacity = self.field.neighbour_links()
+        canvas = self.canvas
+        calls = 0
+        link_count = len(first)
+
+        for k, (i, j, o) in enumerate(zip(first.tolist(), second.tolist(), opacity.tolist())):
+            (x1, y1), (x2, y2) = positions[i], positions[j]
+            color = self.line_colors[o]
+            if k == len(self.line_pool):
+                self.line_pool.append(canvas.create_line(x1, y1, x2, y2, fill=color, width=0.5, tags="particle"))
+                self.line_pool_colors.append(color)
+                self.items_created_last_frame += 1
+                calls += 1
+                continue
+            item = self.line_pool[k]
+            canvas.coords(item, x1, y1, x2, y2)
+            calls += 1
+            # 只在颜色或显示状态变化时修改属性
+            options = {}
+            if self.line_pool_colors[k] != color:
+                options["fill"] = color
+                self.line_pool_colors[k] = color
+            if k >= self.visible_lines:
+                options["state"] = "normal"
+            if options:
+                canvas.itemconfigure(item, **options)
+                calls += 1
+
+        # 本帧不再需要的线条隐藏起来，留待之后复用
+        for item in self.line_pool[link_count:self.visible_lines]:
+            canvas.itemconfigure(item, state="hidden")
+            calls += 1
+        self.visible_lines = link_count
+        return calls
+
+    def update(self, dt=FRAME_TIME):
+        """由动画时钟调用，返回 False 时停止"""
+        if not self.running:
+            return False
 
-        # 连接附近粒子
-        for i, p1 in enumerate(self.particles):
-            for p2 in self.particles[i + 1:]:
-                dx = p1["x"] - p2["x"]
-                dy = p1["y"] - p2["y"]
-                distance = math.sqrt(dx * dx + dy * dy)
+        self.items_created_last_frame = 0
 
-                if distance < 100:  # 连接距离阈值
-                    opacity = int(255 * (1 - distance / 100))
-                    if opacity > 30:  # 只画可见连线
-                        line_color = f"#{opacity:02x}{opacity:02x}{opacity:02x}"
-                        self.canvas.create_line(
-                            p1["x"], p1["y"], p2["x"], p2["y"],
-                            fill=line_color, width=0.5, tags="particle"
-                        )
+        # 更新位置（越界的从另一侧出现）
+        positions = self.field.step(dt / self.FRAME_TIME).tolist()
 
-        self.canvas.after(30, self.update)
+        # 移动粒子
+        coords = self.canvas.coords
+        for item, (x, y), size in zip(self.oval_items, positions, self.field.sizes.tolist()):
+            coords(item, x - size, y - size, x + size, y + size)
+
+        # 连接附近粒子
+        self.tk_calls_last_frame = len(self.oval_items) + self._draw_links(positions)
+        self.items_created += self.items_created_last_frame
 
 
 # 创建脉冲动画效果 - 修复颜色透明度问题
 class PulseEffect:
-    def __init__(self, canvas, x, y, color, max_radius=80):
+    SPAWN_INTERVAL = 1.0  # 每秒添加一个新圆
+    GROWTH_SPEED = 50  # 半径每秒增长的像素
+
+    def __init__(self, canvas, x, y, color, max_radius=80, clock=None):
         self.canvas = canvas
         self.x = x
         self.y = y
         self.color = color
         self.max_radius = max_radius
         self.circles = []
-        self.is_running = True
+        self.is_running = False
+        self._since_spawn = 0.0
         # 提取基础颜色（去除#）
         self.r = int(color[1:3], 16)
         self.g = int(color[3:5], 16)
         self.b = int(color[5:7], 16)
+        # 重复调用 start() 只会恢复同一个效果，不会叠加多个动画循环
+        self.effect = None
+        if clock is not None:
+            self.effect = clock.register("pulse", self.tick, interval=0.02, widget=canvas, active=False)
 
     def start(self):
-        if self.is_running:
-            try:
-                self.add_circle()
-                self.canvas.after(1000, self.start)  # 每秒添加一个新圆
-            except Exception as e:
-                log_error(f"脉冲效果启动错误: {str(e)}")
+        if not self.is_running:
+            self.is_running = True
+            self._since_spawn = self.SPAWN_INTERVAL  # 立即添加第一个圆
+        if self.effect is not None:
+            self.effect.resume()
 
     def add_circle(self):
         try:
@@ -146,20 +176,26 @@ class PulseEffect:
                 outline=self.color, width=2
             )
             self.circles.append({"id": circle_id, "radius": 0, "opacity": 1.0})
-            self.animate_circles()
         except Exception as e:
             log_error(f"添加圆形错误: {str(e)}")
 
-    def animate_circles(self):
-        if not self.is_running:
-            return
+    def tick(self, dt):
+        """由动画时钟调用：按时间添加新圆并扩大已有的圆"""
+        if self.is_running:
+            self._since_spawn += dt
+            if self._since_spawn >= self.SPAWN_INTERVAL:
+                self._since_spawn = 0.0
+                self.add_circle()
+        self.animate_circles(dt)
+        return self.is_running or bool(self.circles)
 
+    def animate_circles(self, dt):
         to_remove = []
 
         for circle in self.circles:
             try:
                 # 增加半径
-                circle["radius"] += 1
+                circle["radius"] += self.GROWTH_SPEED * dt
                 new_radius = circle["radius"]
 
                 # 降低透明度
@@ -196,9 +232,6 @@ class PulseEffect:
             except Exception:
                 pass  # 忽略移除错误
 
-        if self.circles and self.is_running:
-            self.canvas.after(20, self.animate_circles)
-
     def stop(self):
         self.is_running = False
 
@@ -207,7 +240,7 @@ class PulseEffect:
 class HoverButton(tk.Canvas):
     def __init__(self, master, text, command=None, width=200, height=60,
                  bg_color=THEME_COLOR["primary"], hover_color=None,
-                 text_color=THEME_COLOR["text_light"], font=None, radius=10, **kwargs):
+                 text_color=THEME_COLOR["text_light"], font=None, radius=10, clock=None, **kwargs):
         super().__init__(master, width=width, height=height,
                          bg=master["bg"], bd=0, highlightthickness=0, **kwargs)
 
@@ -224,8 +257,12 @@ class HoverButton(tk.Canvas):
         self.text_id = self.create_text(width / 2, height / 2, text=text,
                                         fill=text_color, font=font, tags="button_text")
 
-        # 创建闪光效果
+        # 创建闪光效果，由动画时钟驱动，悬停时恢复，扫过按钮后进入空闲
         self.shine_id = self.create_shine_effect()
+        self.shine_effect = None
+        if clock is not None:
+            self.shine_effect = clock.register(f"shine:{text}", self._move_shine, interval=0.02, widget=self,
+                                               active=False)
 
         # 绑定事件
         self.bind("<Enter>", self._on_enter)
@@ -261,22 +298,25 @@ class HoverButton(tk.Canvas):
             width=width / 10, fill="#F0F0F0"  # 使用浅灰色替代半透明白色
         )
 
+    SHINE_SPEED = 250  # 闪光每秒移动的像素
+
     def animate_shine(self):
-        if not hasattr(self, 'shine_id'):
+        if not hasattr(self, 'shine_id') or self.shine_effect is None:
             return
 
         width, height = self.width_val, self.height_val
         self.coords(self.shine_id, -width / 4, 0, -width / 4 + width / 3, height)
+        # 已在播放时从头开始，不会叠加第二个动画
+        self.shine_effect.resume()
 
-        def move_shine():
-            current_pos = self.coords(self.shine_id)
-            if current_pos[0] < width * 1.2:
-                self.move(self.shine_id, 5, 0)
-                self.after(20, move_shine)
-            else:
-                self.coords(self.shine_id, -width / 4, 0, -width / 4 + width / 3, height)
-
-        move_shine()
+    def _move_shine(self, dt):
+        width, height = self.width_val, self.height_val
+        current_pos = self.coords(self.shine_id)
+        if current_pos[0] < width * 1.2:
+            self.move(self.shine_id, self.SHINE_SPEED * dt, 0)
+            return True
+        self.coords(self.shine_id, -width / 4, 0, -width / 4 + width / 3, height)
+        return False
 
     def _darker(self, hex_color, factor=0.9):
         # 将颜色变暗
@@ -307,7 +347,7 @@ class HoverButton(tk.Canvas):
 
 # 语音波形可视化
 class WaveformVisualizer:
-    def __init__(self, canvas, x, y, width, height, color=THEME_COLOR["primary"]):
+    def __init__(self, canvas, x, y, width, height, color=THEME_COLOR["primary"], clock=None):
         self.canvas = canvas
         self.x = x
         self.y = y
@@ -321,6 +361,9 @@ class WaveformVisualizer:
 
         # 创建初始波形
         self.create_bars()
+        self.effect = None
+        if clock is not None:
+            self.effect = clock.register("waveform", self.animate, interval=0.1, widget=canvas, active=False)
 
     def create_bars(self):
         for i in range(self.bar_count):
@@ -335,7 +378,8 @@ class WaveformVisualizer:
 
     def start_animation(self):
         self.active = True
-        self.animate()
+        if self.effect is not None:
+            self.effect.resume()
 
     def stop_animation(self):
         self.active = False
@@ -352,9 +396,9 @@ class WaveformVisualizer:
             except:
                 pass  # Ignore errors if the canvas or item no longer exists
 
-    def animate(self):
+    def animate(self, dt=0.1):
         if not self.active:
-            return
+            return False
 
         for bar_id in self.bars:
             try:
@@ -374,135 +418,49 @@ class WaveformVisualizer:
             except:
                 pass  # Ignore errors if the canvas or item no longer exists
 
-        if self.active:
-            self.canvas.after(100, self.animate)
-
-
-# 改进的语音识别函数 - 提高精度并增加详细日志
-def enhanced_voice_recognition():
-    # 手势识别的多种表述
-    gesture_keywords = ["手势识别", "开启手势", "进入手势", "手势模式", "检测手势",
-                        "手势", "识别手势", "启动手势", "查看手势", "复健手势"]
+        return self.active
 
-    # 姿势识别的多种表述
-    pose_keywords = ["姿势识别", "开启姿势", "进入姿势", "姿势模式", "检测姿势",
-                     "姿势", "识别姿势", "启动姿势", "查看姿势", "复健姿势"]
 
-    # 检查语音识别模块是否正常加载
-    try:
-        recognizer = sr.Recognizer()
-        log_speech("初始化语音识别模块成功")
-    except Exception as e:
-        log_error(f"语音识别模块初始化失败: {str(e)}")
-        label_result.config(text=f"语音识别模块初始化失败: {str(e)}", fg=THEME_COLOR["danger"])
-        return
+# 语音监听线程只把结果放进队列，由 Tk 线程取出处理（Tk 控件和动画时钟都只能在 Tk 线程中操作）
+voice_events = queue.Queue()
+VOICE_POLL_MS = 50
 
-    # 更新状态显示并启动波形动画
-    label_result.config(text="请说出指令...", fg=THEME_COLOR["text_light"])
-    waveform.start_animation()
-    log_speech("开始等待语音输入...")
 
+def poll_voice_events():
     try:
-        # 尝试获取麦克风
-        mic = sr.Microphone()
-        log_speech("麦克风初始化成功")
-    except Exception as e:
-        log_error(f"麦克风访问失败: {str(e)}")
-        label_result.config(text=f"麦克风访问失败: {str(e)}", fg=THEME_COLOR["danger"])
-        waveform.stop_animation()
-        return
+        while True:
+            kind, result = voice_events.get_nowait()
+            if kind == "result":
+                handle_voice_result(result)
+            else:
+                handle_voice_timeout()
+    except queue.Empty:
+        pass
+    root.after(VOICE_POLL_MS, poll_voice_events)
 
-    with mic as source:
-        try:
-            # 增加环境噪声适应
-            log_speech("正在调整环境噪声...")
-            recognizer.dynamic_energy_threshold = True
-            recognizer.adjust_for_ambient_noise(source, duration=1.0)  # 增加噪声适应时间
-
-            # 调整参数以提高准确性
-            recognizer.energy_threshold = 280  # 降低阈值以更容易检测语音
-            recognizer.pause_threshold = 0.6  # 减小停顿阈值以更好地捕捉语句
-            recognizer.phrase_threshold = 0.3  # 降低短语阈值
-            recognizer.non_speaking_duration = 0.4  # 缩短非讲话持续时间
-
-            log_speech(
-                f"噪声参数设置完成: 能量阈值={recognizer.energy_threshold}, 停顿阈值={recognizer.pause_threshold}")
-
-            # 等待并获取音频
-            log_speech("正在监听...")
-            audio = recognizer.listen(source, timeout=8, phrase_time_limit=5)
-            log_speech("已捕获语音内容，准备识别")
-        except sr.WaitTimeoutError:
-            log_speech("等待超时，未检测到语音")
-            label_result.config(text="未检测到语音，请重试", fg=THEME_COLOR["warning"])
-            waveform.stop_animation()
-            return
-        except Exception as e:
-            log_error(f"录音出错: {str(e)}")
-            label_result.config(text=f"录音出错: {str(e)}", fg=THEME_COLOR["warning"])
-            waveform.stop_animation()
-            return
 
-    # 停止波形动画
+# 处理一条识别结果（在 Tk 线程中调用）
+def handle_voice_result(result):
     waveform.stop_animation()
-
     try:
-        # 尝试识别语音（使用中文）
-        label_result.config(text="正在处理...", fg=THEME_COLOR["text_dim"])
-        log_speech("正在转换语音到文字...")
-
-        # 尝试多次识别以提高准确性
-        try_count = 0
-        max_tries = 2
-        command = None
-
-        while try_count < max_tries:
-            try:
-                # 使用Google的语音识别API
-                command = recognizer.recognize_google(audio, language="zh-CN")
-                log_speech(f"识别结果 (尝试 {try_count + 1}): {command}")
-                break
-            except sr.UnknownValueError:
-                try_count += 1
-                if try_count < max_tries:
-                    log_speech(f"第{try_count}次识别失败，重试中...")
-                    continue
-                else:
-                    raise
-            except Exception:
-                raise
-
+        if result.error is not None:
+            raise result.error
+        command = result.text
         if not command:
-            raise sr.UnknownValueError("多次尝试后仍未能识别语音")
+            raise sr.UnknownValueError("未能识别语音")
+
+        timings = result.timings
+        log_speech(f"识别结果: {command} (按下到结果 {timings['press_to_result_ms']:.0f} ms，"
+                   f"语音结束后 {timings['end_to_result_ms']:.0f} ms，识别 {timings['recognize_ms']:.0f} ms)")
 
         # 在界面显示识别结果
         label_result.config(text=f"识别结果：{command}")
         log_speech(f"最终识别结果: 「{command}」")
 
-        # 转换为小写并去除空格以增强匹配能力
-        processed_command = command.lower().replace(" ", "")
-        log_speech(f"处理后命令: {processed_command}")
-
-        # 检查是否匹配手势识别关键词
-        if any(keyword in processed_command for keyword in gesture_keywords):
-            matched_keyword = next((k for k in gesture_keywords if k in processed_command), None)
-            log_speech(f"匹配到手势识别关键词: {matched_keyword}")
-            label_result.config(text=f"正在启动手势识别...", fg=THEME_COLOR["success"])
-            fade_and_launch("hands_recognize.py")
-
-        # 检查是否匹配姿势识别关键词
-        elif any(keyword in processed_command for keyword in pose_keywords):
-            matched_keyword = next((k for k in pose_keywords if k in processed_command), None)
-            log_speech(f"匹配到姿势识别关键词: {matched_keyword}")
-            label_result.config(text=f"正在启动姿势识别...", fg=THEME_COLOR["success"])
-            fade_and_launch("pose_recognize.py")
-
-        # 处理"退出"或"关闭"指令
-        elif any(keyword in processed_command for keyword in ["退出", "关闭", "结束", "再见"]):
-            matched_keyword = next((k for k in ["退出", "关闭", "结束", "再见"] if k in processed_command), None)
-            log_speech(f"匹配到退出关键词: {matched_keyword}")
-            label_result.config(text="正在关闭程序...", fg=THEME_COLOR["danger"])
-            fade_out_and_close()
+        # 在指令语法中查找并执行对应的处理函数
+        match = voice_grammar.dispatch(command)
+        if match is not None:
+            log_speech(f"匹配到关键词: {match.keyword} -> {match.command}{'（拼音近似）' if match.fuzzy else ''}")
 
         # 处理不明确的指令
         else:
@@ -518,10 +476,46 @@ def enhanced_voice_recognition():
     except Exception as e:
         log_error(f"语音识别处理错误: {str(e)}")
         label_result.config(text=f"处理出错: {str(e)}", fg=THEME_COLOR["danger"])
+    finally:
+        # 重新启用语音按钮
+        button_voice.config(state="normal")
+        log_info("语音识别过程结束，按钮已重新启用")
 
 
-# 启动语音识别线程
+# 语音指令：新的模式在这里注册关键词和处理函数即可
+def launch_mode_by_voice(script_name, title):
+    label_result.config(text=f"正在启动{title}...", fg=THEME_COLOR["success"])
+    fade_and_launch(script_name)
+
+
+def close_by_voice():
+    label_result.config(text="正在关闭程序...", fg=THEME_COLOR["danger"])
+    fade_out_and_close()
+
+
+voice_grammar = default_grammar()
+voice_grammar.register("gesture", handler=lambda: launch_mode_by_voice("hands_recognize.py", "手势识别"))
+voice_grammar.register("pose", handler=lambda: launch_mode_by_voice("pose_recognize.py", "姿势识别"))
+voice_grammar.register("exit", handler=close_by_voice)
+
+
+# 按下按钮后一直没有说话
+def handle_voice_timeout():
+    log_speech("等待超时，未检测到语音")
+    waveform.stop_animation()
+    label_result.config(text="未检测到语音，请重试", fg=THEME_COLOR["warning"])
+    button_voice.config(state="normal")
+
+
+# 开始等待一条语音指令：麦克风常开，无需每次重新校准噪声
 def start_voice_recognition():
+    if voice_listener.error is not None:
+        label_result.config(text=f"麦克风访问失败: {voice_listener.error}", fg=THEME_COLOR["danger"])
+        return
+    if not voice_listener.ready.is_set():
+        label_result.config(text="语音模块正在启动，请稍候...", fg=THEME_COLOR["text_dim"])
+        return
+
     # 禁用语音按钮防止重复点击
     button_voice.config(state="disabled")
     log_info("开始语音识别过程")
@@ -532,35 +526,31 @@ def start_voice_recognition():
     except Exception as e:
         log_error(f"脉冲效果启动失败: {str(e)}")
 
-    # 在新线程中启动语音识别
-    def voice_thread():
-        try:
-            enhanced_voice_recognition()
-        except Exception as e:
-            log_error(f"语音识别线程出错: {e}")
-            label_result.config(text=f"语音识别出错: {str(e)[:50]}...", fg=THEME_COLOR["danger"])
-        finally:
-            # 重新启用语音按钮
-            root.after(0, lambda: button_voice.config(state="normal"))
-            log_info("语音识别过程结束，按钮已重新启用")
-
-    threading.Thread(target=voice_thread, daemon=True).start()
+    # 更新状态显示并启动波形动画
+    label_result.config(text="请说出指令...", fg=THEME_COLOR["text_light"])
+    waveform.start_animation()
+    voice_listener.arm()
+    log_speech(f"开始等待语音输入... (噪声阈值 {voice_listener.energy_threshold:.0f})")
 
 
 # 淡出并关闭程序
 def fade_out_and_close():
     log_info("正在关闭程序...")
 
-    def fade():
+    def fade(dt):
         alpha = root.attributes("-alpha")
         if alpha > 0:
-            alpha -= 0.05
-            root.attributes("-alpha", alpha)
-            root.after(30, fade)
-        else:
-            root.destroy()
+            root.attributes("-alpha", max(0.0, alpha - FADE_SPEED * dt))
+            return True
+        log_info(f"动画统计: {animation_clock.stats()}")
+        log_info(f"语音延迟统计: {voice_listener.stats()}")
+        voice_listener.stop()
+        animation_clock.stop()
+        warm_pool.shutdown()
+        root.destroy()
+        return False
 
-    fade()
+    animation_clock.register("fade_out", fade, interval=0.03)
 
 
 # 淡出并跳转至其他脚本
@@ -570,18 +560,22 @@ def fade_and_launch(script_name):
     label_result.config(text=f"正在启动...", fg=THEME_COLOR["success"])
 
     def delayed_fade():
-        def fade():
+        def fade(dt):
             alpha = root.attributes("-alpha")
             if alpha > 0:
-                alpha -= 0.05
-                root.attributes("-alpha", alpha)
-                root.after(30, fade)
-            else:
-                log_info(f"正在启动: {script_name}")
-                root.destroy()
-                subprocess.Popen(["python", script_name])
+                root.attributes("-alpha", max(0.0, alpha - FADE_SPEED * dt))
+                return True
+            log_info(f"正在启动: {script_name}")
+            voice_listener.stop()  # 释放麦克风
+            animation_clock.stop()
+            root.destroy()
+            _, warm = warm_pool.launch(script_name)
+            log_info("已唤醒预启动的进程" if warm else "冷启动")
+            # 其余未使用的预启动进程随之退出
+            warm_pool.shutdown()
+            return False
 
-        fade()
+        animation_clock.register("fade_launch", fade, interval=0.03)
 
     # 使用after代替time.sleep，避免UI冻结
     root.after(500, delayed_fade)
@@ -609,6 +603,10 @@ root.resizable(False, False)  # 禁止调整窗口大小以避免缩放问题
 root.configure(bg=THEME_COLOR["dark_bg"])
 root.attributes("-alpha", 1.0)
 
+# 所有动画效果共用一个时钟，统一驱动、统一重绘
+animation_clock = AnimationClock(root, target_fps=50, min_fps=15)
+FADE_SPEED = 0.05 / 0.03  # 淡出时每秒降低的不透明度，与原先每 30 毫秒 0.05 相同
+
 # 创建全屏背景画布（用于粒子效果）
 bg_canvas = Canvas(root, bg=THEME_COLOR["dark_bg"], highlightthickness=0)
 bg_canvas.place(x=0, y=0, width=window_width, height=window_height)
@@ -616,7 +614,7 @@ bg_canvas.place(x=0, y=0, width=window_width, height=window_height)
 # 初始化粒子系统
 log_info("初始化粒子系统...")
 particle_system = ParticleSystem(bg_canvas, window_width, window_height, count=80)
-particle_system.update()
+animation_clock.register("particles", particle_system.update, interval=ParticleSystem.FRAME_TIME, widget=bg_canvas)
 
 # 创建主内容面板
 panel_width = int(window_width * 0.7)
@@ -652,7 +650,8 @@ logo_canvas.create_text(40, 40, text="康复",
                         fill="white")
 
 # 为Logo添加脉冲效果
-pulse_effect = PulseEffect(logo_canvas, 40, 40, color=THEME_COLOR["primary"], max_radius=75)
+pulse_effect = PulseEffect(logo_canvas, 40, 40, color=THEME_COLOR["primary"], max_radius=75,
+                           clock=animation_clock)
 
 # 标题文字
 label_title = tk.Label(main_frame, text="康 复 魔 镜", font=title_font, bg=THEME_COLOR["light_bg"],
@@ -680,7 +679,8 @@ button_gesture = HoverButton(
     command=lambda: fade_and_launch("hands_recognize.py"),
     width=btn_width, height=btn_height,
     bg_color=THEME_COLOR["primary"],
-    font=button_font
+    font=button_font,
+    clock=animation_clock
 )
 button_gesture.grid(row=0, column=0, padx=15, pady=10)
 
@@ -691,7 +691,8 @@ button_pose = HoverButton(
     command=lambda: fade_and_launch("pose_recognize.py"),
     width=btn_width, height=btn_height,
     bg_color=THEME_COLOR["success"],
-    font=button_font
+    font=button_font,
+    clock=animation_clock
 )
 button_pose.grid(row=0, column=1, padx=15, pady=10)
 
@@ -702,7 +703,8 @@ button_voice = HoverButton(
     command=start_voice_recognition,  # 使用实际的语音识别函数
     width=btn_width, height=btn_height,
     bg_color=THEME_COLOR["secondary"],
-    font=button_font
+    font=button_font,
+    clock=animation_clock
 )
 button_voice.pack(pady=20)
 
@@ -710,7 +712,8 @@ button_voice.pack(pady=20)
 waveform_canvas = tk.Canvas(main_frame, width=250, height=40,
                             bg=THEME_COLOR["light_bg"], highlightthickness=0)
 waveform_canvas.pack(pady=5)
-waveform = WaveformVisualizer(waveform_canvas, 45, 20, 160, 30, color=THEME_COLOR["secondary"])
+waveform = WaveformVisualizer(waveform_canvas, 45, 20, 160, 30, color=THEME_COLOR["secondary"],
+                              clock=animation_clock)
 
 # 语音识别结果提示
 label_result = tk.Label(main_frame,
@@ -727,7 +730,32 @@ footer_label = tk.Label(root, text="© 2025 康复魔镜 · AI辅助康复训练
                         bg=THEME_COLOR["dark_bg"], fg=THEME_COLOR["text_dim"])
 footer_label.pack(side="bottom", pady=15)
 
+
+
+def prewarm_modes():
+    """在后台预启动各模式的识别程序（加载模型后隐藏等待）"""
+    for script_name in WARM_SCRIPTS:
+        if warm_pool.prewarm(script_name):
+            log_info(f"已预启动: {script_name}")
+
+
+# 语音监听在后台常驻：麦克风一直打开并持续跟踪环境噪声
+voice_listener = VoiceListener(
+    lambda: create_backend(log=log_speech, phrases=voice_grammar.phrases()),
+    on_result=lambda result: voice_events.put(("result", result)),
+    on_timeout=lambda: voice_events.put(("timeout", None)),
+    calibration_path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "recordings",
+                                  "voice_calibration.json"),
+    log=log_speech,
+)
+voice_listener.start()
+poll_voice_events()
+
+# 等主界面动画开始后再预启动，避免与界面初始化争抢 CPU
+root.after(1500, prewarm_modes)
+
 log_info("主界面初始化完成，启动主循环")
 
 # 启动主循环
+animation_clock.start()
 root.mainloop()
\ No newline at end of file
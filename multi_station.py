@@ -0,0 +1,271 @@
+"""一台机器同时服务多个训练工位
+
+每个摄像头 / 视频流对应一个工位：协调进程中的采集线程把画面直接读入该工位的共享内存环形缓冲区，
+独立的工作进程持有自己的 Hands 实例完成推理和匹配，只把很小的结果字典通过队列发回协调进程。
+推理分布在多个进程上，可以利用多核 CPU，而不再受限于单个 Tk 主循环和 GIL。
+
+所有工作进程加载完模型后才开始采集；视频文件按其帧率读取（模拟摄像头），读完后工作进程处理完
+最后一帧即退出，全部退出后程序结束。
+
+用法示例:
+    python multi_station.py 0 1 rtsp://192.168.1.20/stream --reference recordings/last_gesture.gst
+    python multi_station.py a.mp4 b.mp4 --reference gesture.json --duration 60 --output stations.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import queue
+import sys
+import threading
+import time
+
+import cv2
+
+from hands_batch import load_reference
+from shared_frame_ring import SharedFrameRing
+
+
+def station_worker(station_id, ring_spec, reference_states, result_queue, stop_event, ready_event, input_done):
+    """工作进程：持有自己的 Hands 实例，对本工位的画面做推理和匹配
+
+    模型加载完成后置位 ready_event；input_done 置位（视频读完）且没有新帧时退出。
+    """
+    import mediapipe as mp
+
+    from gesture_matcher import GestureMatcher, fold_state_tuples
+    from gesture_smoothing import DecisionEngine, LandmarkSmoother
+    from hand_features import results_to_arrays
+
+    ring = SharedFrameRing.attach(ring_spec)
+    smoother = LandmarkSmoother()
+    matcher = GestureMatcher(reference_states, decision=DecisionEngine())
+    processed = 0
+
+    try:
+        with mp.solutions.hands.Hands(min_detection_confidence=0.5, min_tracking_confidence=0.5) as hands:
+            ready_event.set()
+            start = time.perf_counter()
+            while not stop_event.is_set():
+                # 先读标志再取帧：标志置位前写入的帧一定能取到，取不到即已处理完
+                finished = input_done.is_set()
+                view = ring.acquire_latest(timeout=0.1)
+                if view is None:
+                    if finished:
+                        break
+                    continue
+                with view:
+                    # 直接在共享内存上做颜色转换，不拷贝原始帧
+                    seq, dropped = view.seq, view.dropped
+                    frame_rgb = cv2.cvtColor(view.frame, cv2.COLOR_BGR2RGB)
+
+                timestamp = time.perf_counter()
+                results = hands.process(frame_rgb)
+                hand_arrays = smoother.update(results_to_arrays(results), timestamp)
+                finger_states = fold_state_tuples(hand_arrays)
+                event = matcher.update(finger_states)
+                processed += 1
+
+                result_queue.put({
+                    "station": station_id,
+                    "seq": seq,
+                    "dropped": dropped,
+                    "inference_ms": (time.perf_counter() - timestamp) * 1000,
+                    "hands": {label: list(states) for label, states in finger_states.items()},
+                    "matched": matcher.current_state,
+                    "event": event,
+                    "action_count": matcher.action_count,
+                    "fps": processed / (time.perf_counter() - start),
+                })
+    finally:
+        ring.close()
+
+
+class Station:
+    """协调进程中的一个工位：采集线程 + 共享内存环形缓冲区 + 工作进程"""
+
+    def __init__(self, station_id, source):
+        self.station_id = station_id
+        self.source = int(source) if str(source).isdigit() else source
+        self.capture = None
+        self.ring = None
+        self.process = None
+        self.thread = None
+        self.ready = None  # 工作进程加载完模型
+        self.input_done = None  # 视频文件读完
+        self.interval = 0.0  # 视频文件按其帧率读取，摄像头和网络流不限速
+        self.frames_captured = 0
+        self.status = {"action_count": 0, "matched": False, "fps": 0.0, "dropped": 0}
+
+    @property
+    def is_file(self):
+        return isinstance(self.source, str) and not self.source.startswith(("rtsp", "http"))
+
+    def open(self):
+        self.capture = cv2.VideoCapture(self.source)
+        ret, frame = self.capture.read() if self.capture.isOpened() else (False, None)
+        if not ret or frame is None:
+            raise IOError(f"无法打开视频源: {self.source}")
+        if self.is_file:
+            fps = self.capture.get(cv2.CAP_PROP_FPS)
+            self.interval = 1.0 / (fps if fps and fps > 0 else 30.0)
+        return frame
+
+
+class MultiStationCoordinator:
+    def __init__(self, sources, reference_states):
+        self.ctx = multiprocessing.get_context("spawn")  # MediaPipe 不适合在 fork 出的子进程中使用
+        self.stations = [Station(i, source) for i, source in enumerate(sources)]
+        self.reference_states = reference_states
+        self.result_queue = self.ctx.Queue(maxsize=1000)
+        self.stop_event = self.ctx.Event()
+        self._running = False
+
+    def start(self, ready_timeout=120.0):
+        """启动工作进程，等全部加载完模型后再开始采集；超时或工作进程退出时抛出 RuntimeError"""
+        self._running = True
+        for station in self.stations:
+            first_frame = station.open()
+            station.ring = SharedFrameRing(first_frame.shape, slots=4, lock=self.ctx.Lock(),
+                                           new_frame=self.ctx.Event())
+            station.ring.write(first_frame)
+            station.ready, station.input_done = self.ctx.Event(), self.ctx.Event()
+            station.process = self.ctx.Process(
+                target=station_worker,
+                args=(station.station_id, station.ring.spec(), self.reference_states, self.result_queue,
+                      self.stop_event, station.ready, station.input_done),
+                daemon=True,
+            )
+            station.process.start()
+
+        deadline = time.perf_counter() + ready_timeout
+        for station in self.stations:
+            while not station.ready.wait(0.1):
+                if not station.process.is_alive():
+                    raise RuntimeError(f"工位 {station.station_id} 的工作进程启动失败")
+                if time.perf_counter() > deadline:
+                    raise RuntimeError(f"工位 {station.station_id} 的工作进程加载超时")
+
+        for station in self.stations:
+            station.thread = threading.Thread(target=self._capture_loop, args=(station,), daemon=True)
+            station.thread.start()
+
+    def _capture_loop(self, station):
+        ring = station.ring
+        height, width = ring.shape[:2]
+        next_read = time.perf_counter()
+        while self._running:
+            if station.interval:
+                delay = next_read - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                next_read = max(next_read + station.interval, time.perf_counter())
+            # 直接解码到共享内存槽位中，不经过中间拷贝
+            buffer = ring.begin_write()
+            ret, frame = station.capture.read(buffer)
+            if not ret or frame is None:
+                ring.abort_write()
+                if station.is_file:
+                    station.input_done.set()  # 视频文件读完，工作进程处理完剩余的帧后退出
+                    break
+                time.sleep(0.01)
+                continue
+            if frame.ctypes.data != buffer.ctypes.data:
+                # 分辨率变化等情况下 OpenCV 会另行分配，缩放回槽位
+                cv2.resize(frame, (width, height), dst=buffer)
+            ring.commit_write()
+            station.frames_captured += 1
+
+    def poll_results(self, timeout=0.1):
+        """从队列中取出工作进程发回的结果，更新各工位状态，返回本次取到的结果列表"""
+        results = []
+        try:
+            result = self.result_queue.get(timeout=timeout)
+            while True:
+                station = self.stations[result["station"]]
+                station.status["action_count"] = result["action_count"]
+                station.status["matched"] = result["matched"]
+                station.status["fps"] = result["fps"]
+                station.status["dropped"] += result["dropped"]
+                results.append(result)
+                result = self.result_queue.get_nowait()
+        except queue.Empty:
+            pass
+        return results
+
+    def finished(self):
+        """所有工作进程都已退出（视频读完并处理完）。之后队列中剩余的结果仍需取出"""
+        return not any(station.process.is_alive() for station in self.stations)
+
+    def summary(self):
+        return [
+            dict(station=s.station_id, source=str(s.source), frames_captured=s.frames_captured, **s.status)
+            for s in self.stations
+        ]
+
+    def stop(self):
+        self._running = False
+        self.stop_event.set()
+        for station in self.stations:
+            if station.thread is not None:
+                station.thread.join(timeout=1.0)
+            if station.process is not None:
+                station.process.join(timeout=3.0)
+                if station.process.is_alive():
+                    station.process.terminate()
+            if station.capture is not None:
+                station.capture.release()
+            if station.ring is not None:
+                station.ring.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="多工位手势匹配")
+    parser.add_argument("sources", nargs="+", help="摄像头编号、视频文件或网络流地址，每个对应一个工位")
+    parser.add_argument("--reference", required=True, help="参考手势：.gst、JSON 或图片文件")
+    parser.add_argument("--duration", type=float, help="运行秒数，不指定则运行到视频结束或 Ctrl+C")
+    parser.add_argument("--output", help="结束时把各工位的汇总写入 JSON 文件")
+    args = parser.parse_args(argv)
+
+    reference_states = load_reference(args.reference)
+    if not reference_states:
+        print("参考手势中未检测到手", file=sys.stderr)
+        return 1
+
+    coordinator = MultiStationCoordinator(args.sources, reference_states)
+    try:
+        coordinator.start()
+    except (IOError, RuntimeError) as e:
+        coordinator.stop()
+        print(e, file=sys.stderr)
+        return 1
+    start = time.perf_counter()
+    last_report = start
+    try:
+        while args.duration is None or time.perf_counter() - start < args.duration:
+            # 先检查再取结果：工作进程退出前已把结果全部写入队列
+            finished = coordinator.finished()
+            for result in coordinator.poll_results():
+                if result["event"] == "match":
+                    print(f"[工位 {result['station']}] 匹配成功，计数 {result['action_count']}")
+            if time.perf_counter() - last_report > 5:
+                last_report = time.perf_counter()
+                print(" | ".join(f"工位 {s['station']}: {s['action_count']} 次 {s['fps']:.1f} FPS"
+                                 for s in coordinator.summary()))
+            if finished and coordinator.result_queue.empty():
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        coordinator.stop()
+
+    summary = coordinator.summary()
+    print(json.dumps(summary, ensure_ascii=False))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
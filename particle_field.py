@@ -0,0 +1,97 @@
+"""主菜单背景粒子的数据和邻居搜索
+
+粒子位置、速度保存在 NumPy 数组中，每帧一次向量化移动。连线只在距离小于 link_radius 的粒子之间绘制，
+邻居搜索使用边长为 link_radius 的均匀网格：每个粒子只需与本格及右、下方相邻 4 格中的粒子比较，
+每帧的距离计算次数随粒子数近似线性增长，而不是两两比较的 n(n-1)/2。
+"""
+
+import numpy as np
+
+# 每对相邻格子只检查一次：本格 + 右、左下、下、右下
+_HALF_NEIGHBOURHOOD = ((0, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+
+MIN_LINK_OPACITY = 30  # 更暗的连线看不见，不绘制
+
+
+class ParticleField:
+    def __init__(self, width, height, count=50, link_radius=100, colors=("#FFFFFF",), seed=None):
+        self.width = width
+        self.height = height
+        self.link_radius = link_radius
+        self.colors = list(colors)
+        self.pair_checks = 0  # 最近一次 neighbour_links() 做的距离计算次数
+
+        rng = np.random.default_rng(seed)
+        self.positions = rng.uniform((0, 0), (width, height), size=(count, 2))
+        speed = rng.uniform(0.2, 1.0, count)
+        angle = rng.uniform(0, 2 * np.pi, count)
+        self.velocities = np.stack([np.cos(angle) * speed, np.sin(angle) * speed], axis=1)
+        self.sizes = rng.uniform(1, 3, count)
+        self.color_index = rng.integers(0, len(self.colors), count)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def step(self, scale=1.0):
+        """所有粒子移动一步（scale 倍的速度），越过边界的从另一侧出现"""
+        pos = self.positions
+        if scale == 1.0:
+            pos += self.velocities
+        else:
+            pos += self.velocities * scale
+        size = np.array([self.width, self.height], dtype=pos.dtype)
+        # 与原先逐个粒子的判断一致：小于 0 移到最大边，超过最大边移到 0
+        np.copyto(pos, np.broadcast_to(size, pos.shape), where=pos < 0)
+        pos[pos > size] = 0
+        return pos
+
+    def _grid_candidates(self):
+        """按网格生成候选粒子对 (i, j)，i < j，不包含距离明显超出半径的对"""
+        count = len(self.positions)
+        cells = (self.positions // self.link_radius).astype(np.int64)
+        rows = int(self.height // self.link_radius) + 1
+        cols = int(self.width // self.link_radius) + 1
+        np.clip(cells[:, 0], 0, cols - 1, out=cells[:, 0])
+        np.clip(cells[:, 1], 0, rows - 1, out=cells[:, 1])
+
+        keys = cells[:, 1] * cols + cells[:, 0]
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        indices = np.arange(count)
+
+        firsts, seconds = [], []
+        for dx, dy in _HALF_NEIGHBOURHOOD:
+            nx = cells[:, 0] + dx
+            ny = cells[:, 1] + dy
+            valid = (nx >= 0) & (nx < cols) & (ny < rows)
+            neighbour_keys = ny * cols + nx
+            start = np.searchsorted(sorted_keys, neighbour_keys, "left")
+            end = np.searchsorted(sorted_keys, neighbour_keys, "right")
+            counts = np.where(valid, end - start, 0)
+            total = int(counts.sum())
+            if total == 0:
+                continue
+            # 把每个粒子对应的 [start, end) 区间展开成扁平的候选下标
+            run_offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            first = np.repeat(indices, counts)
+            second = order[np.repeat(start, counts) + run_offsets]
+            if dx == 0 and dy == 0:
+                keep = first < second
+                first, second = first[keep], second[keep]
+            firsts.append(first)
+            seconds.append(second)
+
+        if not firsts:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        return np.concatenate(firsts), np.concatenate(seconds)
+
+    def neighbour_links(self):
+        """返回需要连线的粒子对 (i, j, 不透明度 0-255)，与原先两两比较的结果相同"""
+        first, second = self._grid_candidates()
+        self.pair_checks = len(first)
+        delta = self.positions[first] - self.positions[second]
+        distance = np.sqrt(np.einsum("ij,ij->i", delta, delta))
+        opacity = (255 * (1 - distance / self.link_radius)).astype(np.int64)
+        keep = (distance < self.link_radius) & (opacity > MIN_LINK_OPACITY)
+        return first[keep], second[keep], opacity[keep]
@@ -0,0 +1,204 @@
+"""复健会话的逐帧记录：列式、只追加、可内存映射
+
+界面线程每显示一帧调用一次 append()，只把这一帧的数值放进内存中的待写列表；
+后台写入线程每隔 flush_interval 秒把积累的帧按列批量追加到文件，界面线程从不等待磁盘。
+
+每个会话一个目录:
+    recordings/sessions/20250101-093000/
+        schema.json        列名、类型、形状和会话信息（开始时间、匹配方式、最终计数等）
+        t_capture.bin      每列一个文件，按帧依次追加的定长原始数据（小端）
+        landmarks.bin
+        ...
+
+定长的原始数据可以直接用 np.memmap 打开，一小时的会话（约 60 MB）也无需整体读入内存：
+    schema, columns = load_session("recordings/sessions/20250101-093000")
+    columns["latency_ms"][::30]
+程序意外退出时 schema.json 中没有最终帧数，已写入的帧仍可读取（帧数按文件大小计算）。
+
+命令行查看会话摘要:
+    python session_recorder.py recordings/sessions/20250101-093000
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+HAND_LABELS = ("Left", "Right")
+
+# (列名, 类型, 每帧的形状)
+COLUMNS = (
+    ("t_capture", "<f8", ()),  # 采集时间（time.perf_counter 秒，见 schema 中的 perf_origin）
+    ("seq", "<i8", ()),  # 采集序号
+    ("inferred", "u1", ()),  # 该帧是否做了推理（否则复用了上一帧的结果）
+    ("landmarks", "<f4", (len(HAND_LABELS), 21, 3)),  # 平滑后的关键点，按 HAND_LABELS 顺序，未检测到为 NaN
+    ("score", "<f4", ()),  # 相似度或动作进度（0-1），没有连续得分时为 NaN
+    ("matched", "u1", ()),  # 去抖后的匹配状态
+    ("action_count", "<i4", ()),
+    ("inference_ms", "<f4", ()),  # 采集 -> 推理完成
+    ("render_ms", "<f4", ()),  # 推理完成 -> 渲染完成
+    ("latency_ms", "<f4", ()),  # 采集 -> 显示
+)
+
+
+def pack_hands(hand_arrays):
+    """{"Left"/"Right": (21, 3)} -> (2, 21, 3) 数组，缺少的手为 NaN（拷贝一份，之后原数组可被修改）"""
+    packed = np.full((len(HAND_LABELS), 21, 3), np.nan, dtype=np.float32)
+    for index, label in enumerate(HAND_LABELS):
+        if label in hand_arrays:
+            packed[index] = hand_arrays[label]
+    return packed
+
+
+def new_session_dir(root):
+    return os.path.join(root, time.strftime("%Y%m%d-%H%M%S"))
+
+
+class SessionRecorder:
+    def __init__(self, directory, metadata=None, columns=COLUMNS, flush_interval=0.5, log=print):
+        self.directory = directory
+        self.columns = [(name, np.dtype(dtype), tuple(shape)) for name, dtype, shape in columns]
+        self.flush_interval = flush_interval
+        self.log = log
+        self.frames_written = 0
+        self.error = None  # 写入失败的原因，之后的帧不再记录
+
+        os.makedirs(directory, exist_ok=True)
+        self.schema = {
+            "version": 1,
+            "columns": [{"name": name, "dtype": dtype.str, "shape": list(shape)}
+                        for name, dtype, shape in self.columns],
+            "started": time.strftime("%Y-%m-%d %H:%M:%S"),
+            # t_capture 为 perf_counter 时间，加上 wall_origin - perf_origin 即为 Unix 时间
+            "perf_origin": time.perf_counter(),
+            "wall_origin": time.time(),
+            "frames": None,
+            **(metadata or {}),
+        }
+        self._write_schema()
+        self._files = {name: open(os.path.join(directory, f"{name}.bin"), "ab") for name, _, _ in self.columns}
+
+        self._pending = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="session-writer", daemon=True)
+        self._thread.start()
+
+    def _write_schema(self):
+        path = os.path.join(self.directory, "schema.json")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.schema, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def append(self, **values):
+        """记录一帧，参数为各列的值（缺少的列记为 0 / NaN）。只在内存中排队，不做磁盘操作"""
+        if self.error is None:
+            with self._cond:
+                self._pending.append(values)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._closed:
+                    self._cond.wait(self.flush_interval)
+                rows, self._pending = self._pending, []
+                closed = self._closed
+            if rows and self.error is None:
+                try:
+                    self._write(rows)
+                except OSError as e:
+                    self.error = e
+                    self.log(f"[错误] 会话记录写入失败，停止记录: {e}")
+            if closed:
+                return
+
+    def _write(self, rows):
+        for name, dtype, shape in self.columns:
+            column = np.zeros((len(rows),) + shape, dtype=dtype)
+            if dtype.kind == "f":
+                column.fill(np.nan)
+            for index, row in enumerate(rows):
+                value = row.get(name)
+                if value is not None:
+                    column[index] = value
+            self._files[name].write(column.tobytes())
+        for f in self._files.values():
+            f.flush()
+        self.frames_written += len(rows)
+
+    def close(self, **metadata):
+        """写完剩余的帧，把最终帧数和 metadata（如最终计数）写入 schema.json"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        for f in self._files.values():
+            f.close()
+        self.schema.update(metadata, frames=self.frames_written, ended=time.strftime("%Y-%m-%d %H:%M:%S"))
+        try:
+            self._write_schema()
+        except OSError as e:
+            self.log(f"[错误] 保存会话信息失败: {e}")
+
+
+def load_session(directory):
+    """返回 (schema, {列名: 只读 np.memmap})，帧数取各列文件中完整帧数的最小值"""
+    with open(os.path.join(directory, "schema.json"), encoding="utf-8") as f:
+        schema = json.load(f)
+    specs = [(c["name"], np.dtype(c["dtype"]), tuple(c["shape"])) for c in schema["columns"]]
+    paths = {name: os.path.join(directory, f"{name}.bin") for name, _, _ in specs}
+    frames = min(os.path.getsize(paths[name]) // (dtype.itemsize * int(np.prod(shape)))
+                 for name, dtype, shape in specs)
+    columns = {}
+    for name, dtype, shape in specs:
+        if frames:
+            columns[name] = np.memmap(paths[name], dtype=dtype, mode="r", shape=(frames,) + shape)
+        else:
+            columns[name] = np.zeros((0,) + shape, dtype=dtype)  # 空文件无法映射
+    return schema, columns
+
+
+def summarize(directory):
+    schema, columns = load_session(directory)
+    frames = len(columns["t_capture"])
+    summary = {"frames": frames, "started": schema.get("started"), "match_mode": schema.get("match_mode")}
+    if frames == 0:
+        return summary
+    t = columns["t_capture"]
+    duration = float(t[-1] - t[0])
+    present = ~np.isnan(columns["landmarks"][:, :, 0, 0])
+    summary.update({
+        "duration_s": round(duration, 1),
+        "fps": round((frames - 1) / duration, 1) if duration > 0 else None,
+        "action_count": int(columns["action_count"][-1]),
+        "matched_ratio": round(float(columns["matched"].mean()), 3),
+        **{f"{label}_present_ratio": round(float(present[:, i].mean()), 3) for i, label in enumerate(HAND_LABELS)},
+        "inferred_ratio": round(float(columns["inferred"].mean()), 3),
+    })
+    for name in ("latency_ms", "inference_ms", "render_ms"):
+        values = np.asarray(columns[name])
+        values = values[~np.isnan(values)]
+        if len(values):
+            summary[f"{name}_p50"] = round(float(np.percentile(values, 50)), 1)
+            summary[f"{name}_p95"] = round(float(np.percentile(values, 95)), 1)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="查看复健会话记录的摘要")
+    parser.add_argument("sessions", nargs="+", help="会话目录（recordings/sessions/...）")
+    args = parser.parse_args(argv)
+    for directory in args.sessions:
+        print(f"{directory}:")
+        for key, value in summarize(directory).items():
+            print(f"  {key}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
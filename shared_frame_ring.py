@@ -0,0 +1,196 @@
+"""跨进程的共享内存帧环形缓冲区
+
+采集端（capture.read()）和推理端（hands.process）分属不同进程时，用它传递画面，避免把
+640x480x3 的帧通过队列 pickle 拷贝。固定数量的帧槽位放在一块 multiprocessing.shared_memory 中：
+
+* 写入方从不阻塞，总是覆盖最旧的槽位（丢弃最旧帧），并跳过读取方正在使用的槽位；
+* 读取方拿到的是直接指向共享内存的 NumPy 视图，无需拷贝，释放之前不会被覆盖；
+* 每帧带有递增的序号和时间戳，读取方据此统计丢帧数。
+
+只支持单个写入方和单个读取方。锁只保护很小的头部，拷贝像素时不持锁。
+"""
+
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# 头部字段（int64）
+_WRITE_SEQ, _LATEST_SLOT, _READER_SLOT, _LAST_READ_SEQ, _DROPPED, _HEADER_FIELDS = 0, 1, 2, 3, 4, 8
+_ALIGNMENT = 64
+
+
+def _align(offset):
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+class FrameView:
+    """读取方持有的一帧：frame 是共享内存上的视图，用完需 release()（或用 with 语句）"""
+
+    def __init__(self, ring, slot, seq, timestamp, dropped):
+        self.ring = ring
+        self.slot = slot
+        self.seq = seq
+        self.timestamp = timestamp
+        self.dropped = dropped  # 自上一次读取以来跳过的帧数
+        self.frame = ring._frames[slot]
+
+    def release(self):
+        if self.ring is not None:
+            self.ring._release(self.slot)
+            self.ring = None
+            self.frame = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class SharedFrameRing:
+    def __init__(self, shape, slots=4, dtype=np.uint8, lock=None, new_frame=None, name=None):
+        """创建（name 为 None）或连接（给定 name）一个环形缓冲区
+
+        lock 和 new_frame 为同一 multiprocessing 上下文中的 Lock 和 Event，两端必须使用同一对象。
+        """
+        if slots < 3:
+            raise ValueError("至少需要 3 个槽位：一个正在读、一个最新帧、一个正在写")
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.dtype = np.dtype(dtype)
+        self.lock = lock
+        self.new_frame = new_frame
+
+        frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        header_bytes = _HEADER_FIELDS * 8
+        seq_offset = header_bytes
+        ts_offset = seq_offset + slots * 8
+        frames_offset = _align(ts_offset + slots * 8)
+        slot_stride = _align(frame_bytes)
+        total = frames_offset + slot_stride * slots
+
+        self._owner = name is None
+        if self._owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=total)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+
+        buf = self.shm.buf
+        self._header = np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=buf, offset=0)
+        self._slot_seq = np.ndarray((slots,), dtype=np.int64, buffer=buf, offset=seq_offset)
+        self._slot_ts = np.ndarray((slots,), dtype=np.float64, buffer=buf, offset=ts_offset)
+        self._frames = [
+            np.ndarray(self.shape, dtype=self.dtype, buffer=buf, offset=frames_offset + i * slot_stride)
+            for i in range(slots)
+        ]
+        if self._owner:
+            self._header[:] = 0
+            self._header[_LATEST_SLOT] = -1
+            self._header[_READER_SLOT] = -1
+            self._slot_seq[:] = 0
+
+        self._writing_slot = None
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def spec(self):
+        """传给子进程的参数，子进程用 SharedFrameRing.attach(spec) 连接"""
+        return {"name": self.name, "shape": self.shape, "slots": self.slots, "dtype": self.dtype.str,
+                "lock": self.lock, "new_frame": self.new_frame}
+
+    @classmethod
+    def attach(cls, spec):
+        return cls(spec["shape"], spec["slots"], spec["dtype"], spec["lock"], spec["new_frame"], name=spec["name"])
+
+    # ---- 写入方 ----
+
+    def begin_write(self):
+        """取得下一个可写槽位的数组视图，可直接作为 capture.read() 的输出缓冲区"""
+        with self.lock:
+            latest = int(self._header[_LATEST_SLOT])
+            reader = int(self._header[_READER_SLOT])
+            slot = (latest + 1) % self.slots
+            if slot == reader:
+                slot = (slot + 1) % self.slots
+            self._slot_seq[slot] = 0  # 写入期间标记为无效
+        self._writing_slot = slot
+        return self._frames[slot]
+
+    def commit_write(self, timestamp=None):
+        """提交 begin_write() 取得的槽位，返回该帧序号"""
+        slot = self._writing_slot
+        self._writing_slot = None
+        with self.lock:
+            seq = int(self._header[_WRITE_SEQ]) + 1
+            self._slot_ts[slot] = time.perf_counter() if timestamp is None else timestamp
+            self._slot_seq[slot] = seq
+            self._header[_WRITE_SEQ] = seq
+            self._header[_LATEST_SLOT] = slot
+        if self.new_frame is not None:
+            self.new_frame.set()
+        return seq
+
+    def abort_write(self):
+        """放弃 begin_write() 取得的槽位（例如 capture.read() 失败），槽位保持无效"""
+        self._writing_slot = None
+
+    def write(self, frame, timestamp=None):
+        """拷贝一帧进环形缓冲区"""
+        np.copyto(self.begin_write(), frame)
+        return self.commit_write(timestamp)
+
+    # ---- 读取方 ----
+
+    def acquire_latest(self, timeout=None):
+        """取得最新一帧的零拷贝视图；没有比上次更新的帧时等待，超时返回 None"""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while True:
+            view = self._try_acquire()
+            if view is not None:
+                return view
+            remaining = None if deadline is None else deadline - time.perf_counter()
+            if remaining is not None and remaining <= 0:
+                return None
+            if self.new_frame is None:
+                time.sleep(0.001)
+            elif self.new_frame.wait(remaining):
+                self.new_frame.clear()
+
+    def _try_acquire(self):
+        with self.lock:
+            slot = int(self._header[_LATEST_SLOT])
+            if slot < 0:
+                return None
+            seq = int(self._slot_seq[slot])
+            last_read = int(self._header[_LAST_READ_SEQ])
+            if seq <= last_read:
+                return None
+            # 丢帧只按序号间隔在这里统计：被覆盖的帧和读取方跳过的帧都算在内，与 FrameView.dropped 一致
+            self._header[_DROPPED] += seq - last_read - 1
+            self._header[_READER_SLOT] = slot
+            self._header[_LAST_READ_SEQ] = seq
+            timestamp = float(self._slot_ts[slot])
+        return FrameView(self, slot, seq, timestamp, seq - last_read - 1)
+
+    def _release(self, slot):
+        with self.lock:
+            if self._header[_READER_SLOT] == slot:
+                self._header[_READER_SLOT] = -1
+
+    def stats(self):
+        with self.lock:
+            return {
+                "written": int(self._header[_WRITE_SEQ]),
+                "last_read": int(self._header[_LAST_READ_SEQ]),
+                "dropped": int(self._header[_DROPPED]),
+            }
+
+    def close(self):
+        """断开共享内存，创建方同时释放它"""
+        del self._header, self._slot_seq, self._slot_ts, self._frames
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
@@ -0,0 +1,170 @@
+"""语音转文字后端
+
+主菜单只调用 backend.recognize(audio)，audio 为 speech_recognition.AudioData，失败时抛出
+speech_recognition 的 UnknownValueError / RequestError，与原先 recognize_google 的行为一致。
+
+* VoskKeywordBackend（默认）：本地 Vosk 模型，识别范围限制在指令词表内，无需联网，单条指令几十毫秒；
+* GoogleBackend：原先的在线识别，失败时重试；
+* TranscriptBackend：按音频内容查表返回预先写好的文字，用于离线测试时代替在线后端。
+
+通过环境变量 GESTURE_SPEECH_BACKEND 选择后端（vosk / google），Vosk 模型目录由 VOSK_MODEL_PATH 指定。
+默认后端不可用（未安装 vosk 或缺少模型）时退回在线识别。
+
+也可以直接对录好的 WAV 文件测试:
+    python speech_backends.py recordings/voice/*.wav
+    python speech_backends.py --backend standin --transcripts recordings/voice/transcripts.json recordings/voice/*.wav
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+import speech_recognition as sr
+
+from voice_commands import match_command, normalize, vocabulary
+
+BACKEND_ENV = "GESTURE_SPEECH_BACKEND"
+MODEL_PATH_ENV = "VOSK_MODEL_PATH"
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "vosk-model-small-cn")
+SAMPLE_RATE = 16000
+
+
+class VoskKeywordBackend:
+    """本地关键词识别：用词表构造 Vosk 语法，只在这些短语中选择最可能的一个"""
+
+    name = "vosk"
+
+    def __init__(self, model_path=None, phrases=None):
+        from vosk import KaldiRecognizer, Model, SetLogLevel
+
+        model_path = model_path or os.environ.get(MODEL_PATH_ENV, DEFAULT_MODEL_PATH)
+        if not os.path.isdir(model_path):
+            raise FileNotFoundError(f"找不到 Vosk 模型目录: {model_path}")
+        SetLogLevel(-1)
+        self._recognizer_cls = KaldiRecognizer
+        self.model = Model(model_path)
+        # 中文模型按字切分最稳妥，未登录词不会被悄悄丢弃
+        phrases = phrases or vocabulary()
+        self.grammar = json.dumps([" ".join(phrase) for phrase in phrases] + ["[unk]"], ensure_ascii=False)
+
+    def recognize(self, audio):
+        recognizer = self._recognizer_cls(self.model, SAMPLE_RATE, self.grammar)
+        recognizer.AcceptWaveform(audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=2))
+        text = normalize(json.loads(recognizer.FinalResult()).get("text", "").replace("[unk]", ""))
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+class GoogleBackend:
+    """在线识别，识别失败时重试"""
+
+    name = "google"
+
+    def __init__(self, language="zh-CN", max_tries=2):
+        self.language = language
+        self.max_tries = max_tries
+        self.recognizer = sr.Recognizer()
+
+    def recognize(self, audio):
+        for attempt in range(self.max_tries):
+            try:
+                return self.recognizer.recognize_google(audio, language=self.language)
+            except sr.UnknownValueError:
+                if attempt == self.max_tries - 1:
+                    raise
+
+
+def audio_key(audio):
+    """音频内容的摘要，作为 TranscriptBackend 的查表键"""
+    return hashlib.sha1(audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=2)).hexdigest()
+
+
+class TranscriptBackend:
+    """按音频内容返回预先写好的文字，代替在线后端做离线测试"""
+
+    name = "standin"
+
+    def __init__(self, transcripts, latency=0.0):
+        self.transcripts = dict(transcripts)  # audio_key -> 文字
+        self.latency = latency  # 模拟网络往返的秒数
+
+    @classmethod
+    def from_wav_files(cls, transcripts_by_file, latency=0.0):
+        """transcripts_by_file: {WAV 路径: 文字}"""
+        return cls({audio_key(load_wav(path)): text for path, text in transcripts_by_file.items()}, latency)
+
+    def recognize(self, audio):
+        if self.latency:
+            time.sleep(self.latency)
+        text = self.transcripts.get(audio_key(audio))
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+def create_backend(name=None, log=print, phrases=None):
+    """按名称创建后端；默认的本地后端不可用时退回在线识别。phrases 为本地识别的词表，默认为全部指令关键词"""
+    name = name or os.environ.get(BACKEND_ENV, "vosk")
+    if name == "google":
+        return GoogleBackend()
+    if name != "vosk":
+        raise ValueError(f"未知的语音识别后端: {name}")
+    try:
+        return VoskKeywordBackend(phrases=phrases)
+    except Exception as e:  # 未安装 vosk、缺少模型或模型加载失败
+        log(f"本地语音识别不可用（{e}），改用在线识别")
+        return GoogleBackend()
+
+
+def load_wav(path):
+    with sr.AudioFile(path) as source:
+        return sr.Recognizer().record(source)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="用 WAV 文件测试语音指令识别")
+    parser.add_argument("wavs", nargs="+", help="录好的 WAV 文件")
+    parser.add_argument("--backend", choices=["vosk", "google", "standin"], default="vosk")
+    parser.add_argument("--transcripts", help="JSON: {WAV 文件名: 期望文字}，standin 后端据此作答，"
+                                              "其他后端据此计算准确率")
+    args = parser.parse_args(argv)
+
+    expected = {}
+    if args.transcripts:
+        base = os.path.dirname(os.path.abspath(args.transcripts))
+        with open(args.transcripts, encoding="utf-8") as f:
+            expected = {os.path.join(base, name): text for name, text in json.load(f).items()}
+
+    if args.backend == "standin":
+        backend = TranscriptBackend.from_wav_files(expected)
+    else:
+        backend = create_backend(args.backend)
+
+    correct = total = 0
+    for path in args.wavs:
+        audio = load_wav(path)
+        start = time.perf_counter()
+        try:
+            text = backend.recognize(audio)
+        except (sr.UnknownValueError, sr.RequestError) as e:
+            text = None
+            print(f"{path}: 识别失败 {type(e).__name__}")
+        latency_ms = (time.perf_counter() - start) * 1000
+        command, keyword = match_command(text) if text else (None, None)
+        if text is not None:
+            print(f"{path}: 「{text}」 -> {command} ({keyword}) {latency_ms:.0f} ms")
+        want = expected.get(os.path.abspath(path))
+        if want is not None:
+            total += 1
+            correct += command == match_command(want)[0]
+    if total:
+        print(f"{backend.name}: 指令正确 {correct}/{total}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""启动阶段计时
+
+在程序最开始创建 StartupTimer，之后在每个阶段结束时调用 mark()。
+启动方（如主菜单）可以通过环境变量 GESTURE_LAUNCH_TIME 传入发起启动时的 time.time()，
+这样解释器自身的启动耗时也会计入首帧时间。
+"""
+
+import json
+import os
+import threading
+import time
+
+LAUNCH_TIME_ENV = "GESTURE_LAUNCH_TIME"
+
+
+class StartupTimer:
+    def __init__(self):
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self.phases = []  # [(阶段名, 距计时起点的毫秒数)]
+        self.prewarm_phases = []  # 预启动进程在被唤醒之前完成的阶段
+
+        # 从启动方发起启动到本进程开始执行之间的耗时（解释器启动等）
+        self.launch_offset_ms = self._launch_offset(os.environ.get(LAUNCH_TIME_ENV))
+
+    @staticmethod
+    def _launch_offset(launch_time):
+        try:
+            return (time.time() - float(launch_time)) * 1000 if launch_time else None
+        except ValueError:
+            return None
+
+    def reset(self, launch_time=None):
+        """预启动的进程被唤醒时调用：已记录的阶段归入 prewarm_phases，从现在重新计时"""
+        with self._lock:
+            self.prewarm_phases = self.phases
+            self.phases = []
+            self._origin = time.perf_counter()
+            self.launch_offset_ms = self._launch_offset(launch_time)
+
+    def mark(self, phase):
+        """记录某阶段完成的时刻，可在任意线程中调用"""
+        elapsed = (time.perf_counter() - self._origin) * 1000
+        with self._lock:
+            self.phases.append((phase, elapsed))
+        return elapsed
+
+    def elapsed_ms(self, phase):
+        with self._lock:
+            for name, elapsed in self.phases:
+                if name == phase:
+                    return elapsed
+        return None
+
+    def report(self):
+        offset = self.launch_offset_ms or 0.0
+        first_frame = self.elapsed_ms("first_frame")
+        with self._lock:
+            phases = {name: round(elapsed, 1) for name, elapsed in self.phases}
+            prewarm_phases = {name: round(elapsed, 1) for name, elapsed in self.prewarm_phases}
+        return {
+            "prewarmed": bool(prewarm_phases),
+            "prewarm_phases_ms": prewarm_phases,
+            "launch_offset_ms": None if self.launch_offset_ms is None else round(self.launch_offset_ms, 1),
+            "phases_ms": phases,
+            "time_to_first_frame_ms": None if first_frame is None else round(first_frame + offset, 1),
+        }
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
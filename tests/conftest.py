@@ -0,0 +1,6 @@
+"""把仓库根目录加入模块搜索路径：各模块都在根目录下，不是一个可安装的包"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,108 @@
+"""dynamic_gesture：流式子序列 DTW 与逐个起点的完整 DTW 对照，以及动作计数"""
+
+import numpy as np
+import pytest
+
+from dynamic_gesture import DynamicGestureMatcher, MotionTemplate, StreamingDTW, resample
+
+
+def _full_dtw(template, segment):
+    """模板与一段特征的完整 DTW，返回 (累计距离, 路径长度) 两个 (模板帧数, 片段帧数) 矩阵"""
+    local = np.abs(template[:, None, :] - segment[None, :, :]).mean(axis=2)
+    cost = np.full(local.shape, np.inf)
+    length = np.zeros(local.shape)
+    for i in range(local.shape[0]):
+        for j in range(local.shape[1]):
+            if i == 0 and j == 0:
+                steps = [(0.0, 0.0)]
+            else:
+                steps = [(cost[a, b], length[a, b]) for a, b in ((i - 1, j - 1), (i, j - 1), (i - 1, j))
+                         if a >= 0 and b >= 0]
+            best_cost, best_length = min(steps)
+            cost[i, j] = best_cost + local[i, j]
+            length[i, j] = best_length + 1
+    return cost, length
+
+
+def _brute_force_average(template, stream, end):
+    """以 stream[end] 结尾、与模板前 i+1 帧对齐的所有子序列中累计距离最小的路径的平均距离和起点"""
+    best = np.full(len(template), np.inf)
+    average = np.full(len(template), np.inf)
+    starts = np.zeros(len(template), dtype=int)
+    for start in range(end + 1):
+        cost, length = _full_dtw(template, stream[start:end + 1])
+        better = cost[:, -1] < best
+        best[better] = cost[better, -1]
+        average[better] = cost[better, -1] / length[better, -1]
+        starts[better] = start
+    return average, starts
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_streaming_dtw_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    template = rng.random((6, 4)).astype(np.float32)
+    stream = rng.random((20, 4)).astype(np.float32)
+    dtw = StreamingDTW(template, threshold=-1.0)  # 阈值为负，不产生候选片段，只比较递推结果
+    for end, feature in enumerate(stream):
+        dtw.update(feature, float(end))
+        average, starts = _brute_force_average(template, stream, end)
+        np.testing.assert_allclose(dtw.average, average, rtol=1e-5)
+        np.testing.assert_array_equal(dtw._start[1:], starts)
+
+
+def _stream_with_repetitions(template, count, gap, rng):
+    """噪声背景中嵌入 count 次（时长拉伸不同的）模板，返回特征流和每次动作的 (起始帧, 结束帧)"""
+    frames, spans = [rng.random((gap, template.shape[1]))], []
+    position = gap
+    for stretch in np.linspace(0.7, 1.4, count):
+        grid = np.linspace(0, len(template) - 1, int(round(len(template) * stretch)))
+        copy = np.stack([np.interp(grid, np.arange(len(template)), template[:, d])
+                         for d in range(template.shape[1])], axis=1)
+        frames += [copy + rng.normal(0, 0.01, copy.shape), rng.random((gap, template.shape[1]))]
+        spans.append((position, position + len(copy) - 1))
+        position += len(copy) + gap
+    return np.concatenate(frames).astype(np.float32), spans
+
+
+def test_streaming_dtw_finds_each_repetition_once():
+    rng = np.random.default_rng(3)
+    template = np.stack([np.sin(np.linspace(0, np.pi, 12) + phase) for phase in (0, 1, 2)], axis=1)
+    stream, spans = _stream_with_repetitions(template, 3, 10, rng)
+    dtw = StreamingDTW(template, threshold=0.1, min_duration=6, max_duration=24, patience=5)
+    matches = [m for t, feature in enumerate(stream) if (m := dtw.update(feature, float(t))) is not None]
+    assert len(matches) == len(spans)
+    for (average, start, end), (span_start, span_end) in zip(matches, spans):
+        assert average <= 0.1
+        assert abs(start - span_start) <= 1 and abs(end - span_end) <= 1
+
+
+def test_streaming_dtw_reset_forgets_partial_path():
+    template = np.linspace(0, 1, 8)[:, None].astype(np.float32)
+    dtw = StreamingDTW(template, threshold=0.05)
+    for t, feature in enumerate(template[:5]):
+        dtw.update(feature, float(t))
+    assert dtw.progress() == pytest.approx(5 / 8)
+    dtw.reset()
+    assert dtw.progress() == 0.0
+
+
+def test_resample_to_fixed_rate():
+    times = np.array([10.0, 10.05, 10.2, 10.4])
+    features = np.array([[0.0], [1.0], [4.0], [8.0]])
+    np.testing.assert_allclose(resample(times, features, fps=10.0)[:, 0], [0.0, 2.0, 4.0, 6.0, 8.0], atol=1e-6)
+
+
+def test_dynamic_matcher_counts_without_hand_gaps(monkeypatch):
+    # 关键点到特征的换算不是这里要测的内容：直接把 "Right" 的数组当作特征
+    monkeypatch.setattr("dynamic_gesture.motion_features",
+                        lambda arrays, labels, aspect_ratio=None: arrays.get("Right"))
+    rng = np.random.default_rng(4)
+    features = np.stack([np.sin(np.linspace(0, np.pi, 15) + phase) for phase in (0, 1)], axis=1)
+    template = MotionTemplate(["Right"], features.astype(np.float32), fps=15.0)
+    stream, spans = _stream_with_repetitions(features, 2, 15, rng)
+
+    matcher = DynamicGestureMatcher(threshold=0.1)
+    matcher.set_reference(template)
+    events = [matcher.update({"Right": feature}, t / 15.0) for t, feature in enumerate(stream)]
+    assert events.count("match") == matcher.action_count == len(spans)
@@ -0,0 +1,116 @@
+"""gesture_smoothing：固定关键点序列上的平滑与去抖结果"""
+
+import numpy as np
+
+from gesture_matcher import GestureMatcher, fold_state_tuples
+from gesture_smoothing import DecisionEngine, LandmarkSmoother, OneEuroFilter
+from hand_features import FINGER_PIPS, FINGER_TIPS
+
+FPS = 30.0
+
+
+def test_decision_engine_fixed_sequence():
+    engine = DecisionEngine(vote_window=5, on_frames=2, off_frames=3)
+    raw = [1, 1, 1, 0, 1, 1, 0, 0, 0, 0, 0, 0, 1, 0, 0, 1, 1, 1]
+    expected = [0, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 1]
+    assert [int(engine.update(r)) for r in raw] == expected
+
+
+def test_decision_engine_reset():
+    engine = DecisionEngine(vote_window=5, on_frames=2, off_frames=3)
+    for _ in range(5):
+        engine.update(True)
+    assert engine.state
+    engine.reset()
+    assert not engine.state
+    assert not engine.update(True)  # 重置后仍需 on_frames 帧才进入匹配
+
+
+def test_one_euro_first_sample_and_constant_input():
+    f = OneEuroFilter()
+    x = np.array([0.3, 0.7], dtype=np.float32)
+    assert np.array_equal(f(x, 0.0), x)
+    for i in range(1, 30):
+        assert np.allclose(f(x, i / FPS), x)
+
+
+def test_one_euro_step_converges_monotonically():
+    f = OneEuroFilter(min_cutoff=1.0, beta=0.05)
+    f(np.zeros(1), 0.0)
+    outputs = [float(f(np.ones(1), i / FPS)[0]) for i in range(1, 90)]
+    assert all(0.0 < a <= b <= 1.0 for a, b in zip(outputs, outputs[1:]))
+    assert outputs[0] < 0.5  # 第一帧有明显的平滑
+    assert outputs[-1] > 0.99
+
+
+def test_one_euro_higher_beta_lags_less():
+    slow, fast = OneEuroFilter(beta=0.0), OneEuroFilter(beta=1.0)
+    slow(np.zeros(1), 0.0)
+    fast(np.zeros(1), 0.0)
+    for i in range(1, 10):
+        x = np.array([i * 0.1])
+        slow_out, fast_out = slow(x, i / FPS), fast(x, i / FPS)
+    assert abs(fast_out[0] - 0.9) < abs(slow_out[0] - 0.9)
+
+
+def test_one_euro_ignores_non_increasing_timestamps():
+    f = OneEuroFilter()
+    f(np.zeros(1), 1.0)
+    first = f(np.ones(1), 1.1)
+    assert np.array_equal(f(np.full(1, 5.0), 1.1), first)
+    assert np.array_equal(f(np.full(1, 5.0), 1.0), first)
+
+
+def _hand(folded, rng):
+    """手指全部张开或全部弯曲的一只手，加少量固定种子的噪声"""
+    points = np.full((21, 3), 0.5, dtype=np.float32)
+    points[FINGER_PIPS, 1] = 0.5
+    points[FINGER_TIPS, 1] = 0.6 if folded else 0.4
+    return points + rng.normal(0, 0.005, points.shape).astype(np.float32)
+
+
+def _recorded_sequence():
+    """张开 / 握拳交替 3 次，每段 1 秒，每段中间夹一帧识别错误的反向姿势"""
+    rng = np.random.default_rng(7)
+    frames = []
+    for _ in range(3):
+        for folded in (False, True):
+            for i in range(int(FPS)):
+                glitch = i == FPS // 2
+                frames.append(_hand(folded != glitch, rng))
+    return frames
+
+
+def _count(frames, decision, smoother):
+    reference = fold_state_tuples({"Right": _hand(False, np.random.default_rng(0))})
+    matcher = GestureMatcher(reference, decision=decision)
+    for index, points in enumerate(frames):
+        hand_arrays = {"Right": points}
+        if smoother is not None:
+            hand_arrays = smoother.update(hand_arrays, index / FPS)
+        matcher.update(fold_state_tuples(hand_arrays))
+    return matcher.action_count
+
+
+def test_debounced_matching_counts_each_repetition_once():
+    frames = _recorded_sequence()
+    # 逐帧比较时，张开段中的错误帧把一次匹配拆成两次，握拳段中的错误帧本身又算一次：每个循环 3 次
+    assert _count(frames, None, None) == 9
+    assert _count(frames, DecisionEngine(vote_window=5, on_frames=2, off_frames=3), LandmarkSmoother()) == 3
+
+
+def test_pipeline_is_deterministic():
+    frames = _recorded_sequence()
+    runs = []
+    for _ in range(2):
+        smoother = LandmarkSmoother()
+        runs.append([smoother.update({"Right": p}, i / FPS)["Right"] for i, p in enumerate(frames)])
+    assert all(np.array_equal(a, b) for a, b in zip(*runs))
+
+
+def test_landmark_smoother_resets_when_hand_disappears():
+    smoother = LandmarkSmoother()
+    smoother.update({"Right": np.zeros((21, 3))}, 0.0)
+    smoother.update({}, 1 / FPS)
+    restarted = smoother.update({"Right": np.ones((21, 3))}, 2 / FPS)["Right"]
+    assert np.array_equal(restarted, np.ones((21, 3), dtype=np.float32))
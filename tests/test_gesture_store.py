@@ -0,0 +1,104 @@
+"""gesture_store：保存 / 读取往返，以及损坏、截断的文件抛出 ValueError"""
+
+import json
+import struct
+
+import numpy as np
+import pytest
+
+from gesture_store import FORMAT_VERSION, MAGIC, load_gesture, save_gesture
+
+
+def _save(tmp_path, with_extras=True):
+    rng = np.random.default_rng(3)
+    hands = {"Left": rng.random((21, 3), dtype=np.float32), "Right": rng.random((21, 3), dtype=np.float32)}
+    variances = {label: np.full((21, 3), 1e-4, dtype=np.float32) for label in hands}
+    thumbnail = rng.integers(0, 255, (32, 24, 3), dtype=np.uint8)
+    path = str(tmp_path / "gesture.gst")
+    if with_extras:
+        save_gesture(path, hands, thumbnail=thumbnail, metadata={"name": "测试"}, hand_variances=variances)
+    else:
+        save_gesture(path, hands)
+    return path, hands, variances, thumbnail
+
+
+def test_round_trip(tmp_path):
+    path, hands, variances, thumbnail = _save(tmp_path)
+    gesture = load_gesture(path)
+    assert gesture.hand_labels == ["Left", "Right"]
+    assert gesture.metadata["name"] == "测试"
+    for label in hands:
+        assert np.array_equal(gesture.hand_arrays()[label], hands[label])
+        assert np.array_equal(gesture.hand_variances()[label], variances[label])
+    assert np.array_equal(gesture.thumbnail, thumbnail)
+
+
+def test_optional_blocks_missing(tmp_path):
+    path, _, _, _ = _save(tmp_path, with_extras=False)
+    gesture = load_gesture(path)
+    assert gesture.thumbnail is None
+    assert gesture.hand_variances() == {}
+
+
+def _truncated_copies(tmp_path, path):
+    data = open(path, "rb").read()
+    for length in (0, 3, 8, 20, 400, len(data) - 1):
+        truncated = tmp_path / f"cut_{length}.gst"
+        truncated.write_bytes(data[:length])
+        yield length, str(truncated)
+
+
+def test_truncated_files_raise_value_error(tmp_path):
+    path, _, _, _ = _save(tmp_path)
+    for _, truncated in _truncated_copies(tmp_path, path):
+        with pytest.raises(ValueError):
+            load_gesture(truncated)
+
+
+def test_bad_magic_and_future_version(tmp_path):
+    path, _, _, _ = _save(tmp_path)
+    data = bytearray(open(path, "rb").read())
+    bad = tmp_path / "bad.gst"
+    bad.write_bytes(b"XXXX" + bytes(data[4:]))
+    with pytest.raises(ValueError):
+        load_gesture(str(bad))
+    struct.pack_into("<H", data, len(MAGIC), FORMAT_VERSION + 1)
+    bad.write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        load_gesture(str(bad))
+
+
+def _with_header(tmp_path, path, edit):
+    """改写头部 JSON（长度不变时原样替换，否则数据偏移会失效，同样应被拒绝）"""
+    data = open(path, "rb").read()
+    prefix = struct.Struct("<4sHI")
+    magic, version, header_len = prefix.unpack_from(data)
+    header = json.loads(data[prefix.size:prefix.size + header_len])
+    edit(header)
+    header_bytes = json.dumps(header).encode("utf-8")
+    rebuilt = tmp_path / "edited.gst"
+    rebuilt.write_bytes(prefix.pack(magic, version, len(header_bytes)) + header_bytes
+                        + data[prefix.size + header_len:])
+    return str(rebuilt)
+
+
+@pytest.mark.parametrize("edit", [
+    lambda h: h["blocks"]["landmarks"].__setitem__("offset", 10 ** 9),
+    lambda h: h["blocks"]["landmarks"].__setitem__("offset", 0),
+    lambda h: h["blocks"]["landmarks"].__setitem__("shape", [2, 21, -3]),
+    lambda h: h["blocks"]["thumbnail"].__setitem__("dtype", "not-a-dtype"),
+    lambda h: h.__setitem__("hands", ["Left"]),
+    lambda h: h.pop("blocks"),
+])
+def test_inconsistent_headers_raise_value_error(tmp_path, edit):
+    path, _, _, _ = _save(tmp_path)
+    with pytest.raises(ValueError):
+        load_gesture(_with_header(tmp_path, path, edit))
+
+
+def test_non_object_header_raises_value_error(tmp_path):
+    header_bytes = b"[1, 2, 3]"
+    path = tmp_path / "list.gst"
+    path.write_bytes(struct.pack("<4sHI", MAGIC, FORMAT_VERSION, len(header_bytes)) + header_bytes)
+    with pytest.raises(ValueError):
+        load_gesture(str(path))
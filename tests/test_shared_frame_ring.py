@@ -0,0 +1,108 @@
+"""shared_frame_ring：丢帧统计、读取中的槽位不被覆盖、跨进程读写"""
+
+import multiprocessing
+import threading
+
+import numpy as np
+import pytest
+
+from shared_frame_ring import SharedFrameRing
+
+SHAPE = (4, 6, 3)
+
+
+@pytest.fixture
+def ring():
+    ring = SharedFrameRing(SHAPE, slots=4, lock=threading.Lock())
+    yield ring
+    ring.close()
+
+
+def _frame(value):
+    return np.full(SHAPE, value % 256, dtype=np.uint8)
+
+
+def test_requires_three_slots():
+    with pytest.raises(ValueError):
+        SharedFrameRing(SHAPE, slots=2, lock=threading.Lock())
+
+
+def test_nothing_to_read(ring):
+    assert ring.acquire_latest(timeout=0) is None
+    ring.write(_frame(1))
+    with ring.acquire_latest(timeout=0) as view:
+        assert view.seq == 1
+    assert ring.acquire_latest(timeout=0) is None  # 同一帧不会读两次
+
+
+def test_dropped_counts_match_stats(ring):
+    # 每轮写入 n 帧再读一次：读到最新一帧，之前未读的 n - 1 帧计为丢帧
+    writes = [1, 3, 1, 5, 2, 7]
+    total_dropped = 0
+    for n in writes:
+        for _ in range(n):
+            ring.write(_frame(0))
+        with ring.acquire_latest(timeout=0) as view:
+            assert view.dropped == n - 1
+            total_dropped += view.dropped
+    stats = ring.stats()
+    assert stats == {"written": sum(writes), "last_read": sum(writes), "dropped": total_dropped}
+    assert total_dropped == sum(writes) - len(writes)
+
+
+def test_slot_being_read_is_not_overwritten(ring):
+    ring.write(_frame(1))
+    view = ring.acquire_latest(timeout=0)
+    for value in range(2, 20):
+        ring.write(_frame(value))
+    assert view.seq == 1
+    assert np.all(view.frame == 1)
+    view.release()
+    with ring.acquire_latest(timeout=0) as latest:
+        assert latest.seq == 19
+        assert np.all(latest.frame == 19)
+        assert latest.dropped == 17
+
+
+def _reader(spec, results, done):
+    ring = SharedFrameRing.attach(spec)
+    reads = dropped = torn = 0
+    try:
+        while True:
+            finished = done.is_set()
+            view = ring.acquire_latest(timeout=0.05)
+            if view is None:
+                if finished:
+                    break
+                continue
+            with view:
+                reads += 1
+                dropped += view.dropped
+                torn += int(not np.all(view.frame == view.seq % 256))
+    finally:
+        ring.close()
+    results.put((reads, dropped, torn))
+
+
+def test_cross_process_drop_accounting():
+    ctx = multiprocessing.get_context("spawn")
+    ring = SharedFrameRing((120, 160, 3), slots=4, lock=ctx.Lock(), new_frame=ctx.Event())
+    results, done = ctx.Queue(), ctx.Event()
+    reader = ctx.Process(target=_reader, args=(ring.spec(), results, done))
+    reader.start()
+    try:
+        frames = 500
+        for seq in range(1, frames + 1):
+            buffer = ring.begin_write()
+            buffer[:] = seq % 256
+            ring.commit_write()
+        done.set()
+        reads, dropped, torn = results.get(timeout=30)
+        reader.join(timeout=10)
+        stats = ring.stats()
+    finally:
+        ring.close()
+    assert torn == 0  # 读取方看到的帧内容与序号一致，没有读到写了一半的槽位
+    assert stats["written"] == frames
+    assert stats["dropped"] == dropped
+    assert reads + dropped == stats["last_read"] == frames
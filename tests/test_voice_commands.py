@@ -0,0 +1,83 @@
+"""voice_commands：关键词优先级、注册新指令和拼音近似匹配"""
+
+import pytest
+
+from voice_commands import CommandGrammar, default_grammar, match_command
+
+
+@pytest.mark.parametrize("text, command, keyword", [
+    ("手势识别", "gesture", "手势识别"),
+    ("手势", "gesture", "手势"),
+    ("请 切换到 手势模式", "gesture", "手势模式"),
+    ("姿势识别", "pose", "姿势识别"),
+    ("我想做复健姿势", "pose", "复健姿势"),
+    ("退出", "exit", "退出"),
+    ("好的再见", "exit", "再见"),
+])
+def test_default_vocabulary(text, command, keyword):
+    assert match_command(text) == (command, keyword)
+
+
+def test_longest_keyword_wins():
+    # "手势识别" 同时包含 "手势"，最长的关键词优先
+    best = default_grammar().match("开始手势识别")
+    assert (best.command, best.keyword, best.start, best.end) == ("gesture", "手势识别", 2, 6)
+
+
+def test_equal_length_prefers_first_registered_command():
+    # "关闭"（exit）与 "手势"（gesture）一样长，先注册的 gesture 优先，与原先 if/elif 的顺序一致
+    assert match_command("关闭手势") == ("gesture", "手势")
+    assert match_command("手势关闭") == ("gesture", "手势")
+
+
+def test_equal_length_same_command_prefers_earliest_position():
+    assert default_grammar().match("退出然后关闭").keyword == "退出"
+
+
+def test_no_match():
+    assert match_command("") == (None, None)
+    assert match_command("今天天气不错") == (None, None)
+
+
+def test_scan_reports_every_occurrence():
+    found = default_grammar().scan("手势识别")
+    assert {(start, end, keyword) for start, end, (_, _, keyword) in found} == {(0, 4, "手势识别"), (0, 2, "手势")}
+
+
+def test_register_new_command_and_dispatch():
+    calls = []
+    grammar = CommandGrammar(fuzzy_pinyin=False)
+    grammar.register("gesture", ["手势"], handler=lambda: calls.append("gesture"))
+    assert grammar.dispatch("打开平衡训练") is None
+
+    grammar.register("balance", ["平衡训练", "平衡"], handler=lambda: calls.append("balance"))
+    best = grammar.dispatch("打开平衡训练")
+    assert (best.command, best.keyword) == ("balance", "平衡训练")
+    grammar.dispatch("手势")
+    assert calls == ["balance", "gesture"]
+    assert grammar.commands() == ["gesture", "balance"]
+    assert grammar.phrases() == ["手势", "平衡训练", "平衡"]
+
+
+def test_register_appends_keywords_without_duplicates():
+    grammar = CommandGrammar(fuzzy_pinyin=False)
+    grammar.register("exit", ["退出", "退 出"])
+    grammar.register("exit", ["再见", "退出"])
+    assert grammar.phrases() == ["退出", "再见"]
+    assert grammar.match("再见").command == "exit"  # 追加关键词后重新编译
+
+
+def test_dispatch_without_handler_still_matches():
+    grammar = CommandGrammar(fuzzy_pinyin=False)
+    grammar.register("exit", ["退出"])
+    assert grammar.dispatch("退出").command == "exit"
+
+
+def test_fuzzy_pinyin():
+    pytest.importorskip("pypinyin")
+    grammar = default_grammar()
+    best = grammar.match("收视识别")  # 同音字
+    assert (best.command, best.keyword, best.fuzzy) == ("gesture", "手势识别", True)
+    assert grammar.match("资势模式").command == "pose"  # 平翘舌不分
+    assert not grammar.match("手势识别").fuzzy  # 文字能直接匹配时不走拼音
+    assert CommandGrammar(fuzzy_pinyin=False).match("收视识别") is None
@@ -0,0 +1,205 @@
+"""主菜单语音指令的词表和匹配
+
+识别后端只负责把语音转成文字，这里决定文字对应哪条指令。离线后端也用同一份词表限制识别范围。
+
+所有指令的关键词编译进一个 Aho-Corasick 自动机，对识别文字只扫描一遍。多个关键词同时命中时，
+最长的关键词优先，长度相同时先注册的指令优先（"手势识别" 胜过 "手势"，"关闭手势" 仍为手势指令，
+与原先按列表顺序判断的结果一致）。
+
+* 安装了 pypinyin 时，关键词和文字还会转成拼音再匹配一次（平翘舌、前后鼻音视为相同），
+  用来容忍 "收视识别" 这类同音、近音的识别错误；
+* 新的模式用 CommandGrammar.register() 注册指令和处理函数，不需要修改分派代码。
+"""
+
+try:
+    from pypinyin import lazy_pinyin
+except ImportError:
+    lazy_pinyin = None
+
+# 指令 -> 关键词，按此顺序注册（与原先 if/elif 的顺序一致）
+COMMAND_KEYWORDS = {
+    # 手势识别的多种表述
+    "gesture": ["手势识别", "开启手势", "进入手势", "手势模式", "检测手势",
+                "手势", "识别手势", "启动手势", "查看手势", "复健手势"],
+    # 姿势识别的多种表述
+    "pose": ["姿势识别", "开启姿势", "进入姿势", "姿势模式", "检测姿势",
+             "姿势", "识别姿势", "启动姿势", "查看姿势", "复健姿势"],
+    # 退出或关闭程序
+    "exit": ["退出", "关闭", "结束", "再见"],
+}
+
+# 模糊拼音：容易混淆的声母、韵母统一成同一写法
+_FUZZY_INITIALS = (("zh", "z"), ("ch", "c"), ("sh", "s"))
+_FUZZY_FINALS = (("ing", "in"), ("eng", "en"), ("ang", "an"))
+
+
+def normalize(text):
+    """转换为小写并去除空格以增强匹配能力"""
+    return text.lower().replace(" ", "")
+
+
+def fuzzy_syllable(syllable):
+    for full, short in _FUZZY_INITIALS:
+        if syllable.startswith(full):
+            syllable = short + syllable[len(full):]
+            break
+    for full, short in _FUZZY_FINALS:
+        if syllable.endswith(full):
+            syllable = syllable[:-len(full)] + short
+            break
+    return syllable
+
+
+def to_pinyin(text):
+    """文字 -> 模糊拼音音节列表，每个汉字一个音节；未安装 pypinyin 时返回 None"""
+    if lazy_pinyin is None:
+        return None
+    return [fuzzy_syllable(syllable) for syllable in lazy_pinyin(text, errors=lambda chars: list(chars))]
+
+
+class _Automaton:
+    """Aho-Corasick 自动机，模式可以是任意可哈希元素的序列（字符或拼音音节）"""
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.outputs = [[]]  # 每个状态结束的模式 (长度, 附带数据)
+        for sequence, payload in patterns:
+            state = 0
+            for symbol in sequence:
+                next_state = self.goto[state].get(symbol)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][symbol] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.outputs.append([])
+                state = next_state
+            self.outputs[state].append((len(sequence), payload))
+
+        # 广度优先建立失败指针（根的子状态指向根），并把失败状态的输出合并进来
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for symbol, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.step(self.fail[state], symbol)
+                self.fail[next_state] = fallback
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[fallback]
+
+    def step(self, state, symbol):
+        while state and symbol not in self.goto[state]:
+            state = self.fail[state]
+        return self.goto[state].get(symbol, 0)
+
+    def scan(self, sequence):
+        """返回 sequence 中出现的所有模式 [(起点, 终点, 附带数据)]"""
+        state = 0
+        found = []
+        for index, symbol in enumerate(sequence):
+            state = self.step(state, symbol)
+            for length, payload in self.outputs[state]:
+                found.append((index + 1 - length, index + 1, payload))
+        return found
+
+
+class CommandMatch:
+    __slots__ = ("command", "keyword", "start", "end", "fuzzy")
+
+    def __init__(self, command, keyword, start, end, fuzzy=False):
+        self.command = command
+        self.keyword = keyword
+        self.start = start
+        self.end = end
+        self.fuzzy = fuzzy  # 通过拼音匹配得到
+
+    def __repr__(self):
+        return f"CommandMatch({self.command!r}, {self.keyword!r}{', fuzzy' if self.fuzzy else ''})"
+
+
+class CommandGrammar:
+    def __init__(self, fuzzy_pinyin=True):
+        self.fuzzy_pinyin = fuzzy_pinyin and lazy_pinyin is not None
+        self._keywords = {}  # 指令 -> [关键词]，保持注册顺序
+        self._handlers = {}
+        self._automaton = None
+        self._pinyin_automaton = None
+
+    def register(self, command, keywords=(), handler=None):
+        """注册指令（或为已有指令追加关键词 / 设置处理函数），handler 无参数"""
+        existing = self._keywords.setdefault(command, [])
+        for keyword in keywords:
+            keyword = normalize(keyword)
+            if keyword and keyword not in existing:
+                existing.append(keyword)
+        if handler is not None:
+            self._handlers[command] = handler
+        self._automaton = self._pinyin_automaton = None  # 下次匹配时重新编译
+
+    def commands(self):
+        return list(self._keywords)
+
+    def phrases(self):
+        """所有关键词，供离线后端构建识别语法"""
+        return [keyword for keywords in self._keywords.values() for keyword in keywords]
+
+    def _compile(self):
+        patterns = []
+        for order, (command, keywords) in enumerate(self._keywords.items()):
+            patterns += [(keyword, (order, command, keyword)) for keyword in keywords]
+        self._automaton = _Automaton(patterns)
+        if self.fuzzy_pinyin:
+            self._pinyin_automaton = _Automaton([(to_pinyin(keyword), payload) for keyword, payload in patterns])
+
+    @property
+    def automaton(self):
+        if self._automaton is None:
+            self._compile()
+        return self._automaton
+
+    @staticmethod
+    def _best(found, fuzzy=False):
+        if not found:
+            return None
+        # 最长关键词优先，其次先注册的指令，再次出现位置靠前
+        start, end, (_, command, keyword) = min(found, key=lambda m: (m[0] - m[1], m[2][0], m[0]))
+        return CommandMatch(command, keyword, start, end, fuzzy)
+
+    def scan(self, text):
+        """返回文字中出现的所有关键词 [(起点, 终点, (注册序号, 指令, 关键词))]"""
+        return self.automaton.scan(normalize(text))
+
+    def match(self, text):
+        """返回最佳的 CommandMatch，文字直接匹配不到时尝试拼音匹配，都没有时返回 None"""
+        text = normalize(text)
+        best = self._best(self.automaton.scan(text))
+        if best is None and self._pinyin_automaton is not None:
+            best = self._best(self._pinyin_automaton.scan(to_pinyin(text)), fuzzy=True)
+        return best
+
+    def dispatch(self, text):
+        """匹配并调用对应指令的处理函数，返回 CommandMatch 或 None"""
+        best = self.match(text)
+        if best is not None and best.command in self._handlers:
+            self._handlers[best.command]()
+        return best
+
+
+def default_grammar():
+    grammar = CommandGrammar()
+    for command, keywords in COMMAND_KEYWORDS.items():
+        grammar.register(command, keywords)
+    return grammar
+
+
+_DEFAULT_GRAMMAR = default_grammar()
+
+
+def vocabulary():
+    """默认词表中的所有关键词"""
+    return _DEFAULT_GRAMMAR.phrases()
+
+
+def match_command(text):
+    """按默认词表匹配，返回 (指令, 命中的关键词)，没有匹配时返回 (None, None)"""
+    best = _DEFAULT_GRAMMAR.match(text)
+    return (best.command, best.keyword) if best is not None else (None, None)
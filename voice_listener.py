@@ -0,0 +1,215 @@
+"""常驻后台的流式语音监听
+
+麦克风在程序运行期间一直保持打开，后台线程逐块（默认 30 毫秒）读取音频：
+
+* 持续跟踪环境噪声：取最近 floor_window 秒内块能量的低百分位数（说话时字与字之间的停顿仍能反映底噪），
+  噪声水平向它平滑靠拢，阈值随之调整，不需要每次按键前做 1 秒的噪声校准。说话期间也照常更新，
+  风扇、空调突然打开使每一块都超过阈值时，噪声水平也会在几秒内升上去；
+  噪声水平保存在校准缓存文件中，下次启动直接使用；
+* 能量连续超过阈值即判定开始说话（带前置缓冲，不丢字头），静音达到 pause_seconds 即判定一句话结束，
+  立刻交给识别后端，结果通过 on_result 回调返回；
+* 只有在 arm()（按下语音按钮）之后结束的话才会被识别，超过 arm_timeout 没有说话则回调 on_timeout；
+* 每条结果记录从按键到结果、从判定结束到结果的耗时，stats() 给出汇总。
+
+回调在监听线程中执行。
+"""
+
+import collections
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import speech_recognition as sr
+
+
+class PhraseResult:
+    __slots__ = ("text", "error", "timings")
+
+    def __init__(self, text=None, error=None, timings=None):
+        self.text = text
+        self.error = error  # 识别失败时为 UnknownValueError / RequestError 实例
+        self.timings = timings or {}
+
+
+def chunk_energy(chunk):
+    """16 位 PCM 块的均方根能量，与 speech_recognition 的 energy_threshold 同一量纲"""
+    samples = np.frombuffer(chunk, dtype=np.int16).astype(np.float32)
+    return float(np.sqrt(np.mean(samples * samples))) if len(samples) else 0.0
+
+
+class VoiceListener:
+    def __init__(self, backend_factory, on_result, on_timeout=None, sample_rate=16000, chunk_ms=30,
+                 pause_seconds=0.6, max_phrase_seconds=5.0, arm_timeout=8.0, energy_ratio=1.5,
+                 min_energy=100.0, floor_window=2.0, floor_percentile=10, calibration_path=None, log=print):
+        self.backend_factory = backend_factory
+        self.on_result = on_result
+        self.on_timeout = on_timeout
+        self.sample_rate = sample_rate
+        self.chunk_size = sample_rate * chunk_ms // 1000
+        self.chunk_seconds = self.chunk_size / sample_rate
+        self.pause_seconds = pause_seconds
+        self.max_phrase_seconds = max_phrase_seconds
+        self.arm_timeout = arm_timeout
+        self.energy_ratio = energy_ratio
+        self.min_energy = min_energy
+        self.floor_percentile = floor_percentile
+        self.calibration_path = calibration_path
+        self.log = log
+
+        self.backend = None
+        self.ready = threading.Event()  # 麦克风已打开、后端已就绪
+        self.error = None  # 启动失败的原因
+        self.ambient_energy = self._load_calibration()
+        self.latencies = collections.deque(maxlen=100)  # 最近的 PhraseResult.timings
+        self._recent_energy = collections.deque(maxlen=max(1, int(floor_window / self.chunk_seconds)))
+
+        self._armed_at = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_saved = time.perf_counter()
+
+    # ---- 校准缓存 ----
+
+    def _load_calibration(self):
+        if self.calibration_path and os.path.exists(self.calibration_path):
+            try:
+                with open(self.calibration_path, encoding="utf-8") as f:
+                    return float(json.load(f)["ambient_energy"])
+            except (OSError, ValueError, KeyError):
+                pass
+        return self.min_energy / self.energy_ratio
+
+    def _save_calibration(self):
+        if not self.calibration_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.calibration_path)), exist_ok=True)
+            with open(self.calibration_path, "w", encoding="utf-8") as f:
+                json.dump({"ambient_energy": round(self.ambient_energy, 2),
+                           "saved": time.strftime("%Y-%m-%d %H:%M:%S")}, f)
+        except OSError as e:
+            self.log(f"保存噪声校准失败: {e}")
+
+    @property
+    def energy_threshold(self):
+        return max(self.min_energy, self.ambient_energy * self.energy_ratio)
+
+    # ---- 控制 ----
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="voice-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        self._save_calibration()
+
+    def arm(self):
+        """开始等待一条指令（按下语音按钮时调用）"""
+        self._armed_at = time.perf_counter()
+
+    @property
+    def armed(self):
+        return self._armed_at is not None
+
+    # ---- 监听线程 ----
+
+    def _run(self):
+        try:
+            self.backend = self.backend_factory()
+            microphone = sr.Microphone(sample_rate=self.sample_rate, chunk_size=self.chunk_size)
+            with microphone as source:
+                self.ready.set()
+                self.log(f"语音监听已启动，噪声阈值 {self.energy_threshold:.0f}")
+                self._listen(source)
+        except Exception as e:
+            self.error = e
+            self.log(f"语音监听启动失败: {e}")
+
+    def _listen(self, source):
+        preroll = collections.deque(maxlen=max(1, int(0.3 / self.chunk_seconds)))
+        start_chunks = max(1, int(0.09 / self.chunk_seconds))  # 连续约 90 毫秒超过阈值才算开始说话
+        voiced = 0
+        frames = None
+        silence = 0.0
+        speech_start = None
+
+        while not self._stop.is_set():
+            chunk = source.stream.read(source.CHUNK)
+            now = time.perf_counter()
+            energy = chunk_energy(chunk)
+            loud = energy > self.energy_threshold
+            self._track_ambient(energy)
+
+            if frames is None:
+                preroll.append(chunk)
+                voiced = voiced + 1 if loud else 0
+                if voiced >= start_chunks:
+                    frames = list(preroll)
+                    silence = 0.0
+                    speech_start = now - len(frames) * self.chunk_seconds
+                elif self._armed_at is not None and now - self._armed_at > self.arm_timeout:
+                    self._armed_at = None
+                    if self.on_timeout is not None:
+                        self.on_timeout()
+                if now - self._last_saved > 30:
+                    self._last_saved = now
+                    self._save_calibration()
+                continue
+
+            frames.append(chunk)
+            silence = 0.0 if loud else silence + self.chunk_seconds
+            if silence >= self.pause_seconds or now - speech_start >= self.max_phrase_seconds:
+                self._finish(b"".join(frames), speech_start, now)
+                frames = None
+                voiced = 0
+                preroll.clear()
+
+    def _track_ambient(self, energy):
+        """噪声水平向最近一段时间块能量的低百分位数平滑靠拢，窗口填满之前只在安静的块上更新"""
+        self._recent_energy.append(energy)
+        if len(self._recent_energy) < self._recent_energy.maxlen:
+            if energy <= self.energy_threshold:
+                self.ambient_energy = 0.95 * self.ambient_energy + 0.05 * energy
+            return
+        floor = float(np.percentile(self._recent_energy, self.floor_percentile))
+        self.ambient_energy = 0.95 * self.ambient_energy + 0.05 * floor
+
+    def _finish(self, data, speech_start, phrase_end):
+        armed_at = self._armed_at
+        if armed_at is None:
+            return  # 未按下按钮时说的话只用于跟踪噪声，不识别
+        self._armed_at = None
+
+        audio = sr.AudioData(data, self.sample_rate, 2)
+        text = error = None
+        recognize_start = time.perf_counter()
+        try:
+            text = self.backend.recognize(audio)
+        except (sr.UnknownValueError, sr.RequestError) as e:
+            error = e
+        done = time.perf_counter()
+
+        timings = {
+            "press_to_result_ms": round((done - armed_at) * 1000, 1),
+            "end_to_result_ms": round((done - phrase_end) * 1000, 1),
+            "recognize_ms": round((done - recognize_start) * 1000, 1),
+            "speech_ms": round((phrase_end - speech_start) * 1000, 1),
+        }
+        self.latencies.append(timings)
+        self.on_result(PhraseResult(text, error, timings))
+
+    def stats(self):
+        """最近若干条指令的延迟中位数"""
+        latencies = list(self.latencies)
+        if not latencies:
+            return {"count": 0}
+        return {
+            "count": len(latencies),
+            **{f"{key}_p50": float(np.median([t[key] for t in latencies])) for key in latencies[0]},
+            "energy_threshold": round(self.energy_threshold, 1),
+        }
@@ -0,0 +1,83 @@
+"""主菜单的预启动进程池
+
+主菜单空闲时就把各识别程序以 --warm 方式启动：子进程完成解释器启动、导入 OpenCV / MediaPipe
+和模型加载后隐藏等待。切换模式时只需通过标准输入发送一行 "show <启动时刻>"，窗口即可立即出现，
+不再重复支付冷启动的开销。
+
+子进程在被唤醒前一旦发现标准输入关闭（主菜单退出或调用 shutdown()）就会自行退出；
+被唤醒之后则与主菜单脱离，主菜单退出不影响它。没有预启动或预启动进程意外退出时，launch() 退回到普通的冷启动。
+只能预启动支持 --warm 的脚本：不支持的脚本会忽略该参数，立即显示窗口并占用摄像头。
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+from startup_metrics import LAUNCH_TIME_ENV
+
+
+class WarmProcess:
+    """一个以 --warm 方式预启动、等待唤醒的识别程序"""
+
+    def __init__(self, script_name, python=None):
+        self.script_name = script_name
+        self.python = python or sys.executable
+        self.process = None
+
+    def start(self):
+        env = dict(os.environ, **{LAUNCH_TIME_ENV: str(time.time())})
+        self.process = subprocess.Popen([self.python, self.script_name, "--warm"], stdin=subprocess.PIPE,
+                                        env=env, text=True)
+        return self
+
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def show(self):
+        """唤醒进程显示窗口，成功返回 True"""
+        if not self.alive():
+            return False
+        try:
+            self.process.stdin.write(f"show {time.time()}\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError):
+            return False
+        return True
+
+    def discard(self):
+        """关闭标准输入，尚未唤醒的进程会自行退出"""
+        if self.process is not None and self.process.stdin is not None:
+            try:
+                self.process.stdin.close()
+            except OSError:
+                pass
+
+
+class WarmPool:
+    def __init__(self, python=None):
+        self.python = python or sys.executable
+        self._warm = {}  # 脚本名 -> WarmProcess
+
+    def prewarm(self, script_name):
+        """预启动脚本，脚本不存在或已有存活的预启动进程时什么也不做"""
+        if not os.path.exists(script_name):
+            return False
+        warm = self._warm.get(script_name)
+        if warm is None or not warm.alive():
+            self._warm[script_name] = WarmProcess(script_name, self.python).start()
+        return True
+
+    def launch(self, script_name):
+        """启动脚本：优先唤醒预启动进程，否则冷启动。返回 (进程, 是否为预启动)"""
+        warm = self._warm.pop(script_name, None)
+        if warm is not None and warm.show():
+            return warm.process, True
+        env = dict(os.environ, **{LAUNCH_TIME_ENV: str(time.time())})
+        return subprocess.Popen([self.python, script_name], env=env), False
+
+    def shutdown(self):
+        """放弃所有未被唤醒的预启动进程"""
+        for warm in self._warm.values():
+            warm.discard()
+        self._warm.clear()